@@ -43,10 +43,110 @@ class ElectoralAPI {
         }
     }
 
+    /**
+     * IRV count on the Python backend (same rounds schema as calculateIRV_Full)
+     */
+    static async calculateIRV(candidates, ballots) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/irv/calculate`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    candidates: candidates.map(c => ({
+                        id: c.id,
+                        name: c.name,
+                        party_id: c.partyId,
+                        party_name: parties.find(p => p.id === c.partyId)?.name || '',
+                        color: parties.find(p => p.id === c.partyId)?.color || '#666'
+                    })),
+                    ballots: ballots
+                })
+            });
+
+            const data = await response.json();
+
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+
+            return data.results;
+        } catch (error) {
+            console.error('IRV API Error:', error);
+            // Fallback to JavaScript implementation
+            return null;
+        }
+    }
+
+    /**
+     * Party-list seats and Gallagher / Loosemore-Hanby indices for many
+     * vote vectors (scenarios x parties) in one call
+     */
+    static async allocateProportional(votes, seats, methods = ['dhondt'], threshold = 0) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/proportional/allocate`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    votes: votes,
+                    seats: seats,
+                    methods: methods,
+                    threshold: threshold
+                })
+            });
+
+            const data = await response.json();
+
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+
+            return data.results;
+        } catch (error) {
+            console.error('Proportional Allocation API Error:', error);
+            return null;
+        }
+    }
+
+    /**
+     * Proportional committees (seq-PAV, RAV, seq-Phragmen, Equal Shares, PAV) from approval ballots
+     */
+    static async calculateCommittee(candidates, seats, ballots, options = {}) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/committee/calculate`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    candidates: candidates,
+                    seats: seats,
+                    ballots: ballots,
+                    ...options
+                })
+            });
+
+            const data = await response.json();
+
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+
+            return data.results;
+        } catch (error) {
+            console.error('Committee API Error:', error);
+            return null;
+        }
+    }
+
     /**
      * Simulate strategic voting behavior
+     * (options: ballots for the iterated best-response dynamics, precision, max_iterations)
      */
-    static async simulateStrategicVoting(system, candidates, sincereVotes, pollingData = {}) {
+    static async simulateStrategicVoting(system, candidates, sincereVotes, pollingData = {}, options = {}) {
         try {
             const response = await fetch(`${API_BASE_URL}/strategic-voting/simulate`, {
                 method: 'POST',
@@ -63,7 +163,8 @@ class ElectoralAPI {
                         color: parties.find(p => p.id === c.partyId)?.color || '#666'
                     })),
                     sincere_votes: sincereVotes,
-                    polling_data: pollingData
+                    polling_data: pollingData,
+                    ...options
                 })
             });
 
@@ -82,8 +183,9 @@ class ElectoralAPI {
 
     /**
      * Generate realistic ballot data
+     * (options: model fields such as model: 'spatial', candidate_positions, voter_mixture)
      */
-    static async generateBallots(candidates, numVoters, distribution = 'normal') {
+    static async generateBallots(candidates, numVoters, distribution = 'normal', options = {}) {
         try {
             const response = await fetch(`${API_BASE_URL}/ballots/generate`, {
                 method: 'POST',
@@ -99,7 +201,8 @@ class ElectoralAPI {
                         color: parties.find(p => p.id === c.partyId)?.color || '#666'
                     })),
                     num_voters: numVoters,
-                    distribution: distribution
+                    distribution: distribution,
+                    ...options
                 })
             });
 
@@ -118,8 +221,9 @@ class ElectoralAPI {
 
     /**
      * Run batch simulation across multiple systems
+     * (options: ballot model fields, as for generateBallots)
      */
-    static async runBatchSimulation(candidates, numVoters, distribution, systems) {
+    static async runBatchSimulation(candidates, numVoters, distribution, systems, options = {}) {
         try {
             const response = await fetch(`${API_BASE_URL}/batch-simulation`, {
                 method: 'POST',
@@ -137,7 +241,8 @@ class ElectoralAPI {
                     num_voters: numVoters,
                     distribution: distribution,
                     systems: systems,
-                    seats: getSeatsCount()
+                    seats: getSeatsCount(),
+                    ...options
                 })
             });
 
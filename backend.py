@@ -3,13 +3,16 @@ Electoral Systems Simulator - Python Backend
 Flask API for advanced computational analysis and data persistence
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from flask_cors import CORS
+import io
 import json
 from datetime import datetime
 import sqlite3
 import hashlib
 import os
+import uuid
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -20,11 +23,25 @@ from calculators import (
     STVCalculator,
     StrategicVotingSimulator,
     BallotGenerator,
-    STVCandidate,
-    STVBallot
+    BallotProfile,
+    STVCandidate
 )
 from calculators.ranked_systems import BordaCountCalculator, CondorcetCalculator
-from calculators.multi_district import MultiDistrictCalculator, District
+from calculators.irv import IRVCalculator
+from calculators.positional import normalize_rules
+from calculators.batch import run_systems, CARDINAL_RUNNERS
+from calculators.ensemble import run_ensemble
+from calculators.ingest import read_ballot_stream
+from calculators import profile_io
+from calculators.cache import ResultCache, cache_key
+from calculators.incremental import RecountSession
+from calculators.counterfactual import CounterfactualEngine
+from calculators.proportional import proportional_results
+from calculators.committee import committee_results
+from calculators.cardinal import ScoreProfile
+from calculators.cultures import is_culture
+from calculators.strategic import DYNAMICS_RULES
+from calculators.multi_district import MultiDistrictCalculator, District, DistrictMatrix
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
@@ -36,6 +53,12 @@ FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
 FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 MAX_VOTERS = int(os.getenv('MAX_VOTERS', 1000000))
 MAX_CANDIDATES = int(os.getenv('MAX_CANDIDATES', 50))
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', os.cpu_count() or 1))
+MAX_TRIALS = int(os.getenv('MAX_TRIALS', 10000))
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 256))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 3600))
+RESULT_CACHE_PERSIST = os.getenv('RESULT_CACHE_PERSIST', 'False').lower() == 'true'
+MAX_RECOUNT_SESSIONS = int(os.getenv('MAX_RECOUNT_SESSIONS', 32))
 MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY', '')
 
 def init_db():
@@ -69,10 +92,60 @@ def init_db():
 
 init_db()
 
+# Calculator results keyed by a hash of (system, candidates, profile, options)
+result_cache = ResultCache(
+    RESULT_CACHE_SIZE, RESULT_CACHE_TTL,
+    db_path=DB_PATH if RESULT_CACHE_PERSIST else None
+)
+
+# Open incremental recount sessions (in this process), least recently used first
+recount_sessions = OrderedDict()
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
+STREAMED_BALLOT_TYPES = ('application/x-ndjson', 'text/csv')
+PROFILE_FILE_TYPES = {mimetype: fmt for fmt, mimetype in profile_io.MIMETYPES.items()}
+
+
+def _read_ballots():
+    """
+    Request options and ballot profile for the ranked-ballot endpoints
+    
+    JSON bodies carry "ballots" as before. NDJSON (meta line first) and CSV
+    (meta JSON in the "meta" query parameter) bodies are streamed straight
+    into a deduplicated count table instead of being parsed whole. Binary
+    .npz / Arrow profiles (meta in the query parameter) are spooled to disk
+    and memory-mapped.
+    """
+    if request.mimetype in PROFILE_FILE_TYPES:
+        if 'meta' not in request.args:
+            raise ValueError('Binary profiles need a "meta" query parameter with "candidates"')
+        meta = json.loads(request.args['meta'])
+        return meta, profile_io.read_upload(request.stream, PROFILE_FILE_TYPES[request.mimetype])
+    
+    if request.mimetype in STREAMED_BALLOT_TYPES:
+        meta = json.loads(request.args['meta']) if 'meta' in request.args else None
+        return read_ballot_stream(request.stream, request.mimetype, meta)
+    
+    data = request.json
+    return data, BallotProfile.from_dicts(data['ballots'], [c['id'] for c in data['candidates']])
+
+
+def _cached(system, data, profile, options, compute):
+    """
+    Results of `compute()`, served from the result cache when the same
+    system, candidates, profile and options were calculated before
+    """
+    key = cache_key(system, data['candidates'], profile, options)
+    results = result_cache.get(key)
+    if results is None:
+        results = compute()
+        result_cache.put(key, system, results)
+    return results
+
+
 @app.route('/api/stv/calculate', methods=['POST'])
 def calculate_stv():
     """
@@ -82,18 +155,72 @@ def calculate_stv():
     {
         "candidates": [{"id": 1, "name": "Alice", "party_id": 1, "party_name": "Party A", "color": "#ff0000"}],
         "ballots": [{"preferences": [1, 2, 3], "count": 100}],
-        "seats": 3
+        "seats": 3,
+        "engine": "numpy",  // optional: "numpy" (default) or "python"
+        "arithmetic": "float",  // optional: "float", "fixed" or "fraction"
+        "decimals": 5  // optional, precision of "fixed" arithmetic
     }
+    
+    Large ballot sets can instead be streamed as application/x-ndjson (this
+    object without "ballots" on the first line, one ballot per line) or as
+    text/csv with the options in a "meta" query parameter. Binary profiles
+    from /api/ballots/generate ("format": "npz" or "arrow") are accepted as
+    application/x-npz or application/vnd.apache.arrow.file, also with "meta".
+    
+    Results are cached by candidates, normalized profile and options, so a
+    repeated request is answered without recounting (see /api/cache/stats).
     """
     try:
-        data = request.json
-        
+        data, profile = _read_ballots()
         candidates = [STVCandidate(**c) for c in data['candidates']]
-        ballots = [STVBallot(**b) for b in data['ballots']]
         seats = data.get('seats', 1)
+        arithmetic = data.get('arithmetic', 'float')
+        # Exact fractions are only available on the Python engine
+        engine = data.get('engine', 'python' if arithmetic == 'fraction' else 'numpy')
+        decimals = data.get('decimals', 5)
+        
+        calculator = STVCalculator(
+            candidates, seats, engine=engine,
+            arithmetic=arithmetic, decimals=decimals
+        )
+        options = {'seats': seats, 'engine': engine, 'arithmetic': arithmetic, 'decimals': decimals}
+        results = _cached('stv', data, profile, options, lambda: calculator.run_election(profile))
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/irv/calculate', methods=['POST'])
+def calculate_irv():
+    """
+    Instant-Runoff Voting, round by round
+    
+    Request body:
+    {
+        "candidates": [...],
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}]
+    }
+    
+    "rounds" follows calculateIRV_Full in calculations.js, so the response
+    can be handed straight to the round-by-round view. Ballots may also be
+    streamed or uploaded as for /api/stv/calculate.
+    """
+    try:
+        data, profile = _read_ballots()
+        
+        from calculators.irv import Candidate as IRVCandidate
+        candidates = [IRVCandidate(**c) for c in data['candidates']]
         
-        calculator = STVCalculator(candidates, seats)
-        results = calculator.run_election(ballots)
+        calculator = IRVCalculator(candidates)
+        results = _cached('irv', data, profile, {}, lambda: calculator.calculate(profile))
         
         return jsonify({
             'success': True,
@@ -119,6 +246,15 @@ def simulate_strategic_voting():
         "sincere_votes": {"1": 1000, "2": 800, "3": 500},
         "polling_data": {"1": 0.45, "2": 0.35, "3": 0.20}
     }
+    
+    With ranked "ballots" instead of "sincere_votes", voter groups
+    best-respond to successive polls until no group moves or a cycle
+    appears; "system" may then be "fptp", "two_round", "irv" or "approval",
+    and "polling_data" is the poll the first response reacts to:
+    
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}],
+        "precision": 20,        // optional, how sharply pivot chances fall
+        "max_iterations": 100   // optional
     """
     try:
         data = request.json
@@ -127,9 +263,24 @@ def simulate_strategic_voting():
         # Import from modular calculator
         from calculators.strategic import Candidate as StratCandidate
         candidates = [StratCandidate(**c) for c in data['candidates']]
-        sincere_votes = {int(k): v for k, v in data['sincere_votes'].items()}
         polling_data = {int(k): v for k, v in data.get('polling_data', {}).items()}
         
+        if 'ballots' in data:
+            if system not in DYNAMICS_RULES:
+                raise ValueError(f'Strategic simulation not implemented for {system}')
+            profile = BallotProfile.from_dicts(data['ballots'], [c.id for c in candidates])
+            results = StrategicVotingSimulator.simulate_dynamics(
+                candidates, profile, system, polling_data,
+                precision=float(data.get('precision', 20.0)),
+                max_iterations=min(int(data.get('max_iterations', 100)), 10000)
+            )
+            return jsonify({
+                'success': True,
+                'results': results
+            })
+        
+        sincere_votes = {int(k): v for k, v in data['sincere_votes'].items()}
+        
         if system == 'fptp':
             results = StrategicVotingSimulator.simulate_fptp_strategic(
                 candidates, sincere_votes, polling_data
@@ -152,6 +303,97 @@ def simulate_strategic_voting():
         }), 400
 
 
+def _generate_profile(data, candidates, num_voters):
+    """
+    Generated electorate for the ballot and batch endpoints: the 1-D
+    ideological model by default, a statistical culture when "distribution"
+    names one ("ic", "iac", "mallows", "plackett_luce", "polya_urn") with
+    
+        "dispersion": 0.5,            // Mallows phi
+        "reference": [3, 1, 2],       // Mallows centre, candidate ids
+        "culture_weights": {"1": 2},  // Plackett-Luce, per candidate id
+        "urn_alpha": 1.0              // Polya urn
+    
+    or the multi-dimensional spatial model with "model": "spatial" and its
+    optional fields
+    
+        "candidate_positions": [[x, y], ...] or {"<id>": [x, y]},
+        "dimensions": 2,
+        "salience": [1.0, 0.5],
+        "voter_mixture": [{"weight": 0.6, "mean": [0.3, 0.4], "std": 0.1}],
+        "noise": 0.05,
+        "ballot_depth": 3
+    """
+    distribution = data.get('distribution', 'normal')
+    seed = data.get('seed')
+    model = data.get('model', 'ideological')
+    
+    if model == 'ideological':
+        return BallotGenerator.generate_profile(
+            candidates, num_voters, distribution, seed=seed, **_culture_params(data)
+        )
+    if model != 'spatial':
+        raise ValueError(f'Unknown ballot model: {model}')
+    
+    return BallotGenerator.generate_spatial_profile(
+        candidates, num_voters, distribution=distribution, seed=seed,
+        **_spatial_params(data, candidates)
+    )
+
+
+def _culture_params(data):
+    """generate_culture's parameters from a request body (none for the ideological model)"""
+    if not is_culture(data.get('distribution', 'normal')):
+        return {}
+    return {
+        'dispersion': float(data.get('dispersion', 0.5)),
+        'reference': data.get('reference'),
+        'weights': data.get('culture_weights'),
+        'alpha': float(data.get('urn_alpha', 1.0))
+    }
+
+
+def _spatial_params(data, candidates):
+    """generate_spatial_profile's model arguments from a request body"""
+    positions = data.get('candidate_positions')
+    if isinstance(positions, dict):
+        missing = [c.id for c in candidates if str(c.id) not in positions]
+        if missing:
+            raise ValueError(f'No position for candidate {missing[0]}')
+        positions = [positions[str(c.id)] for c in candidates]
+    return {
+        'positions': positions,
+        'dimensions': data.get('dimensions'),
+        'salience': data.get('salience'),
+        'mixture': data.get('voter_mixture'),
+        'noise': float(data.get('noise', 0.0)),
+        'depth': data.get('ballot_depth')
+    }
+
+
+def _generate_electorate(data, candidates, num_voters, ranked=True):
+    """
+    Ranked and score ballots of one electorate, for the cardinal systems in
+    the batch and committee endpoints. Statistical cultures only produce
+    rankings, so they return no score ballots. The rankings are those
+    _generate_profile draws from the same request.
+    """
+    distribution = data.get('distribution', 'normal')
+    model = data.get('model', 'ideological')
+    if model == 'ideological' and is_culture(distribution):
+        return (_generate_profile(data, candidates, num_voters) if ranked else None), None
+    if model not in ('ideological', 'spatial'):
+        raise ValueError(f'Unknown ballot model: {model}')
+    
+    return BallotGenerator.generate_electorate(
+        candidates, num_voters, distribution,
+        seed=data.get('seed'),
+        max_score=int(data.get('max_score', 5)),
+        spatial=_spatial_params(data, candidates) if model == 'spatial' else None,
+        ranked=ranked
+    )
+
+
 @app.route('/api/ballots/generate', methods=['POST'])
 def generate_ballots():
     """
@@ -161,7 +403,11 @@ def generate_ballots():
     {
         "candidates": [...],
         "num_voters": 10000,
-        "distribution": "polarized"
+        "distribution": "polarized",
+        "seed": 42,  // optional, for reproducible runs
+        "model": "spatial",  // optional, see _generate_profile
+        "format": "json"  // optional: "npz" or "arrow" returns a binary
+                          // profile file the calculator endpoints accept
     }
     """
     try:
@@ -171,23 +417,27 @@ def generate_ballots():
         from calculators.ballot_gen import Candidate as BallotCandidate
         candidates = [BallotCandidate(**c) for c in data['candidates']]
         num_voters = min(data.get('num_voters', 1000), MAX_VOTERS)
-        distribution = data.get('distribution', 'normal')
+        profile = _generate_profile(data, candidates, num_voters)
         
-        ballots = BallotGenerator.generate_ideological_ballots(
-            candidates, num_voters, distribution
-        )
-        
-        # Convert to serializable format
-        ballot_data = [
-            {'preferences': b.preferences, 'count': b.count}
-            for b in ballots
-        ]
+        fmt = data.get('format', 'json')
+        if fmt in profile_io.FORMATS:
+            response = send_file(
+                io.BytesIO(profile_io.profile_bytes(profile, fmt)),
+                mimetype=profile_io.MIMETYPES[fmt],
+                as_attachment=True,
+                download_name=f'profile.{fmt}'
+            )
+            response.headers['X-Total-Voters'] = str(num_voters)
+            response.headers['X-Unique-Ballots'] = str(len(profile))
+            return response
+        if fmt != 'json':
+            raise ValueError(f'Unknown profile format: {fmt}')
         
         return jsonify({
             'success': True,
-            'ballots': ballot_data,
+            'ballots': profile.to_dicts(),
             'total_voters': num_voters,
-            'unique_ballots': len(ballots)
+            'unique_ballots': len(profile)
         })
         
     except Exception as e:
@@ -207,8 +457,22 @@ def batch_simulation():
         "candidates": [...],
         "num_voters": 100000,
         "distribution": "normal",
-        "systems": ["fptp", "irv", "stv", "approval"]
+        "systems": ["fptp", "irv", "stv", "borda", "condorcet", "approval",
+                    "score", "star", "party_list"],
+        "seats": 3,                  // optional, STV and party list
+        "allocation_method": "dhondt",  // optional, party list
+        "max_score": 5,              // optional, score ballots
+        "approval_threshold": 3,     // optional, lowest approving score
+        "seed": 42,  // optional
+        "model": "spatial"  // optional, see _generate_profile
     }
+    
+    Systems run in parallel worker processes sharing one generated profile;
+    the response reports each system's run time. Approval, score and STAR
+    count score ballots cast by the same voters (rescaled utilities); with a
+    statistical culture approval falls back to the top of each ranking
+    (metadata.approval_mode says which). The ranked profile is the same
+    whichever systems are listed.
     """
     try:
         data = request.json
@@ -220,30 +484,29 @@ def batch_simulation():
         distribution = data.get('distribution', 'normal')
         systems = data.get('systems', ['fptp', 'irv'])
         
-        # Generate ballots
-        ballots = BallotGenerator.generate_ideological_ballots(
-            candidates, num_voters, distribution
-        )
-        
-        results = {}
+        # Generate ballots; score ballots are drawn from the same voters
+        profile = _generate_profile(data, candidates, num_voters)
+        scores = None
+        if any(system in CARDINAL_RUNNERS for system in systems):
+            _, scores = _generate_electorate(data, candidates, num_voters, ranked=False)
         
-        # Run simulations for each system
-        for system in systems:
-            if system == 'stv':
-                seats = data.get('seats', 3)
-                stv_candidates = [STVCandidate(**c.__dict__) for c in candidates]
-                stv_ballots = [STVBallot(preferences=b.preferences, count=b.count) for b in ballots]
-                calculator = STVCalculator(stv_candidates, seats)
-                results[system] = calculator.run_election(stv_ballots)
-            # Add other systems as needed
+        options = {key: data[key] for key in ('seats', 'allocation_method', 'scoring', 'completion',
+                                              'approval_count', 'approval_threshold') if key in data}
+        batch = run_systems(profile, [c.__dict__ for c in candidates], systems,
+                            options, max_workers=BATCH_WORKERS, scores=scores)
         
         return jsonify({
             'success': True,
-            'results': results,
+            'results': batch['results'],
+            'timings_ms': batch['timings_ms'],
             'metadata': {
                 'num_voters': num_voters,
                 'distribution': distribution,
-                'unique_ballots': len(ballots)
+                'unique_ballots': len(profile),
+                'unique_score_ballots': len(scores) if scores is not None else None,
+                'approval_mode': (('score_threshold' if scores is not None else 'top_of_ranking')
+                                  if 'approval' in systems else None),
+                'parallel': batch['parallel']
             }
         })
         
@@ -254,6 +517,82 @@ def batch_simulation():
         }), 400
 
 
+@app.route('/api/ensemble', methods=['POST'])
+def ensemble_simulation():
+    """
+    Monte Carlo ensemble: many seeded electorates, aggregate statistics
+    streamed back while the trials run
+    
+    Request body:
+    {
+        "candidates": [...],
+        "num_voters": 10000,
+        "trials": 1000,
+        "distribution": "normal",
+        "systems": ["fptp", "irv", "condorcet"],
+        "seats": 3,              // optional, STV and party list
+        "seed": 42,              // optional
+        "dispersion": 0.5,       // optional culture fields, see _generate_profile
+        "progress_every": 100,   // optional, trials between progress events
+        "format": "ndjson"       // optional, or "sse" for server-sent events
+    }
+    
+    Every event is {"type": "progress" | "result" | "error", "trials_done",
+    "trials", "summary"}; the last one is the final result.
+    """
+    try:
+        data = request.json
+        
+        from calculators.ballot_gen import Candidate as BallotCandidate
+        candidates = [BallotCandidate(**c).__dict__ for c in data['candidates']]
+        trials = min(data.get('trials', 100), MAX_TRIALS)
+        progress_every = max(1, data.get('progress_every', max(1, trials // 20)))
+        stream_format = data.get('format', 'ndjson')
+        if stream_format not in ('ndjson', 'sse'):
+            raise ValueError(f'Unknown stream format: {stream_format}')
+        
+        options = {key: data[key] for key in ('seats', 'allocation_method', 'scoring',
+                                              'completion', 'approval_count') if key in data}
+        ensemble = run_ensemble(
+            candidates,
+            trials,
+            min(data.get('num_voters', 10000), MAX_VOTERS),
+            data.get('distribution', 'normal'),
+            data.get('systems', ['fptp', 'irv']),
+            options,
+            seed=data.get('seed'),
+            max_workers=BATCH_WORKERS,
+            culture_params=_culture_params(data)
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    def event(kind, payload):
+        payload = dict(payload, type=kind, trials=trials)
+        if stream_format == 'sse':
+            return f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps(payload) + '\n'
+    
+    def stream():
+        reported = 0
+        try:
+            accumulator = None
+            for accumulator in ensemble:
+                if accumulator.trials - reported >= progress_every and accumulator.trials < trials:
+                    reported = accumulator.trials
+                    yield event('progress', {'trials_done': reported, 'summary': accumulator.snapshot()})
+            yield event('result', {'trials_done': accumulator.trials, 'summary': accumulator.snapshot()})
+        except Exception as e:
+            yield event('error', {'trials_done': reported, 'error': str(e)})
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(stream_with_context(stream()), mimetype=mimetype)
+
+
 @app.route('/api/scenario/save', methods=['POST'])
 def save_scenario():
     """
@@ -348,18 +687,48 @@ def health_check():
         'version': '2.0.0',
         'features': [
             'advanced_stv',
+            'instant_runoff',
             'strategic_voting',
+            'strategic_dynamics',
             'ballot_generation',
+            'spatial_model',
+            'statistical_cultures',
+            'cardinal_ballots',
             'batch_simulation',
             'scenario_persistence',
             'borda_count',
             'condorcet_method',
             'multi_district_mmp',
             'multi_district_parallel',
+            'multi_district_sweep',
+            'proportional_allocation',
+            'committee_elections',
+            'result_cache',
+            'incremental_recount',
+            'counterfactual_analysis',
             'ai_analysis'
         ]
     })
 
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Result cache size, hit and miss counters"""
+    return jsonify({
+        'success': True,
+        'stats': result_cache.stats()
+    })
+
+
+@app.route('/api/cache', methods=['DELETE'])
+def clear_cache():
+    """Drop every cached calculator result"""
+    result_cache.clear()
+    return jsonify({
+        'success': True,
+        'stats': result_cache.stats()
+    })
+
 @app.route('/api/ai-analysis', methods=['POST', 'OPTIONS'])
 def ai_analysis():
     """
@@ -446,25 +815,107 @@ def ai_analysis():
         }), 500
 
 
+def _parse_districts(data, candidates):
+    """
+    District input for the multi-district endpoints: either the original
+    `districts` list of objects or the columnar `district_votes` matrix
+    (districts x candidates, columns in `candidates` order)
+    """
+    if 'district_votes' not in data:
+        return [District(**d) for d in data['districts']]
+    
+    return DistrictMatrix(
+        data['district_votes'],
+        candidate_ids=[c.id for c in candidates],
+        party_ids=[c.party_id for c in candidates],
+        district_ids=data.get('district_ids'),
+        district_names=data.get('district_names'),
+        region_ids=data.get('district_regions')
+    )
+
+
+@app.route('/api/multi-district/batch', methods=['POST'])
+def calculate_multi_district_batch():
+    """
+    FPTP across thousands of districts, or many scenarios of the same map,
+    from a columnar vote matrix
+    
+    Expected JSON:
+    {
+        "candidates": [{"id": 1, "name": "...", "party_id": 1, "party_name": "...", "color": "..."}],
+        "parties": {"1": {"name": "...", "color": "..."}},
+        "district_votes": [[...], ...],      // districts x candidates, or
+        "scenarios": [[[...], ...], ...],    // scenarios x districts x candidates
+        "district_ids": [...],               // optional
+        "district_names": [...],             // optional
+        "include_districts": false,          // optional, per-district rows
+        "page": 1,                           // optional, with page_size
+        "page_size": 100                     // optional
+    }
+    """
+    try:
+        data = request.json
+        
+        from calculators.multi_district import Candidate as MDCandidate
+        candidates = [MDCandidate(**c) for c in data['candidates']]
+        calculator = MultiDistrictCalculator(candidates, data.get('parties', {}))
+        
+        if 'scenarios' in data:
+            results = calculator.calculate_fptp_scenarios(data['scenarios'])
+        else:
+            results = calculator.calculate_fptp_winners(
+                _parse_districts(data, candidates),
+                include_districts=data.get('include_districts', False),
+                page=data.get('page'),
+                page_size=data.get('page_size', 100)
+            )
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
 @app.route('/api/multi-district/mmp', methods=['POST'])
 def calculate_multi_district_mmp():
     """
     Calculate Multi-District MMP
+    
+    Optional fields:
+        "mode": "overhang" | "leveling" | "capped" | "regional"
+        "regions": {"1": {"name": "...", "party_votes": {...}, "list_seats": 7}}
+            (regional mode, where top-level party_votes and list_seats are
+            not needed; districts carry a region_id, or pass
+            "district_regions" alongside "district_votes")
     """
     try:
         data = request.json
         
         from calculators.multi_district import Candidate as MDCandidate
         candidates = [MDCandidate(**c) for c in data['candidates']]
-        districts = [District(**d) for d in data['districts']]
+        districts = _parse_districts(data, candidates)
+        
+        # Regional mode takes its party votes and list seats from "regions"
+        mode = data.get('mode', 'overhang')
+        regional = mode == 'regional'
+        party_votes = data.get('party_votes', {}) if regional else data['party_votes']
         
         calculator = MultiDistrictCalculator(candidates, data['parties'])
         results = calculator.calculate_multi_district_mmp(
             districts=districts,
-            party_votes={int(k): v for k, v in data['party_votes'].items()},  # Ensure integer keys
-            list_seats=data['list_seats'],
+            party_votes={int(k): v for k, v in party_votes.items()},  # Ensure integer keys
+            list_seats=data.get('list_seats', 0) if regional else data['list_seats'],
             allocation_method=data.get('allocation_method', 'dhondt'),
-            threshold=data.get('threshold', 0.0)
+            threshold=data.get('threshold', 0.0),
+            include_districts=data.get('include_districts', True),
+            mode=mode,
+            regions=data.get('regions')
         )
         
         return jsonify({
@@ -493,15 +944,160 @@ def calculate_multi_district_parallel():
         
         from calculators.multi_district import Candidate as MDCandidate
         candidates = [MDCandidate(**c) for c in data['candidates']]
-        districts = [District(**d) for d in data['districts']]
+        districts = _parse_districts(data, candidates)
         
         calculator = MultiDistrictCalculator(candidates, data['parties'])
         results = calculator.calculate_multi_district_parallel(
             districts=districts,
-            party_votes=data['party_votes'],
+            party_votes={int(k): v for k, v in data['party_votes'].items()},  # Ensure integer keys
             list_seats=data['list_seats'],
             allocation_method=data.get('allocation_method', 'dhondt'),
-            threshold=data.get('threshold', 0.0)
+            threshold=data.get('threshold', 0.0),
+            include_districts=data.get('include_districts', True)
+        )
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/multi-district/sweep', methods=['POST'])
+def calculate_multi_district_sweep():
+    """
+    MMP or parallel results over a grid of thresholds, list seats and
+    allocation methods, with district winners counted once
+    
+    Same district and party fields as the MMP endpoint, plus:
+        "system": "mmp" | "parallel",
+        "thresholds": [0, 3, 5],                    // optional, default [threshold]
+        "list_seats": [20, 40, 60],                 // or a single number
+        "allocation_methods": ["dhondt", "hare"],   // optional, default [allocation_method]
+        "mode": "overhang" | "leveling"             // optional, MMP only
+    
+    Per-party results are cubes indexed [method][threshold][list_seats][party].
+    """
+    try:
+        data = request.json
+        
+        from calculators.multi_district import Candidate as MDCandidate
+        candidates = [MDCandidate(**c) for c in data['candidates']]
+        districts = _parse_districts(data, candidates)
+        
+        list_seats = data['list_seats']
+        calculator = MultiDistrictCalculator(candidates, data.get('parties', {}))
+        results = calculator.calculate_parameter_sweep(
+            districts=districts,
+            party_votes={int(k): v for k, v in data['party_votes'].items()},  # Ensure integer keys
+            system=data.get('system', 'mmp'),
+            thresholds=data.get('thresholds', [data.get('threshold', 0.0)]),
+            list_seats=list_seats if isinstance(list_seats, list) else [list_seats],
+            allocation_methods=data.get('allocation_methods', [data.get('allocation_method', 'dhondt')]),
+            mode=data.get('mode', 'overhang')
+        )
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/proportional/allocate', methods=['POST'])
+def allocate_proportional():
+    """
+    Party-list seats and disproportionality for many vote vectors at once
+    
+    Expected JSON:
+    {
+        "votes": [[...], ...],           // scenarios x parties (or one vector)
+        "seats": 100,                    // or one house size per scenario
+        "methods": ["dhondt", "hare"],   // optional, default ["dhondt"]
+        "threshold": 5.0,                // optional, percent of the vote
+        "party_ids": [...]               // optional, echoed back
+    }
+    """
+    try:
+        data = request.json
+        
+        methods = data.get('methods') or [data.get('method', 'dhondt')]
+        results = proportional_results(
+            data['votes'],
+            data['seats'],
+            methods,
+            float(data.get('threshold', 0.0))
+        )
+        if 'party_ids' in data:
+            if len(data['party_ids']) != results['parties']:
+                raise ValueError('party_ids must have one id per vote column')
+            results['party_ids'] = data['party_ids']
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/committee/calculate', methods=['POST'])
+def calculate_committee():
+    """
+    Proportional committees from approval ballots
+    
+    Expected JSON:
+    {
+        "candidates": [...],
+        "seats": 5,
+        "ballots": [{"approved": [1, 4], "count": 30},
+                    {"scores": {"1": 5, "2": 3}, "count": 12}],
+        "methods": ["seq_pav", "rav", "seq_phragmen", "mes", "pav"],  // optional
+        "max_score": 5,              // optional, scale of "scores" ballots
+        "approval_threshold": 3,     // optional, lowest approving score
+        "rav_constant": 0.5          // optional, 1 makes RAV equal seq-PAV
+    }
+    
+    Without "ballots" the electorate is generated instead, from
+    "num_voters" and the model fields of /api/batch-simulation; voters
+    approve the candidates they score above the middle of the scale.
+    """
+    try:
+        data = request.json
+        
+        from calculators.ballot_gen import Candidate as BallotCandidate
+        candidates = [BallotCandidate(**c) for c in data['candidates']]
+        max_score = int(data.get('max_score', 5))
+        
+        if 'ballots' in data:
+            scores = ScoreProfile.from_dicts(data['ballots'], [c.id for c in candidates], max_score)
+        else:
+            num_voters = min(data.get('num_voters', 10000), MAX_VOTERS)
+            _, scores = _generate_electorate(data, candidates, num_voters, ranked=False)
+            if scores is None:
+                raise ValueError('Statistical cultures only produce rankings; send approval ballots instead')
+        
+        results = committee_results(
+            scores,
+            [c.__dict__ for c in candidates],
+            int(data['seats']),
+            data.get('methods'),
+            data.get('approval_threshold'),
+            float(data.get('rav_constant', 0.5))
         )
         
         return jsonify({
@@ -524,18 +1120,32 @@ def calculate_borda():
     Request body:
     {
         "candidates": [...],
-        "ballots": [{"preferences": [1, 2, 3], "count": 100}]
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}],
+        "scoring": "borda"  // optional: rule name, custom points list,
+                            // or a list of rules to score together
     }
+    
+    Ballots may also be streamed as NDJSON or CSV, or uploaded as a binary
+    profile (see /api/stv/calculate).
     """
     try:
-        data = request.json
+        data, profile = _read_ballots()
         
-        from calculators.ranked_systems import Candidate as RankedCandidate, Ballot as RankedBallot
+        from calculators.ranked_systems import Candidate as RankedCandidate
         candidates = [RankedCandidate(**c) for c in data['candidates']]
-        ballots = [RankedBallot(**b) for b in data['ballots']]
         
         calculator = BordaCountCalculator(candidates)
-        results = calculator.calculate(ballots)
+        scoring = data.get('scoring', 'borda')
+        
+        def compute():
+            if isinstance(scoring, list) and any(isinstance(rule, (str, list)) for rule in scoring):
+                # Several rules scored against the same profile
+                rules = normalize_rules(scoring)
+                scored = calculator.calculate_many(profile, list(rules.values()))
+                return dict(zip(rules.keys(), scored))
+            return calculator.calculate(profile, scoring)
+        
+        results = _cached('borda', data, profile, {'scoring': scoring}, compute)
         
         return jsonify({
             'success': True,
@@ -557,18 +1167,25 @@ def calculate_condorcet():
     Request body:
     {
         "candidates": [...],
-        "ballots": [{"preferences": [1, 2, 3], "count": 100}]
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}],
+        "completion": ["schulze", "ranked_pairs"]  // optional, or "all"
     }
+    
+    Ballots may also be streamed as NDJSON or CSV, or uploaded as a binary
+    profile (see /api/stv/calculate).
     """
     try:
-        data = request.json
+        data, profile = _read_ballots()
         
-        from calculators.ranked_systems import Candidate as RankedCandidate, Ballot as RankedBallot
+        from calculators.ranked_systems import Candidate as RankedCandidate
         candidates = [RankedCandidate(**c) for c in data['candidates']]
-        ballots = [RankedBallot(**b) for b in data['ballots']]
         
         calculator = CondorcetCalculator(candidates)
-        results = calculator.calculate(ballots)
+        completion = data.get('completion')
+        results = _cached(
+            'condorcet', data, profile, {'completion': completion},
+            lambda: calculator.calculate(profile, completion=completion)
+        )
         
         return jsonify({
             'success': True,
@@ -582,6 +1199,174 @@ def calculate_condorcet():
         }), 400
 
 
+@app.route('/api/counterfactual', methods=['POST'])
+def counterfactual_analysis():
+    """
+    IRV / STV outcomes under candidate withdrawals
+    
+    Request body:
+    {
+        "candidates": [...],
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}],
+        "seats": 1,                        // optional; above 1 runs STV
+        "analysis": ["single", "spoilers"], // any of "single", "pairs",
+                                           // "subsets", "spoilers"
+        "max_withdrawn": 2,                // optional, largest set for "subsets"
+        "withdrawals": [[3], [2, 4]]       // optional explicit withdrawal sets
+    }
+    
+    Counts are memoized by the set of candidates still standing, so the many
+    queries of a sweep share their common elimination rounds. Ballots may
+    also be streamed or uploaded as for /api/stv/calculate.
+    """
+    try:
+        data, profile = _read_ballots()
+        engine = CounterfactualEngine(data['candidates'], profile, data.get('seats', 1))
+        
+        analysis = data.get('analysis', ['single'])
+        if isinstance(analysis, str):
+            analysis = [analysis]
+        unknown = [a for a in analysis if a not in ('single', 'pairs', 'subsets', 'spoilers')]
+        if unknown:
+            raise ValueError(f'Unknown counterfactual analysis: {unknown[0]}')
+        
+        results = {'elected': engine.elected_without([])}
+        if 'single' in analysis:
+            results['single'] = engine.single_withdrawals()
+        if 'pairs' in analysis:
+            results['pairs'] = engine.pair_withdrawals()
+        if 'subsets' in analysis:
+            results['subsets'] = engine.subset_withdrawals(data.get('max_withdrawn', 2))
+        if 'spoilers' in analysis:
+            results['spoilers'] = engine.spoilers(pairs='pairs' in analysis)
+        if data.get('withdrawals'):
+            results['withdrawals'] = engine.withdrawals(data['withdrawals'])
+        results['stats'] = engine.stats()
+        
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+def _recount_session(session_id):
+    """Open session by id (marked as recently used), or None"""
+    session = recount_sessions.get(session_id)
+    if session is not None:
+        recount_sessions.move_to_end(session_id)
+    return session
+
+
+def _session_not_found(session_id):
+    return jsonify({
+        'success': False,
+        'error': f'Recount session not found: {session_id}'
+    }), 404
+
+
+@app.route('/api/recount/session', methods=['POST'])
+def create_recount_session():
+    """
+    Open an incremental recount session over a ballot profile
+    
+    Request body:
+    {
+        "candidates": [...],
+        "ballots": [{"preferences": [1, 2, 3], "count": 100}],
+        "seats": 1  // optional; above 1 the state includes an STV count
+    }
+    
+    Ballots may also be streamed or uploaded as for /api/stv/calculate. The
+    oldest session is closed once MAX_RECOUNT_SESSIONS are open.
+    """
+    try:
+        data, profile = _read_ballots()
+        session = RecountSession(data['candidates'], profile, data.get('seats', 1))
+        
+        session_id = uuid.uuid4().hex[:12]
+        recount_sessions[session_id] = session
+        while len(recount_sessions) > MAX_RECOUNT_SESSIONS:
+            recount_sessions.popitem(last=False)
+        
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'state': session.state()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/recount/session/<session_id>', methods=['GET', 'DELETE'])
+def recount_session(session_id):
+    """Current state of a recount session, or close it (DELETE)"""
+    session = _recount_session(session_id)
+    if session is None:
+        return _session_not_found(session_id)
+    
+    if request.method == 'DELETE':
+        recount_sessions.pop(session_id, None)
+        return jsonify({'success': True})
+    
+    with session.lock:
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'state': session.state()
+        })
+
+
+@app.route('/api/recount/session/<session_id>/delta', methods=['POST'])
+def apply_recount_delta(session_id):
+    """
+    Add or remove copies of rankings and return the updated counts
+    
+    Request body:
+    {
+        "deltas": [
+            {"preferences": [2, 1], "count": 50},   // add 50 ballots
+            {"preferences": [1, 2, 3], "count": -20} // remove 20 ballots
+        ]
+    }
+    
+    state.irv.resumed_from_round is the first IRV round the delta changed
+    (null when the count stands); earlier rounds are not recounted.
+    """
+    session = _recount_session(session_id)
+    if session is None:
+        return _session_not_found(session_id)
+    
+    try:
+        data = request.json
+        deltas = [(d['preferences'], d.get('count', 1)) for d in data['deltas']]
+        
+        with session.lock:
+            session.apply(deltas)
+            state = session.state()
+        
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'state': state
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
 if __name__ == '__main__':
     print("🐍 Electoral Systems Simulator - Python Backend")
     print("=" * 50)
@@ -590,11 +1375,22 @@ if __name__ == '__main__':
     print(f"Max voters per simulation: {MAX_VOTERS:,}")
     print("\nAvailable endpoints:")
     print("  POST /api/stv/calculate")
+    print("  POST /api/irv/calculate")
     print("  POST /api/strategic-voting/simulate")
     print("  POST /api/ballots/generate")
     print("  POST /api/batch-simulation")
+    print("  POST /api/ensemble")
     print("  POST /api/scenario/save")
     print("  GET  /api/scenario/<id>")
+    print("  GET  /api/cache/stats")
+    print("  DELETE /api/cache")
+    print("  POST /api/recount/session")
+    print("  POST /api/recount/session/<id>/delta")
+    print("  POST /api/counterfactual")
+    print("  POST /api/multi-district/batch")
+    print("  POST /api/multi-district/sweep")
+    print("  POST /api/proportional/allocate")
+    print("  POST /api/committee/calculate")
     print("  POST /api/ai-analysis")
     print("  GET  /api/health")
     print("=" * 50)
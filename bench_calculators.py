@@ -0,0 +1,238 @@
+"""
+Benchmarks for Electoral Systems Simulator calculators
+Run directly: python bench_calculators.py
+"""
+
+import time
+import numpy as np
+
+from calculators import STVCalculator, BallotGenerator, STVCandidate
+from calculators.ballot_gen import Candidate
+
+
+def make_candidates(num_candidates):
+    """Candidates with ids 1..n"""
+    return [
+        Candidate(id=i, name=f"Candidate {i}", party_id=i,
+                  party_name=f"Party {i}", color="#666666")
+        for i in range(1, num_candidates + 1)
+    ]
+
+
+def timed(func, repeat=3):
+    """Best wall-clock time of `repeat` calls, in milliseconds"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def bench_stv_arithmetic(num_candidates=12, num_voters=200000, seats=5):
+    """Compare STV engines and weight arithmetic on one generated profile"""
+    candidates = make_candidates(num_candidates)
+    stv_candidates = [STVCandidate(**c.__dict__) for c in candidates]
+    profile = BallotGenerator.generate_ideological_profile(
+        candidates, num_voters, 'polarized', seed=1
+    )
+
+    print(f"\nSTV: {num_candidates} candidates, {num_voters:,} voters, "
+          f"{len(profile):,} unique ballots, {seats} seats")
+
+    configs = [
+        ('python', 'float'),
+        ('python', 'fixed'),
+        ('python', 'fraction'),
+        ('numpy', 'float'),
+        ('numpy', 'fixed'),
+    ]
+    for engine, arithmetic in configs:
+        elapsed, result = timed(
+            lambda: STVCalculator(stv_candidates, seats, engine=engine,
+                                  arithmetic=arithmetic).run_election(profile)
+        )
+        print(f"  {engine:>6} / {arithmetic:<8} {elapsed:9.2f} ms   elected {result['elected']}")
+
+
+def bench_stv_unique_ballots(num_candidates=50, num_ballots=5000, seats=10):
+    """STV engines on many unique full rankings (worst case for the Python loop)"""
+    from calculators import BallotProfile
+
+    rng = np.random.default_rng(0)
+    candidates = make_candidates(num_candidates)
+    stv_candidates = [STVCandidate(**c.__dict__) for c in candidates]
+    preferences = np.argsort(rng.random((num_ballots, num_candidates)), axis=1)
+    profile = BallotProfile(preferences, rng.integers(1, 100, num_ballots),
+                            [c.id for c in candidates])
+
+    print(f"\nSTV: {num_candidates} candidates, {num_ballots:,} unique ballots, {seats} seats")
+    for engine, arithmetic in [('python', 'float'), ('python', 'fraction'),
+                               ('numpy', 'float'), ('numpy', 'fixed')]:
+        elapsed, _ = timed(
+            lambda: STVCalculator(stv_candidates, seats, engine=engine,
+                                  arithmetic=arithmetic).run_election(profile)
+        )
+        print(f"  {engine:>6} / {arithmetic:<8} {elapsed:9.2f} ms")
+
+
+def bench_condorcet(num_candidates=50, num_ballots=100000):
+    """Pairwise matrix construction on many unique full rankings"""
+    from calculators import BallotProfile
+    from calculators.ranked_systems import CondorcetCalculator, Candidate as RankedCandidate
+
+    rng = np.random.default_rng(0)
+    candidates = [RankedCandidate(**c.__dict__) for c in make_candidates(num_candidates)]
+    preferences = np.argsort(rng.random((num_ballots, num_candidates)), axis=1)
+    counts = rng.integers(1, 100, num_ballots)
+
+    print(f"\nCondorcet: {num_candidates} candidates, {num_ballots:,} unique ballots")
+    elapsed, result = timed(
+        lambda: CondorcetCalculator(candidates).calculate(
+            BallotProfile(preferences, counts, [c.id for c in candidates])
+        )
+    )
+    print(f"  pairwise + analysis {elapsed:9.2f} ms   winner {result['condorcet_winner']}")
+
+
+def bench_positional(num_candidates=50, num_ballots=100000):
+    """Several positional rules scored against one large profile"""
+    from calculators import BallotProfile
+    from calculators.ranked_systems import BordaCountCalculator, Candidate as RankedCandidate
+
+    rng = np.random.default_rng(0)
+    candidates = [RankedCandidate(**c.__dict__) for c in make_candidates(num_candidates)]
+    preferences = np.argsort(rng.random((num_ballots, num_candidates)), axis=1)
+    profile = BallotProfile(preferences, rng.integers(1, 100, num_ballots),
+                            [c.id for c in candidates])
+    rules = ['borda', 'dowdall', 'modified_borda', 'plurality']
+
+    print(f"\nPositional: {num_candidates} candidates, {num_ballots:,} unique ballots")
+    elapsed, _ = timed(lambda: BordaCountCalculator(candidates).calculate(profile))
+    print(f"  borda only          {elapsed:9.2f} ms")
+    elapsed, _ = timed(lambda: BordaCountCalculator(candidates).calculate_many(profile, rules))
+    print(f"  {len(rules)} rules together    {elapsed:9.2f} ms")
+
+
+def bench_apportionment(num_parties=1000, seats=5000):
+    """Divisor-search allocation against the seat-by-seat scan"""
+    from calculators.apportionment import allocate_seats
+
+    rng = np.random.default_rng(0)
+    votes = {p: int(v) for p, v in enumerate(rng.integers(1, 10 ** 6, num_parties))}
+
+    print(f"\nApportionment: {num_parties:,} parties, {seats:,} seats")
+    for method in ['dhondt', 'sainte_lague', 'huntington_hill', 'hare']:
+        elapsed, _ = timed(lambda: allocate_seats(votes, seats, method))
+        print(f"  {method:<16} {elapsed:9.2f} ms")
+
+
+def bench_multi_district(num_districts=650, num_candidates=3000, num_scenarios=100):
+    """Columnar FPTP over a national map and a stack of scenarios"""
+    from calculators.multi_district import MultiDistrictCalculator, DistrictMatrix, Candidate as MDCandidate
+
+    rng = np.random.default_rng(0)
+    candidates = [MDCandidate(**c.__dict__) for c in make_candidates(num_candidates)]
+    calculator = MultiDistrictCalculator(candidates, {})
+    votes = rng.integers(0, 20000, (num_districts, num_candidates))
+    matrix = DistrictMatrix(votes, [c.id for c in candidates], [c.party_id for c in candidates])
+    scenarios = rng.integers(0, 20000, (num_scenarios, num_districts, 8))
+    scenario_calculator = MultiDistrictCalculator(candidates[:8], {})
+
+    print(f"\nMulti-district: {num_districts} districts x {num_candidates:,} candidates")
+    elapsed, _ = timed(lambda: calculator.calculate_fptp_winners(matrix, include_districts=False))
+    print(f"  summary only        {elapsed:9.2f} ms")
+    elapsed, _ = timed(lambda: calculator.calculate_fptp_winners(matrix))
+    print(f"  with district rows  {elapsed:9.2f} ms")
+    elapsed, _ = timed(lambda: scenario_calculator.calculate_fptp_scenarios(scenarios))
+    print(f"  {num_scenarios} scenarios x 8   {elapsed:9.2f} ms")
+
+    # Bundestag-sized leveling: 299 districts, 299 list seats, 6 parties
+    leveling_calculator = MultiDistrictCalculator(candidates[:6], {})
+    districts = DistrictMatrix(rng.integers(0, 20000, (299, 6)), list(range(1, 7)), list(range(1, 7)))
+    party_votes = {p: int(v) for p, v in zip(range(1, 7), rng.integers(10 ** 5, 10 ** 7, 6))}
+    for mode in ['overhang', 'leveling', 'capped']:
+        elapsed, result = timed(lambda: leveling_calculator.calculate_multi_district_mmp(
+            districts, party_votes, 299, mode=mode, include_districts=False))
+        print(f"  MMP {mode:<15} {elapsed:9.2f} ms   house {result['final_parliament_size']}")
+
+
+def bench_batch(num_candidates=12, num_voters=500000, workers=4):
+    """Every batch system on one profile, serially and across worker processes"""
+    from calculators.batch import run_systems, SYSTEM_RUNNERS
+
+    candidates = make_candidates(num_candidates)
+    profile = BallotGenerator.generate_ideological_profile(candidates, num_voters, 'polarized', seed=1)
+    systems = list(SYSTEM_RUNNERS)
+
+    print(f"\nBatch: {len(systems)} systems, {num_candidates} candidates, {len(profile):,} unique ballots")
+    for max_workers in [1, workers]:
+        elapsed, batch = timed(lambda: run_systems(profile, [c.__dict__ for c in candidates],
+                                                   systems, {'seats': 5}, max_workers=max_workers))
+        slowest = max(batch['timings_ms'], key=batch['timings_ms'].get)
+        print(f"  {max_workers} worker(s)         {elapsed:9.2f} ms   slowest {slowest}")
+
+
+def bench_ingest(num_ballots=1000000, num_candidates=8):
+    """Streamed NDJSON ingestion of many ballots over few distinct rankings"""
+    import json
+    from calculators.ingest import read_ndjson
+
+    rng = np.random.default_rng(0)
+    candidates = [{'id': i, 'name': f"Candidate {i}"} for i in range(1, num_candidates + 1)]
+    pool = [json.dumps((rng.permutation(num_candidates)[:4] + 1).tolist()).encode() + b'\n'
+            for _ in range(300)]
+    choice = rng.integers(0, len(pool), num_ballots)
+
+    def lines():
+        yield json.dumps({'candidates': candidates}).encode() + b'\n'
+        for i in choice:
+            yield pool[i]
+
+    print(f"\nIngest: {num_ballots:,} NDJSON ballot lines")
+    elapsed, (_, tally) = timed(lambda: read_ndjson(lines()), repeat=1)
+    print(f"  {elapsed:9.2f} ms   {len(tally)} unique rankings")
+
+
+def bench_counterfactual(num_candidates=12, num_ballots=100000, max_withdrawn=3):
+    """Withdrawal sweep: memoized engine against one full IRV count per query"""
+    from calculators.counterfactual import CounterfactualEngine, restrict_profile
+    from calculators.profile import BallotProfile
+
+    rng = np.random.default_rng(0)
+    candidates = [c.__dict__ for c in make_candidates(num_candidates)]
+    preferences = np.argsort(rng.random((num_ballots, num_candidates)) + np.linspace(0, 0.3, num_candidates), axis=1)
+    profile = BallotProfile(preferences, np.ones(num_ballots, dtype=np.int64), [c['id'] for c in candidates])
+
+    print(f"\nCounterfactual: {num_candidates} candidates, {num_ballots:,} unique ballots, "
+          f"withdrawals of up to {max_withdrawn}")
+    elapsed, engine = timed(lambda: CounterfactualEngine(candidates, profile), repeat=1)
+    sweep, rows = timed(lambda: engine.subset_withdrawals(max_withdrawn), repeat=1)
+    print(f"  memoized {elapsed + sweep:9.2f} ms   {len(rows)} queries, {engine.stats()}")
+
+    sample = rows[:20]
+
+    def full_counts():
+        for row in sample:
+            keep = np.isin(profile.candidate_ids, row['withdrawn'], invert=True)
+            remaining = [STVCandidate(**c) for c, k in zip(candidates, keep) if k]
+            STVCalculator(remaining, 1, engine='numpy').run_election(restrict_profile(profile, keep))
+
+    elapsed, _ = timed(full_counts, repeat=1)
+    print(f"  full     {elapsed / len(sample) * len(rows):9.2f} ms   (extrapolated from {len(sample)} counts)")
+
+
+if __name__ == '__main__':
+    print("⏱️  Electoral Systems Simulator Benchmarks")
+    print("=" * 60)
+    bench_stv_arithmetic()
+    bench_stv_unique_ballots()
+    bench_condorcet()
+    bench_positional()
+    bench_apportionment()
+    bench_multi_district()
+    bench_batch()
+    bench_ingest()
+    bench_counterfactual()
+    print("=" * 60)
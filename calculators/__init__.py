@@ -5,12 +5,14 @@ Exports all calculator classes
 
 from .stv import STVCalculator, Candidate as STVCandidate, Ballot as STVBallot
 from .strategic import StrategicVotingSimulator, Candidate as StratCandidate
+from .profile import BallotProfile
 from .ballot_gen import BallotGenerator, Candidate as BallotCandidate, Ballot as GenBallot
 
 __all__ = [
     'STVCalculator',
     'StrategicVotingSimulator', 
     'BallotGenerator',
+    'BallotProfile',
     'STVCandidate',
     'STVBallot',
     'StratCandidate',
@@ -0,0 +1,264 @@
+"""
+Seat Apportionment Engine
+Highest-averages (divisor) and largest-remainder allocation
+
+Divisor methods start from a Jefferson-style divisor search: pick a vote
+threshold, give every party all of its quotients above it in one step, then
+hand out the last few seats from a priority queue. The cost is about
+O(parties log parties) rather than one full scan of the parties per seat.
+
+Tie-breaking is deterministic: when two quotients (or remainders) are equal,
+the seat goes to the party listed first in the input.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, Optional
+
+
+def _dhondt(k: np.ndarray) -> np.ndarray:
+    return k + 1
+
+
+def _sainte_lague(k: np.ndarray) -> np.ndarray:
+    return 2 * k + 1
+
+
+def _modified_sainte_lague(k: np.ndarray) -> np.ndarray:
+    return np.where(k == 0, 1.4, 2 * k + 1)
+
+
+def _danish(k: np.ndarray) -> np.ndarray:
+    return 3 * k + 1
+
+
+def _imperiali(k: np.ndarray) -> np.ndarray:
+    return k + 2
+
+
+def _huntington_hill(k: np.ndarray) -> np.ndarray:
+    return np.sqrt(k * (k + 1))
+
+
+# Divisor applied to a party already holding k seats
+DIVISOR_METHODS = {
+    'dhondt': _dhondt,
+    'sainte_lague': _sainte_lague,
+    'modified_sainte_lague': _modified_sainte_lague,
+    'danish': _danish,
+    'imperiali': _imperiali,
+    'huntington_hill': _huntington_hill,
+}
+
+LARGEST_REMAINDER_METHODS = ('hare', 'droop')
+
+METHOD_ALIASES = {
+    'd_hondt': 'dhondt',
+    'jefferson': 'dhondt',
+    'sainte-lague': 'sainte_lague',
+    'saintelague': 'sainte_lague',
+    'webster': 'sainte_lague',
+    'modified-sainte-lague': 'modified_sainte_lague',
+    'huntington-hill': 'huntington_hill',
+    'hare_lr': 'hare',
+    'droop_lr': 'droop',
+}
+
+
+def normalize_method(method: str) -> str:
+    """Canonical method name, accepting the spellings used by the front end"""
+    method = METHOD_ALIASES.get(method, method)
+    if method not in DIVISOR_METHODS and method not in LARGEST_REMAINDER_METHODS:
+        raise ValueError(f'Unknown allocation method: {method}')
+    return method
+
+
+def allocate_seats(party_votes: Dict[int, float],
+                   seats: int,
+                   method: str = 'dhondt',
+                   initial: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+    """
+    Allocate seats to parties
+
+    Args:
+        party_votes: Map party_id -> votes, in tie-breaking order
+        seats: Number of seats to hand out
+        method: 'dhondt', 'sainte_lague', 'modified_sainte_lague', 'danish',
+            'imperiali', 'huntington_hill', 'hare' or 'droop'
+        initial: Seats each party already holds (divisor methods only). The
+            divisors continue from there, as in additional-member systems
+            where district seats count toward the list allocation.
+
+    Returns:
+        Map party_id -> seats allocated here (excluding `initial`)
+    """
+    party_ids = list(party_votes.keys())
+    votes = np.array([party_votes[p] for p in party_ids], dtype=np.float64)
+    held = np.array([(initial or {}).get(p, 0) for p in party_ids], dtype=np.int64)
+
+    allocation = allocate_array(votes, seats, method, held)
+    return {p: int(a) for p, a in zip(party_ids, allocation)}
+
+
+def allocate_array(votes: np.ndarray,
+                   seats: int,
+                   method: str = 'dhondt',
+                   initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """Array form of allocate_seats: seats per position of `votes`"""
+    method = normalize_method(method)
+    votes = np.asarray(votes, dtype=np.float64)
+
+    if (votes < 0).any():
+        raise ValueError('Party votes cannot be negative')
+    if seats < 0:
+        raise ValueError('Seats cannot be negative')
+
+    if method in LARGEST_REMAINDER_METHODS:
+        if initial is not None and np.any(initial):
+            raise ValueError(f'{method} quota does not support pre-allocated seats')
+        return _largest_remainder(votes, seats, method)
+
+    if initial is None:
+        initial = np.zeros(len(votes), dtype=np.int64)
+    return _highest_averages(votes, seats, DIVISOR_METHODS[method], np.asarray(initial, dtype=np.int64))
+
+
+def minimum_house_size(votes: np.ndarray,
+                       minimum: np.ndarray,
+                       seats: int,
+                       method: str = 'dhondt') -> int:
+    """
+    Smallest house size (at least `seats`) whose divisor allocation gives
+    every party at least `minimum` seats, as in MMP leveling
+
+    Divisor methods are house-monotone, so the answer is fixed by a single
+    divisor: the smallest quotient any party still needs,
+    min v_p / d(minimum_p - 1). Every larger quotient is awarded first and
+    ties go to parties in listing order, so the size is counted straight off
+    a quotient table instead of re-running the allocation for each size.
+    """
+    method = normalize_method(method)
+    if method not in DIVISOR_METHODS:
+        raise ValueError(f'{method} is not a divisor method; leveling needs a house-monotone allocation')
+
+    votes = np.asarray(votes, dtype=np.float64)
+    minimum = np.asarray(minimum, dtype=np.int64)
+    needed = minimum > 0
+    if not needed.any():
+        return seats
+    if (votes[needed] == 0).any():
+        raise ValueError('A party with no votes cannot be guaranteed seats')
+
+    divisor = DIVISOR_METHODS[method]
+    last_needed = quotient(votes[needed], minimum[needed] - 1, divisor)
+    cutoff = last_needed.min()
+
+    # Widen the quotient table until every party's row ends below the cutoff
+    width = int(minimum.max()) + 1
+    while True:
+        table = quotient(votes[:, None], np.arange(width)[None, :], divisor)
+        if (table[:, -1] < cutoff).all():
+            break
+        width *= 2
+
+    # Ties at the cutoff are awarded in party order up to the last party needing one
+    tied_parties = np.flatnonzero(needed)[last_needed == cutoff]
+    size = int((table > cutoff).sum()) + int((table[:tied_parties.max() + 1] == cutoff).sum())
+    return max(seats, size)
+
+
+def quotient(votes: np.ndarray, held: np.ndarray, divisor) -> np.ndarray:
+    """Next quotient for each party; a zero divisor means an unconditional seat"""
+    d = divisor(held).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = votes / d
+    return np.where(votes == 0, 0.0, q)
+
+
+def _highest_averages(votes: np.ndarray, seats: int, divisor, initial: np.ndarray) -> np.ndarray:
+    """Jefferson-style divisor search followed by a heap for the last seats"""
+    allocation = np.zeros(len(votes), dtype=np.int64)
+    if seats == 0 or len(votes) == 0:
+        return allocation
+
+    total = votes.sum()
+    if total > 0:
+        allocation = _seats_above_threshold(votes, seats, divisor, initial)
+
+    # Hand out what is left one seat at a time, largest quotient first
+    remaining = seats - int(allocation.sum())
+    next_quotient = quotient(votes, initial + allocation, divisor)
+    heap = [(-q, i) for i, q in enumerate(next_quotient)]
+    heapq.heapify(heap)
+
+    for _ in range(remaining):
+        _, i = heapq.heappop(heap)
+        allocation[i] += 1
+        q = quotient(votes[i:i + 1], initial[i:i + 1] + allocation[i:i + 1], divisor)[0]
+        heapq.heappush(heap, (-q, i))
+
+    return allocation
+
+
+def _seats_above_threshold(votes: np.ndarray, seats: int, divisor, initial: np.ndarray) -> np.ndarray:
+    """
+    Seats from quotients strictly above a divisor threshold, with the
+    threshold bisected so that at most `seats` (and at least seats - parties)
+    are given out
+    """
+    parties = len(votes)
+    table = divisor(np.arange(int(initial.max()) + seats + 1)).astype(np.float64)
+
+    def seats_at(threshold: float) -> np.ndarray:
+        # Number of divisors d(k), k >= initial, with votes / d(k) > threshold
+        with np.errstate(divide='ignore'):
+            limit = votes / threshold
+        above = np.searchsorted(table, limit, side='left') - initial
+        above = np.clip(above, 0, seats)
+
+        # Settle float disagreements between d(k) < v/t and v/d(k) > t
+        last = quotient(votes, initial + above - 1, divisor)
+        above = np.where((above > 0) & ~(last > threshold), above - 1, above)
+        after = quotient(votes, initial + above, divisor)
+        return np.where((above < seats) & (after > threshold), above + 1, above)
+
+    low, high = 0.0, float(votes.max()) / max(float(table[0]), 1e-12) + 1.0
+    threshold = votes.sum() / seats
+    for _ in range(64):
+        allocation = seats_at(threshold)
+        given = int(allocation.sum())
+        if given > seats:
+            low = threshold
+        elif given < seats - parties:
+            high = threshold
+        else:
+            return allocation
+        threshold = (low + high) / 2
+
+    return np.zeros(parties, dtype=np.int64)
+
+
+def _largest_remainder(votes: np.ndarray, seats: int, method: str) -> np.ndarray:
+    """Hare or Droop quota, remaining seats by largest remainder"""
+    allocation = np.zeros(len(votes), dtype=np.int64)
+    total = votes.sum()
+    if total == 0 or seats == 0 or len(votes) == 0:
+        return allocation
+
+    if method == 'hare':
+        quota = total / seats
+    else:
+        quota = np.floor(total / (seats + 1)) + 1
+
+    exact = votes / quota
+    allocation = np.floor(exact).astype(np.int64)
+    remainders = exact - allocation
+
+    remaining = seats - int(allocation.sum())
+    order = np.argsort(-remainders, kind='stable')
+    while remaining > 0:
+        take = order[:remaining]
+        allocation[take] += 1
+        remaining -= len(take)
+
+    return allocation
@@ -4,10 +4,14 @@ Generate realistic voter preference ballots based on ideological distributions
 """
 
 import numpy as np
-from typing import List
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 
+from .profile import BallotProfile
+from .spatial import SpatialModel, default_positions
+from .cultures import generate_culture, is_culture
+from .cardinal import ScoreProfile, generate_electorate
+
 
 @dataclass
 class Candidate:
@@ -34,7 +38,8 @@ class BallotGenerator:
     @staticmethod
     def generate_ideological_ballots(candidates: List[Candidate],
                                      num_voters: int,
-                                     distribution: str = 'normal') -> List[Ballot]:
+                                     distribution: str = 'normal',
+                                     seed: Optional[Union[int, np.random.Generator]] = None) -> List[Ballot]:
         """
         Generate ballots with preferences based on ideological spectrum
         
@@ -47,55 +52,168 @@ class BallotGenerator:
                 - 'left': Skewed left
                 - 'right': Skewed right
                 - 'uniform': Even distribution
+            seed: Integer seed or numpy Generator for reproducible runs
                 
         Returns:
             List of aggregated Ballot objects
         """
+        profile = BallotGenerator.generate_ideological_profile(
+            candidates, num_voters, distribution, seed
+        )
+        return profile.to_ballots(Ballot)
+    
+    @staticmethod
+    def generate_ideological_profile(candidates: List[Candidate],
+                                     num_voters: int,
+                                     distribution: str = 'normal',
+                                     seed: Optional[Union[int, np.random.Generator]] = None) -> BallotProfile:
+        """
+        Same as generate_ideological_ballots but returns a BallotProfile
+        
+        All voter positions are drawn in a single array call. Because candidates
+        sit on a line, a voter's proximity ranking only changes when they cross
+        the midpoint between two candidates, so voters are bucketed by those
+        breakpoints and each occupied bucket is ranked once.
+        """
+        rng = np.random.default_rng(seed)
         
         # Assign ideological positions to candidates (0=left, 1=right)
         num_candidates = len(candidates)
         candidate_positions = np.linspace(0, 1, num_candidates)
         
-        ballots = []
+        voter_positions = BallotGenerator._draw_positions(rng, num_voters, distribution)
         
-        for _ in range(num_voters):
-            # Generate voter's ideological position
-            if distribution == 'normal':
-                voter_position = np.random.normal(0.5, 0.2)
-            elif distribution == 'polarized':
-                if np.random.random() < 0.5:
-                    voter_position = np.random.normal(0.2, 0.1)
-                else:
-                    voter_position = np.random.normal(0.8, 0.1)
-            elif distribution == 'left':
-                voter_position = np.random.beta(2, 5)
-            elif distribution == 'right':
-                voter_position = np.random.beta(5, 2)
-            else:  # uniform
-                voter_position = np.random.random()
-            
-            # Clip to [0, 1]
-            voter_position = np.clip(voter_position, 0, 1)
-            
-            # Calculate distances from voter to each candidate
-            distances = np.abs(candidate_positions - voter_position)
-            
-            # Rank candidates by proximity (closest first)
-            ranked_indices = np.argsort(distances)
-            preferences = [candidates[i].id for i in ranked_indices]
-            
-            ballots.append(Ballot(preferences=preferences, count=1))
+        # Rankings only change at midpoints between pairs of candidates
+        left, right = np.triu_indices(num_candidates, k=1)
+        breakpoints = np.unique((candidate_positions[left] + candidate_positions[right]) / 2)
         
-        # Aggregate identical ballots
-        ballot_dict = defaultdict(int)
-        for ballot in ballots:
-            key = tuple(ballot.preferences)
-            ballot_dict[key] += 1
+        # side='left' keeps a voter sitting exactly on a midpoint with the
+        # left-hand candidate first, as a stable argsort of distances would
+        regions = np.searchsorted(breakpoints, voter_positions, side='left')
+        occupied, counts = np.unique(regions, return_counts=True)
         
-        aggregated = [
-            Ballot(preferences=list(prefs), count=count)
-            for prefs, count in ballot_dict.items()
-        ]
+        # Rank each occupied region once, using a point strictly inside it
+        edges = np.concatenate(([-1.0], breakpoints, [2.0]))
+        representatives = (edges[occupied] + edges[occupied + 1]) / 2
+        distances = np.abs(candidate_positions[None, :] - representatives[:, None])
+        rankings = np.argsort(distances, axis=1, kind='stable')
         
-        return aggregated
-
+        return BallotProfile(rankings, counts, [c.id for c in candidates])
+    
+    @staticmethod
+    def generate_profile(candidates: List[Candidate],
+                         num_voters: int,
+                         distribution: str = 'normal',
+                         seed: Optional[Union[int, np.random.Generator]] = None,
+                         **culture_params: Any) -> BallotProfile:
+        """
+        Profile for any `distribution`: the ideological distributions above
+        or a statistical culture (see calculators.cultures.CULTURES and its
+        aliases such as 'ic', 'iac', 'urn')
+        
+        culture_params are passed to generate_culture: dispersion and
+        reference for Mallows, weights for Plackett-Luce, alpha for the urn.
+        """
+        if is_culture(distribution):
+            return generate_culture([c.id for c in candidates], num_voters, distribution,
+                                    seed=seed, **culture_params)
+        return BallotGenerator.generate_ideological_profile(candidates, num_voters, distribution, seed)
+    
+    @staticmethod
+    def generate_spatial_profile(candidates: List[Candidate],
+                                 num_voters: int,
+                                 positions: Optional[Sequence[Sequence[float]]] = None,
+                                 dimensions: Optional[int] = None,
+                                 salience: Optional[Sequence[float]] = None,
+                                 mixture: Optional[List[Dict[str, Any]]] = None,
+                                 distribution: str = 'normal',
+                                 noise: float = 0.0,
+                                 depth: Optional[int] = None,
+                                 seed: Optional[Union[int, np.random.Generator]] = None) -> BallotProfile:
+        """
+        Ballots from a multi-dimensional spatial model (see calculators.spatial)
+        
+        Args:
+            candidates: List of Candidate objects
+            num_voters: Number of voters to simulate
+            positions: Per-candidate coordinates, in candidate order; without
+                them candidates are spread along the first axis
+            dimensions: Number of issue dimensions when positions are not given
+                (default: the mixture's, otherwise 2)
+            salience: Weight of each dimension
+            mixture: Gaussian voter components [{"weight", "mean", "std"}]
+            distribution: Per-axis distribution when no mixture is given
+            noise: Standard deviation of utility noise
+            depth: Truncate ballots to each voter's top `depth` candidates
+            seed: Integer seed or numpy Generator for reproducible runs
+        """
+        model = BallotGenerator.spatial_model(candidates, positions, dimensions, salience,
+                                              mixture, distribution, noise, depth)
+        return model.generate([c.id for c in candidates], num_voters, seed)
+    
+    @staticmethod
+    def spatial_model(candidates: List[Candidate],
+                      positions: Optional[Sequence[Sequence[float]]] = None,
+                      dimensions: Optional[int] = None,
+                      salience: Optional[Sequence[float]] = None,
+                      mixture: Optional[List[Dict[str, Any]]] = None,
+                      distribution: str = 'normal',
+                      noise: float = 0.0,
+                      depth: Optional[int] = None) -> SpatialModel:
+        """SpatialModel for generate_spatial_profile's arguments"""
+        if positions is None:
+            if dimensions is None:
+                dimensions = len(mixture[0]['mean']) if mixture and np.ndim(mixture[0]['mean']) else 2
+            positions = default_positions(len(candidates), dimensions)
+        return SpatialModel(positions, salience, mixture, distribution, noise, depth)
+    
+    @staticmethod
+    def generate_electorate(candidates: List[Candidate],
+                            num_voters: int,
+                            distribution: str = 'normal',
+                            seed: Optional[Union[int, np.random.Generator]] = None,
+                            max_score: int = 5,
+                            spatial: Optional[Dict[str, Any]] = None,
+                            ranked: bool = True) -> Tuple[Optional[BallotProfile], ScoreProfile]:
+        """
+        Ranked and score ballots cast by the same voters
+        
+        Without `spatial` this is the ideological model: candidates evenly
+        spaced on one axis and voters drawn from `distribution`. Otherwise
+        `spatial` holds generate_spatial_profile's model arguments. With
+        `ranked` off only the score ballots are drawn (the profile is None).
+        
+        Either way the voters are those of the matching ranked generator with
+        the same seed (generate_ideological_profile, which draws every
+        position in one call, or generate_spatial_profile), so the rankings
+        do not depend on whether score ballots are drawn too.
+        """
+        candidate_ids = [c.id for c in candidates]
+        if spatial is not None:
+            model = BallotGenerator.spatial_model(candidates, distribution=distribution, **spatial)
+            return generate_electorate(model, candidate_ids, num_voters, seed, max_score, ranked=ranked)
+        
+        rng = np.random.default_rng(seed)
+        model = SpatialModel(default_positions(len(candidates), 1), distribution=distribution)
+        voters = BallotGenerator._draw_positions(rng, num_voters, distribution)[:, None]
+        return generate_electorate(model, candidate_ids, num_voters, rng, max_score, ranked=ranked, voters=voters)
+    
+    @staticmethod
+    def _draw_positions(rng: np.random.Generator,
+                        num_voters: int,
+                        distribution: str) -> np.ndarray:
+        """Draw every voter's ideological position on [0, 1] in one call"""
+        if distribution == 'normal':
+            positions = rng.normal(0.5, 0.2, num_voters)
+        elif distribution == 'polarized':
+            centers = np.where(rng.random(num_voters) < 0.5, 0.2, 0.8)
+            positions = centers + rng.normal(0.0, 0.1, num_voters)
+        elif distribution == 'left':
+            positions = rng.beta(2, 5, num_voters)
+        elif distribution == 'right':
+            positions = rng.beta(5, 2, num_voters)
+        else:  # uniform
+            positions = rng.random(num_voters)
+        
+        # Clip to [0, 1]
+        return np.clip(positions, 0, 1)
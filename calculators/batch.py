@@ -0,0 +1,333 @@
+"""
+Batch Simulation
+Runs several electoral systems on one ballot profile in parallel worker processes
+
+The profile's arrays are copied once into shared memory; workers map them
+back into a BallotProfile without pickling the ballots. Each system reports
+its own run time. With one worker (or a single system) everything runs in
+this process instead.
+
+Cardinal systems (approval, score, STAR) count a ScoreProfile of the same
+electorate when one is given. They are a few array reductions, so they run
+in this process while the ranked systems go to the workers.
+"""
+
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Tuple
+
+from .profile import BallotProfile
+from .stv import STVCalculator, Candidate as STVCandidate
+from .ranked_systems import BordaCountCalculator, CondorcetCalculator, Candidate as RankedCandidate
+from .irv import IRVCalculator, Candidate as IRVCandidate
+from .apportionment import allocate_seats
+from .cardinal import ScoreProfile, approval_result, score_result, star_result
+
+
+# ----------------------------------------------------------------------
+# System runners: (profile, candidate dicts, options) -> results
+# ----------------------------------------------------------------------
+
+def first_preferences(profile: BallotProfile) -> np.ndarray:
+    """Votes per candidate index counting only first preferences"""
+    if profile.preferences.shape[1] == 0:
+        return np.zeros(profile.num_candidates, dtype=np.int64)
+    first = profile.preferences[:, 0]
+    ranked = first != BallotProfile.PAD
+    votes = np.bincount(first[ranked], weights=profile.counts[ranked], minlength=profile.num_candidates)
+    return votes.astype(np.int64)
+
+
+def approvals(profile: BallotProfile, approve: int) -> np.ndarray:
+    """Voters approving each candidate when every voter approves their top `approve` choices"""
+    top = profile.preferences[:, :approve]
+    ranked = top != BallotProfile.PAD
+    weights = np.broadcast_to(profile.counts[:, None], top.shape)
+    votes = np.bincount(top[ranked], weights=weights[ranked], minlength=profile.num_candidates)
+    return votes.astype(np.int64)
+
+
+def _tally_results(candidates: List[Dict], votes: np.ndarray, method: str) -> Dict[str, Any]:
+    """Single-winner result for a per-candidate vote vector"""
+    total = int(votes.sum())
+    results = [
+        {
+            'id': c['id'],
+            'name': c['name'],
+            'party': c['party_name'],
+            'color': c['color'],
+            'votes': int(v),
+            'percentage': (int(v) / total * 100) if total > 0 else 0
+        }
+        for c, v in zip(candidates, votes)
+    ]
+    results.sort(key=lambda x: x['votes'], reverse=True)
+
+    if results:
+        results[0]['winner'] = True
+
+    return {
+        'results': results,
+        'winner': results[0]['id'] if results else None,
+        'total_votes': total,
+        'method': method
+    }
+
+
+def _run_fptp(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    return _tally_results(candidates, first_preferences(profile), 'First Past the Post')
+
+
+def _run_irv(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    return IRVCalculator([IRVCandidate(**c) for c in candidates]).calculate(profile)
+
+
+def _run_stv(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    stv_candidates = [STVCandidate(**c) for c in candidates]
+    return STVCalculator(stv_candidates, options.get('seats', 3), engine='numpy').run_election(profile)
+
+
+def _run_borda(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    calculator = BordaCountCalculator([RankedCandidate(**c) for c in candidates])
+    return calculator.calculate(profile, scoring=options.get('scoring', 'borda'))
+
+
+def _run_condorcet(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    calculator = CondorcetCalculator([RankedCandidate(**c) for c in candidates])
+    return calculator.calculate(profile, completion=options.get('completion'))
+
+
+def _run_approval(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    # Without score ballots, each voter approves the top half of their ranking
+    approve = options.get('approval_count') or math.ceil(len(candidates) / 2)
+    return _tally_results(candidates, approvals(profile, approve), f'Approval (top {approve})')
+
+
+def _run_party_list(profile: BallotProfile, candidates: List[Dict], options: Dict) -> Dict[str, Any]:
+    # First preferences pooled by party, then a proportional allocation
+    seats = options.get('seats', 3)
+    method = options.get('allocation_method', 'dhondt')
+
+    parties: Dict[int, Dict[str, Any]] = {}
+    for c, v in zip(candidates, first_preferences(profile).tolist()):
+        party = parties.setdefault(c['party_id'], {'party_name': c['party_name'], 'color': c['color'], 'votes': 0})
+        party['votes'] += v
+
+    allocation = allocate_seats({p: info['votes'] for p, info in parties.items()}, seats, method)
+    total = sum(info['votes'] for info in parties.values())
+
+    results = [
+        {
+            'party_id': party_id,
+            'party_name': info['party_name'],
+            'color': info['color'],
+            'votes': info['votes'],
+            'vote_share': (info['votes'] / total * 100) if total > 0 else 0,
+            'seats': allocation[party_id]
+        }
+        for party_id, info in parties.items()
+    ]
+    results.sort(key=lambda x: (x['seats'], x['votes']), reverse=True)
+
+    return {
+        'results': results,
+        'seats': seats,
+        'allocation_method': method
+    }
+
+
+SYSTEM_RUNNERS = {
+    'fptp': _run_fptp,
+    'irv': _run_irv,
+    'stv': _run_stv,
+    'borda': _run_borda,
+    'condorcet': _run_condorcet,
+    'approval': _run_approval,
+    'party_list': _run_party_list,
+}
+
+
+# Runners on score ballots: (scores, candidate dicts, options) -> results
+CARDINAL_RUNNERS = {
+    'approval': lambda scores, candidates, options: approval_result(
+        scores, candidates, options.get('approval_threshold')),
+    'score': lambda scores, candidates, options: score_result(scores, candidates),
+    'star': lambda scores, candidates, options: star_result(scores, candidates),
+}
+
+
+def _timed_run(system: str, profile: BallotProfile, candidates: List[Dict],
+               options: Dict, scores: Optional[ScoreProfile] = None) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    if scores is not None and system in CARDINAL_RUNNERS:
+        result = CARDINAL_RUNNERS[system](scores, candidates, options)
+    else:
+        result = SYSTEM_RUNNERS[system](profile, candidates, options)
+    return result, (time.perf_counter() - start) * 1000
+
+
+# ----------------------------------------------------------------------
+# Shared-memory profile transport
+# ----------------------------------------------------------------------
+
+class SharedProfile:
+    """
+    A profile's arrays copied into shared memory blocks
+
+    `handle` is a small picklable description (block names, shapes, dtypes
+    and candidate ids) that workers pass to `attach`. Use as a context
+    manager; the blocks are unlinked on exit.
+    """
+
+    ARRAYS = ('preferences', 'counts')
+
+    def __init__(self, profile: BallotProfile):
+        self._blocks = []
+        self.handle = {'candidate_ids': profile.candidate_ids, 'arrays': {}}
+
+        for key in self.ARRAYS:
+            array = np.ascontiguousarray(getattr(profile, key))
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self._blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.handle['arrays'][key] = (block.name, array.shape, array.dtype.str)
+
+    def __enter__(self) -> 'SharedProfile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    @staticmethod
+    def attach(handle: Dict[str, Any]) -> Tuple[BallotProfile, List[shared_memory.SharedMemory]]:
+        """Read-only profile viewing the shared blocks, plus the blocks to close afterwards"""
+        blocks = []
+        arrays = {}
+        for key, (name, shape, dtype) in handle['arrays'].items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            arrays[key].flags.writeable = False
+        return BallotProfile(arrays['preferences'], arrays['counts'], handle['candidate_ids']), blocks
+
+
+def _run_shared(system: str, handle: Dict[str, Any], candidates: List[Dict],
+                options: Dict) -> Tuple[Dict[str, Any], float]:
+    """Worker entry point: attach to the shared profile and run one system"""
+    profile, blocks = SharedProfile.attach(handle)
+    try:
+        return _timed_run(system, profile, candidates, options)
+    finally:
+        del profile
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # A view is still referenced (e.g. by a traceback); the
+                # mapping goes away with the worker
+                pass
+
+
+# ----------------------------------------------------------------------
+# Dispatch
+# ----------------------------------------------------------------------
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+def get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool shared across requests, created on first use"""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != max_workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(max_workers=max_workers)
+        _executor_workers = max_workers
+    return _executor
+
+
+def reset_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = None
+
+
+def run_systems(profile: BallotProfile,
+                candidates: List[Dict[str, Any]],
+                systems: List[str],
+                options: Optional[Dict[str, Any]] = None,
+                max_workers: int = 1,
+                scores: Optional[ScoreProfile] = None) -> Dict[str, Any]:
+    """
+    Run every system in `systems` on the same profile
+
+    Args:
+        profile: Ballot profile indexed by the candidates' ids, in order
+        candidates: Candidate dicts (id, name, party_id, party_name, color)
+        systems: Names from SYSTEM_RUNNERS or CARDINAL_RUNNERS
+        options: seats, allocation_method, scoring, completion,
+            approval_count, approval_threshold
+        max_workers: Worker processes; 1 runs everything in this process
+        scores: Score ballots of the same voters, for the cardinal systems
+            ('score' and 'star' need them; 'approval' falls back to approving
+            the top of each ranking)
+
+    Returns:
+        Dictionary with results and timings_ms keyed by system, and whether
+        the run was parallel
+    """
+    unknown = [s for s in systems if s not in SYSTEM_RUNNERS and s not in CARDINAL_RUNNERS]
+    if unknown:
+        raise ValueError(f'Unknown system: {unknown[0]}')
+    if scores is None:
+        needs_scores = [s for s in systems if s not in SYSTEM_RUNNERS]
+        if needs_scores:
+            raise ValueError(f'{needs_scores[0]} needs score ballots from a spatial or ideological electorate')
+    elif scores.candidate_ids != [int(c['id']) for c in candidates]:
+        raise ValueError('Score ballots must cover the candidates in order')
+
+    options = options or {}
+    systems = list(dict.fromkeys(systems))
+    profile = BallotProfile.coerce(profile, [c['id'] for c in candidates])
+    cardinal = [s for s in systems if scores is not None and s in CARDINAL_RUNNERS]
+    ranked = [s for s in systems if s not in cardinal]
+    outcomes = None
+
+    if max_workers > 1 and len(ranked) > 1:
+        try:
+            executor = get_executor(max_workers)
+            with SharedProfile(profile) as shared:
+                futures = {
+                    system: executor.submit(_run_shared, system, shared.handle, candidates, options)
+                    for system in ranked
+                }
+                outcomes = {system: _timed_run(system, profile, candidates, options, scores)
+                            for system in cardinal}
+                outcomes.update({system: future.result() for system, future in futures.items()})
+        except (BrokenProcessPool, OSError):
+            # No usable worker pool or shared memory here; run serially
+            reset_executor()
+            outcomes = None
+
+    parallel = outcomes is not None
+    if outcomes is None:
+        outcomes = {system: _timed_run(system, profile, candidates, options, scores) for system in systems}
+    outcomes = {system: outcomes[system] for system in systems}
+
+    return {
+        'results': {system: result for system, (result, _) in outcomes.items()},
+        'timings_ms': {system: elapsed for system, (_, elapsed) in outcomes.items()},
+        'parallel': parallel
+    }
@@ -0,0 +1,233 @@
+"""
+Result Cache
+Content-addressed cache of calculator results with LRU, size and TTL eviction
+
+Keys are SHA-256 digests of the system name, the candidate list, the
+normalized ballot profile and the options that affect the result. Profiles
+are normalized before hashing (trailing padding trimmed, identical rankings
+merged, rows sorted, empty rows dropped), so the same electorate hashes the
+same however its ballots were ordered, split or uploaded.
+
+Entries live in an in-memory LRU table. With a database path they are also
+written to a SQLite table, so results survive restarts and are shared by
+every process using the same database.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .profile import BallotProfile
+
+
+# Bump when a calculator's output changes so persisted results are not reused
+KEY_VERSION = 1
+
+
+def profile_digest(profile: BallotProfile) -> str:
+    """SHA-256 of a profile's canonical form"""
+    keep = profile.counts > 0
+    preferences = profile.preferences[keep]
+    counts = profile.counts[keep]
+
+    width = int((preferences != BallotProfile.PAD).sum(axis=1).max()) if len(preferences) else 0
+    canonical = BallotProfile(preferences[:, :width], counts, profile.candidate_ids).aggregate()
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([canonical.candidate_ids, list(canonical.preferences.shape)]).encode())
+    digest.update(np.ascontiguousarray(canonical.preferences, dtype='<i4').tobytes())
+    digest.update(np.ascontiguousarray(canonical.counts, dtype='<i8').tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(system: str,
+              candidates: List[Dict[str, Any]],
+              profile: BallotProfile,
+              options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Canonical key for one calculation
+
+    Candidate order is kept (it decides ties); option keys are sorted and
+    options set to None are dropped, so an omitted option and an explicit
+    null give the same key.
+    """
+    options = {k: v for k, v in (options or {}).items() if v is not None}
+    header = json.dumps(
+        [KEY_VERSION, system, candidates, options],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(f'{header}|{profile_digest(profile)}'.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of JSON-serializable results
+
+    Args:
+        max_entries: Entries kept in memory (and in SQLite); 0 disables the cache
+        ttl: Seconds an entry stays valid; 0 or None keeps entries until evicted
+        db_path: SQLite database to persist entries in, or None for memory only
+        clock: Time source in seconds (injectable for tests)
+    """
+
+    TABLE = 'result_cache'
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl: Optional[float] = 3600,
+                 db_path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl or None
+        self.db_path = db_path
+        self.clock = clock
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        key TEXT PRIMARY KEY,
+                        system TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        used_at REAL NOT NULL
+                    )
+                ''')
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result for `key`, or None (counted as a miss)"""
+        if not self.enabled:
+            return None
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expirations += 1
+
+        result = self._load(key, now) if self.db_path else None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, result[0], result[1])
+            return result[0]
+
+    def put(self, key: str, system: str, value: Any) -> None:
+        """Store a result; it must be JSON-serializable when persisting"""
+        if not self.enabled:
+            return
+        now = self.clock()
+        with self._lock:
+            self._remember(key, value, now)
+        if self.db_path:
+            self._store(key, system, value, now)
+
+    def _remember(self, key: str, value: Any, created_at: float) -> None:
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: str, now: float) -> Optional[tuple]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f'SELECT result, created_at FROM {self.TABLE} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1], now):
+                conn.execute(f'DELETE FROM {self.TABLE} WHERE key = ?', (key,))
+                with self._lock:
+                    self.expirations += 1
+                return None
+            conn.execute(f'UPDATE {self.TABLE} SET used_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0]), row[1]
+
+    def _store(self, key: str, system: str, value: Any, now: float) -> None:
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            # Not JSON-serializable; keep it in memory only
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO {self.TABLE} (key, system, result, created_at, used_at) '
+                f'VALUES (?, ?, ?, ?, ?)',
+                (key, system, text, now, now)
+            )
+            if self.ttl is not None:
+                conn.execute(f'DELETE FROM {self.TABLE} WHERE created_at < ?', (now - self.ttl,))
+            # Keep the table to max_entries, dropping the least recently used
+            conn.execute(
+                f'DELETE FROM {self.TABLE} WHERE key NOT IN '
+                f'(SELECT key FROM {self.TABLE} ORDER BY used_at DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        """Drop every entry (memory and SQLite); counters are kept"""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(f'DELETE FROM {self.TABLE}')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'persistent': bool(self.db_path),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+        if self.db_path:
+            with self._connect() as conn:
+                stats['persisted_entries'] = conn.execute(f'SELECT COUNT(*) FROM {self.TABLE}').fetchone()[0]
+        return stats
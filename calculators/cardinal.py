@@ -0,0 +1,279 @@
+"""
+Cardinal Ballots
+Approval, score (range) and STAR voting on a compact score matrix
+
+Score ballots are stored like ranked ones: one row per distinct ballot in a
+(ballots x candidates) uint8 matrix plus an int64 count vector. Every count
+is then a reduction over that matrix: approvals and score totals are a
+single count-weighted product, and the STAR runoff compares two columns.
+Ties go to the first-listed candidate, as in the ranked calculators.
+
+Cardinal ballots are derived from the spatial model: each voter's utilities
+are rescaled so their favourite gets max_score and their least favourite 0.
+The same voters also produce the ranked profile, so ranked and cardinal
+systems can be compared on one electorate.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple, Union
+
+from .profile import BallotProfile
+from .spatial import CHUNK_CELLS, SpatialModel
+
+
+class ScoreProfile:
+    """
+    Aggregated score ballots
+
+    - scores: (unique ballots x candidates) uint8 matrix, 0..max_score
+    - counts: int64 vector with the number of voters casting each row
+    - candidate_ids: candidate id for every column
+    """
+
+    __slots__ = ('scores', 'counts', 'candidate_ids', 'max_score')
+
+    def __init__(self, scores: np.ndarray, counts: np.ndarray, candidate_ids: Sequence[int], max_score: int = 5):
+        if not 1 <= max_score <= 255:
+            raise ValueError('max_score must be between 1 and 255')
+        scores = np.asarray(scores)
+        if scores.ndim != 2 or scores.shape[1] != len(candidate_ids):
+            raise ValueError('Scores must be a (ballots x candidates) matrix')
+        if len(scores) and (scores.min() < 0 or scores.max() > max_score):
+            raise ValueError(f'Scores must be between 0 and {max_score}')
+        counts = np.asarray(counts, dtype=np.int64)
+        if len(counts) != len(scores):
+            raise ValueError('scores and counts must have the same number of rows')
+
+        self.scores = scores.astype(np.uint8)
+        self.counts = counts
+        self.candidate_ids = [int(cid) for cid in candidate_ids]
+        self.max_score = int(max_score)
+
+    @classmethod
+    def from_dicts(cls, ballots: Iterable[Dict[str, Any]], candidate_ids: Sequence[int],
+                   max_score: int = 5) -> 'ScoreProfile':
+        """
+        Build a profile from JSON ballots: {"scores": {"<id>": s, ...}, "count": n}
+        (unscored candidates get 0) or {"approved": [ids], "count": n}
+        """
+        index = {int(cid): i for i, cid in enumerate(candidate_ids)}
+        rows, counts = [], []
+        for ballot in ballots:
+            row = np.zeros(len(index), dtype=np.int64)
+            try:
+                if 'approved' in ballot:
+                    row[[index[int(cid)] for cid in ballot['approved']]] = max_score
+                else:
+                    for cid, score in ballot['scores'].items():
+                        row[index[int(cid)]] = score
+            except KeyError as e:
+                raise ValueError(f'Ballot references unknown candidate id {e.args[0]}')
+            rows.append(row)
+            counts.append(ballot.get('count', 1))
+        scores = np.array(rows, dtype=np.int64).reshape(len(rows), len(index))
+        return cls(scores, np.array(counts, dtype=np.int64), candidate_ids, max_score).aggregate()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @property
+    def total_votes(self) -> int:
+        return int(self.counts.sum())
+
+    def aggregate(self) -> 'ScoreProfile':
+        """
+        Merge identical ballots, through one integer key per row when it
+        fits in int64 and otherwise by sorting the rows as byte strings
+        """
+        if len(self) == 0:
+            return self
+        n = self.scores.shape[1]
+        if n * np.log2(self.max_score + 1) >= 62:
+            keys = np.ascontiguousarray(self.scores).view(np.dtype((np.void, n)))[:, 0]
+        else:
+            keys = np.zeros(len(self), dtype=np.int64)
+            for column in self.scores.T:
+                keys = keys * (self.max_score + 1) + column
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        return ScoreProfile(self.scores[order[starts]], np.add.reduceat(self.counts[order], starts),
+                            self.candidate_ids, self.max_score)
+
+    def score_totals(self) -> np.ndarray:
+        """Total score per candidate"""
+        return self.counts @ self.scores.astype(np.int64)
+
+    def approved(self, threshold: Optional[int] = None) -> np.ndarray:
+        """(ballots x candidates) bool matrix of scores at least `threshold` (default: above the midpoint)"""
+        if threshold is None:
+            threshold = approval_threshold(self.max_score)
+        return self.scores >= threshold
+
+    def approvals(self, threshold: Optional[int] = None) -> np.ndarray:
+        """Voters approving each candidate, as in `approved`"""
+        return self.counts @ self.approved(threshold).astype(np.int64)
+
+    def preference_counts(self, a: int, b: int) -> Tuple[int, int]:
+        """Voters scoring candidate index a above b, and b above a"""
+        diff = self.scores[:, a].astype(np.int16) - self.scores[:, b]
+        return int(self.counts[diff > 0].sum()), int(self.counts[diff < 0].sum())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [
+            {'scores': dict(zip(self.candidate_ids, row)), 'count': count}
+            for row, count in zip(self.scores.tolist(), self.counts.tolist())
+        ]
+
+
+def approval_threshold(max_score: int) -> int:
+    """Lowest score counted as approval: strictly above the middle of the scale"""
+    return max_score // 2 + 1
+
+
+def rescale_utilities(utility: np.ndarray, max_score: int) -> np.ndarray:
+    """Each voter's utilities mapped linearly onto 0..max_score (an indifferent voter scores all 0)"""
+    low = utility.min(axis=1, keepdims=True)
+    spread = utility.max(axis=1, keepdims=True) - low
+    scaled = np.divide(utility - low, spread, out=np.zeros_like(utility), where=spread > 0)
+    return np.rint(scaled * max_score).astype(np.uint8)
+
+
+def generate_electorate(model: SpatialModel, candidate_ids: Sequence[int], num_voters: int,
+                        seed: Optional[Union[int, np.random.Generator]] = None,
+                        max_score: int = 5,
+                        chunk_size: Optional[int] = None,
+                        ranked: bool = True,
+                        voters: Optional[np.ndarray] = None) -> Tuple[Optional[BallotProfile], ScoreProfile]:
+    """
+    Ranked and score ballots of the same spatial voters
+
+    Voters are drawn and scored block by block, like SpatialModel.generate,
+    and each block is aggregated before the next one is drawn. Pre-drawn
+    (voters x dimensions) `voters` are scored block by block instead. With
+    `ranked` off only the score ballots are built and the profile is None.
+    """
+    if len(candidate_ids) != len(model.positions):
+        raise ValueError('Need one position per candidate')
+    rng = np.random.default_rng(seed)
+    n = len(candidate_ids)
+    chunk_size = chunk_size or max(1, CHUNK_CELLS // max(n, 1))
+    if voters is not None:
+        num_voters = len(voters)
+
+    rankings, scored = [], []
+    for start in range(0, num_voters, chunk_size):
+        size = min(chunk_size, num_voters - start)
+        block = model.draw_voters(rng, size) if voters is None else voters[start:start + size]
+        utility = model.utilities(block, rng, ordinal=False)
+        if ranked:
+            rankings.append(BallotProfile.from_index_matrix(model.rankings(utility), candidate_ids))
+        scored.append(ScoreProfile(rescale_utilities(utility, max_score), np.ones(size, dtype=np.int64),
+                                   candidate_ids, max_score).aggregate())
+
+    if not scored:
+        scores = ScoreProfile(np.zeros((0, n), dtype=np.uint8), np.zeros(0, dtype=np.int64), candidate_ids, max_score)
+    elif len(scored) == 1:
+        scores = scored[0]
+    else:
+        scores = ScoreProfile(np.concatenate([p.scores for p in scored]), np.concatenate([p.counts for p in scored]),
+                              candidate_ids, max_score).aggregate()
+    if not ranked:
+        return None, scores
+
+    if not rankings:
+        profile = BallotProfile(np.zeros((0, model.depth), dtype=np.int32), np.zeros(0, dtype=np.int64), candidate_ids)
+    else:
+        profile = BallotProfile.from_index_matrix(np.concatenate([p.preferences for p in rankings]), candidate_ids,
+                                                  np.concatenate([p.counts for p in rankings]))
+    return profile, scores
+
+
+# ----------------------------------------------------------------------
+# Counts
+# ----------------------------------------------------------------------
+
+def _candidate_rows(candidates: List[Dict[str, Any]], values: np.ndarray, key: str,
+                    total: int, winner: Optional[int]) -> List[Dict[str, Any]]:
+    rows = [
+        {
+            'id': c['id'],
+            'name': c['name'],
+            'party': c['party_name'],
+            'color': c['color'],
+            key: int(v),
+            'percentage': (int(v) / total * 100) if total > 0 else 0,
+            'winner': c['id'] == winner
+        }
+        for c, v in zip(candidates, values)
+    ]
+    rows.sort(key=lambda x: x[key], reverse=True)
+    return rows
+
+
+def _leader(values: np.ndarray) -> Optional[int]:
+    """Index of the largest value (ties to the first-listed)"""
+    return int(np.argmax(values)) if len(values) else None
+
+
+def approval_result(profile: ScoreProfile, candidates: List[Dict[str, Any]],
+                    threshold: Optional[int] = None) -> Dict[str, Any]:
+    """Most approvals wins; percentages are of all voters"""
+    threshold = approval_threshold(profile.max_score) if threshold is None else threshold
+    approvals = profile.approvals(threshold)
+    leader = _leader(approvals)
+    winner = candidates[leader]['id'] if leader is not None else None
+    return {
+        'results': _candidate_rows(candidates, approvals, 'approvals', profile.total_votes, winner),
+        'winner': winner,
+        'total_voters': profile.total_votes,
+        'approval_threshold': threshold,
+        'method': 'Approval Voting'
+    }
+
+
+def score_result(profile: ScoreProfile, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Highest total score wins"""
+    totals = profile.score_totals()
+    leader = _leader(totals)
+    winner = candidates[leader]['id'] if leader is not None else None
+    results = _candidate_rows(candidates, totals, 'total_score', int(totals.sum()), winner)
+    for row in results:
+        row['average_score'] = row['total_score'] / profile.total_votes if profile.total_votes else 0
+    return {
+        'results': results,
+        'winner': winner,
+        'total_voters': profile.total_votes,
+        'max_score': profile.max_score,
+        'method': 'Score Voting'
+    }
+
+
+def star_result(profile: ScoreProfile, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    STAR (Score Then Automatic Runoff): the two highest-scoring candidates go
+    to a runoff won by whoever more voters scored higher; a runoff tie goes
+    to the higher score total, then to the first-listed
+    """
+    result = score_result(profile, candidates)
+    result['method'] = 'STAR Voting'
+    if len(candidates) < 2:
+        result['finalists'] = [c['id'] for c in candidates]
+        result['runoff'] = None
+        return result
+
+    totals = profile.score_totals()
+    first, second = np.argsort(-totals, kind='stable')[:2]
+    a_over_b, b_over_a = profile.preference_counts(first, second)
+    winner = first if a_over_b >= b_over_a else second
+
+    winner_id = candidates[winner]['id']
+    for row in result['results']:
+        row['winner'] = row['id'] == winner_id
+    result['winner'] = winner_id
+    result['finalists'] = [candidates[first]['id'], candidates[second]['id']]
+    result['runoff'] = {
+        'votes': {candidates[first]['id']: a_over_b, candidates[second]['id']: b_over_a},
+        'no_preference': profile.total_votes - a_over_b - b_over_a
+    }
+    return result
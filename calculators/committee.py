@@ -0,0 +1,412 @@
+"""
+Committee Elections
+Proportional multi-winner methods on approval ballots
+
+- seq_pav: sequential proportional approval voting. Each round elects the
+  candidate adding the most PAV score, where a voter with k approved
+  winners so far counts 1 / (k + 1)
+- rav: reweighted approval voting. As seq_pav with ballot weight
+  proportional to 1 / (k + constant); constant 1 is seq_pav (D'Hondt-like),
+  the default 0.5 gives Sainte-Lague-like weights 1, 1/3, 1/5, ...
+- seq_phragmen: each elected candidate puts one unit of load on its
+  supporters; each round elects the candidate whose supporters' highest
+  load after sharing that unit equally is lowest
+- mes: Method of Equal Shares. Every voter starts with seats / voters of
+  budget; a candidate costs 1 and is bought by its supporters paying
+  equal shares rho (or all they have left); each round buys the candidate
+  with the lowest rho. Seats left over are filled by seq_phragmen, seeded
+  with the money each voter has already spent as their load
+- pav: proportional approval voting, the committee with the highest PAV
+  score. Found exactly when the committees are few enough to enumerate,
+  otherwise by local search (best single swaps) from the seq_pav committee.
+  Its members are listed in order of their marginal PAV contribution
+
+Ballots are an approval matrix (ballots x candidates, bool) with a count
+per row. The per-candidate quantities each round depends on (marginal PAV
+gains, load sums, budgets) live in arrays that are updated only for the
+ballots approving the candidate just elected, instead of rescoring every
+candidate from scratch. Ties go to the first-listed candidate.
+"""
+
+import math
+import itertools
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence
+
+from .cardinal import ScoreProfile
+
+
+COMMITTEE_METHODS = ('seq_pav', 'rav', 'seq_phragmen', 'mes', 'pav')
+
+METHOD_NAMES = {
+    'seq_pav': 'Sequential PAV',
+    'rav': 'Reweighted Approval Voting',
+    'seq_phragmen': "Sequential Phragmen",
+    'mes': 'Method of Equal Shares',
+    'pav': 'Proportional Approval Voting',
+}
+
+# Exhaustive PAV when (committees x ballots) stays under this many cells
+EXACT_CELLS = 1 << 24
+
+# Ballot x committee cells scored per block in the exhaustive search
+EXACT_BLOCK_CELLS = 1 << 22
+
+# Ballot x candidate cells cast to float at a time
+ROW_BLOCK_CELLS = 1 << 21
+
+
+def _weighted_columns(weights: np.ndarray, approved: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    weights @ approved[rows], cast to float in row blocks so the product
+    runs as a dense BLAS call without a full float copy of the matrix
+    """
+    rows = np.arange(len(approved)) if rows is None else rows
+    total = np.zeros(approved.shape[1])
+    step = max(1, ROW_BLOCK_CELLS // max(approved.shape[1], 1))
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        total += weights[start:start + step] @ approved[block].astype(np.float64)
+    return total
+
+
+def _first_best(values: np.ndarray) -> int:
+    """
+    Index of the first value within rounding of the maximum; updates
+    folded in round by round drift by a few ulps, which must not decide ties
+    """
+    top = values.max()
+    return int(np.argmax(values >= top - 1e-9 * max(abs(top), 1.0)))
+
+
+def _check_seats(approved: np.ndarray, seats: int) -> None:
+    if not 1 <= seats <= approved.shape[1]:
+        raise ValueError(f'Seats must be between 1 and {approved.shape[1]}')
+
+
+def sequential_thiele(approved: np.ndarray, counts: np.ndarray, seats: int,
+                      constant: float = 1.0) -> Dict[str, Any]:
+    """
+    Sequential Thiele method with ballot weight constant / (k + constant),
+    so every ballot starts at weight 1
+
+    The gain vector holds every candidate's weighted approval by the
+    current ballot weights; electing a candidate only changes the weights
+    of its supporters, so only their rows are folded back into it.
+    """
+    _check_seats(approved, seats)
+    if constant <= 0:
+        raise ValueError('Reweighting constant must be positive')
+    weights = counts.astype(np.float64)
+    elected_approved = np.zeros(len(approved))
+    ballot_weight = weights.copy()
+    gains = _weighted_columns(ballot_weight, approved)
+
+    winners, rounds = [], []
+    for _ in range(seats):
+        gains[winners] = -np.inf
+        winner = _first_best(gains)
+        winners.append(winner)
+        rounds.append({'candidate': winner, 'gain': float(gains[winner])})
+
+        rows = np.flatnonzero(approved[:, winner])
+        elected_approved[rows] += 1
+        new_weight = weights[rows] * constant / (elected_approved[rows] + constant)
+        gains += _weighted_columns(new_weight - ballot_weight[rows], approved, rows)
+        ballot_weight[rows] = new_weight
+
+    return {'winners': winners, 'rounds': rounds}
+
+
+def seq_phragmen(approved: np.ndarray, counts: np.ndarray, seats: int,
+                 winners: Optional[List[int]] = None,
+                 loads: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Sequential Phragmen, optionally continuing from `winners` with the
+    per-voter `loads` they left
+
+    Keeps each candidate's supporters' total load; electing a candidate
+    raises its supporters' loads to the new maximum, which is folded back
+    into the totals for their rows only.
+    """
+    _check_seats(approved, seats)
+    weights = counts.astype(np.float64)
+    winners = list(winners or [])
+    loads = np.zeros(len(approved)) if loads is None else loads.astype(np.float64)
+    support = _weighted_columns(weights, approved)
+    load_totals = _weighted_columns(weights * loads, approved)
+
+    rounds = []
+    while len(winners) < seats:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            max_load = (1 + load_totals) / support
+        max_load[support == 0] = np.inf
+        max_load[winners] = np.inf
+        if not np.isfinite(max_load).any():
+            # Nobody approves any remaining candidate: fill in listed order
+            winner = next(c for c in range(approved.shape[1]) if c not in winners)
+            winners.append(winner)
+            rounds.append({'candidate': winner, 'load': None})
+            continue
+        winner = _first_best(-max_load)
+        winners.append(winner)
+        rounds.append({'candidate': winner, 'load': float(max_load[winner])})
+
+        rows = np.flatnonzero(approved[:, winner])
+        load_totals += _weighted_columns(weights[rows] * (max_load[winner] - loads[rows]), approved, rows)
+        loads[rows] = max_load[winner]
+
+    return {'winners': winners, 'rounds': rounds, 'loads': loads}
+
+
+def _equal_share(budgets: np.ndarray, weights: np.ndarray) -> float:
+    """
+    Lowest per-voter price rho at which these supporters can pay 1 between
+    them, each paying min(budget, rho); infinite when they cannot afford it
+    """
+    if weights @ budgets < 1 - 1e-9:
+        return np.inf
+    # Usually nobody is short of an equal share, and no sort is needed
+    equal = 1 / weights.sum()
+    if budgets.min() >= equal:
+        return float(equal)
+    order = np.argsort(budgets, kind='stable')
+    budgets, weights = budgets[order], weights[order]
+    # Voters below position t pay their whole budget, the rest pay rho
+    paid_before = np.cumsum(weights * budgets) - weights * budgets
+    paying = weights[::-1].cumsum()[::-1]
+    rho = (1 - paid_before) / paying
+    return float(rho[np.argmax(rho <= budgets + 1e-12)])
+
+
+def equal_shares(approved: np.ndarray, counts: np.ndarray, seats: int,
+                 complete: bool = True) -> Dict[str, Any]:
+    """
+    Method of Equal Shares with seq_phragmen completion
+
+    A candidate's price rho can only rise as budgets are spent, so the rho
+    last computed for it is a lower bound. Candidates are evaluated in
+    order of those bounds and the search stops once the best exact price
+    found is below every remaining bound.
+    """
+    _check_seats(approved, seats)
+    weights = counts.astype(np.float64)
+    total = weights.sum()
+    start = seats / total if total > 0 else 0.0
+    budgets = np.full(len(approved), start)
+    supporters = [np.flatnonzero(column) for column in approved.T]
+    bounds = np.zeros(approved.shape[1])
+
+    winners, rounds = [], []
+    while len(winners) < seats:
+        best, best_rho = None, np.inf
+        for candidate in np.argsort(bounds, kind='stable'):
+            if bounds[candidate] > best_rho * (1 + 1e-9) or not np.isfinite(bounds[candidate]):
+                break
+            rows = supporters[candidate]
+            rho = _equal_share(budgets[rows], weights[rows])
+            bounds[candidate] = rho
+            # Prices within rounding of each other tie, to the first-listed
+            near = best is not None and abs(rho - best_rho) <= 1e-9 * max(best_rho, 1.0)
+            if (rho < best_rho and not near) or (near and candidate < best):
+                best, best_rho = int(candidate), rho
+        if best is None:
+            break
+
+        rows = supporters[best]
+        budgets[rows] -= np.minimum(budgets[rows], best_rho)
+        bounds[best] = np.inf
+        winners.append(best)
+        rounds.append({'candidate': best, 'price': best_rho})
+
+    completed = []
+    if complete and len(winners) < seats:
+        filled = seq_phragmen(approved, counts, seats, winners, start - budgets)
+        completed = filled['winners'][len(winners):]
+        rounds += [dict(r, completion=True) for r in filled['rounds']]
+        winners = filled['winners']
+
+    return {'winners': winners, 'rounds': rounds, 'completed_by_phragmen': len(completed),
+            'unspent_budget': float(weights @ budgets)}
+
+
+def pav_score(approved: np.ndarray, counts: np.ndarray, committee: Sequence[int]) -> float:
+    """Sum over voters of 1 + 1/2 + ... + 1/k for k approved committee members"""
+    harmonic = np.concatenate(([0.0], np.cumsum(1 / np.arange(1, len(committee) + 1))))
+    return float(counts @ harmonic[approved[:, list(committee)].sum(axis=1)])
+
+
+def pav(approved: np.ndarray, counts: np.ndarray, seats: int,
+        exact_cells: int = EXACT_CELLS, max_swaps: int = 1000) -> Dict[str, Any]:
+    """
+    Committee maximising the PAV score: exhaustive when small enough,
+    otherwise local search from the seq_pav committee
+
+    Each local-search step scores every (outgoing member, incoming
+    candidate) swap at once: with k_i approved members on ballot i,
+
+        delta[out, in] = sum_i w_i A_in / (k_i + 1)
+                       + sum_i w_i A_out A_in (1 / k_i - 1 / (k_i + 1))
+                       - sum_i w_i A_out / k_i
+
+    The middle term is one (seats x ballots) @ (ballots x candidates)
+    product. The best improving swap is taken until none is left.
+
+    The winners are ordered as seq_pav would elect them from the committee
+    alone, with each one's marginal gain in `rounds`.
+    """
+    _check_seats(approved, seats)
+    num_candidates = approved.shape[1]
+    weights = counts.astype(np.float64)
+
+    committees = math.comb(num_candidates, seats)
+    if committees * max(len(approved), 1) <= exact_cells:
+        return _election_order(approved, counts, _pav_exhaustive(approved, weights, seats))
+
+    committee = sorted(sequential_thiele(approved, counts, seats)['winners'])
+    members = approved[:, committee].sum(axis=1, dtype=np.int64)
+    tolerance = 1e-9 * max(weights.sum(), 1.0)
+
+    swaps = 0
+    while swaps < max_swaps:
+        delta = _swap_deltas(approved, weights, committee, members)
+        delta[:, committee] = -np.inf
+        out, incoming = np.unravel_index(np.argmax(delta), delta.shape)
+        if delta[out, incoming] <= tolerance:
+            break
+        members += approved[:, incoming].astype(np.int64) - approved[:, committee[out]]
+        committee[out] = int(incoming)
+        committee.sort()
+        swaps += 1
+
+    return _election_order(approved, counts, {'winners': committee, 'exact': False, 'swaps': swaps})
+
+
+def _election_order(approved: np.ndarray, counts: np.ndarray, result: Dict[str, Any]) -> Dict[str, Any]:
+    """A PAV result with its winners reordered by sequential PAV over the committee"""
+    committee = result['winners']
+    ordered = sequential_thiele(approved[:, committee], counts, len(committee))
+    return dict(result,
+                winners=[committee[i] for i in ordered['winners']],
+                rounds=[dict(r, candidate=committee[r['candidate']]) for r in ordered['rounds']])
+
+
+def _swap_deltas(approved: np.ndarray, weights: np.ndarray, committee: List[int],
+                 members: np.ndarray) -> np.ndarray:
+    """PAV score change of every (member, candidate) swap, accumulated over row blocks"""
+    delta = np.zeros((len(committee), approved.shape[1]))
+    step = max(1, ROW_BLOCK_CELLS // max(approved.shape[1], 1))
+    for start in range(0, len(approved), step):
+        block = approved[start:start + step].astype(np.float64)
+        seated = block[:, committee]
+        k = members[start:start + step]
+        next_share = weights[start:start + step] / (k + 1)
+        share = np.divide(weights[start:start + step], k, out=np.zeros_like(next_share), where=k > 0)
+        delta += (next_share @ block)[None, :] - (share @ seated)[:, None]
+        delta += (seated * (share - next_share)[:, None]).T @ block
+    return delta
+
+
+def _pav_exhaustive(approved: np.ndarray, weights: np.ndarray, seats: int) -> Dict[str, Any]:
+    """Score every committee, in blocks, and keep the first best one"""
+    harmonic = np.concatenate(([0.0], np.cumsum(1 / np.arange(1, seats + 1))))
+    block = max(1, EXACT_BLOCK_CELLS // max(len(approved) * seats, 1))
+    combos = itertools.combinations(range(approved.shape[1]), seats)
+
+    best, best_score = None, -np.inf
+    while True:
+        chunk = np.array(list(itertools.islice(combos, block)), dtype=np.intp)
+        if len(chunk) == 0:
+            break
+        members = approved[:, chunk].sum(axis=2, dtype=np.int64)
+        scores = weights @ harmonic[members]
+        top = int(np.argmax(scores))
+        if scores[top] > best_score + 1e-9:
+            best, best_score = chunk[top].tolist(), float(scores[top])
+
+    return {'winners': best, 'exact': True}
+
+
+def elect(approved: np.ndarray, counts: np.ndarray, seats: int, method: str,
+          rav_constant: float = 0.5) -> Dict[str, Any]:
+    """Run one of COMMITTEE_METHODS on an approval matrix"""
+    approved = np.asarray(approved, dtype=bool)
+    counts = np.asarray(counts, dtype=np.int64)
+    if method == 'seq_pav':
+        return sequential_thiele(approved, counts, seats)
+    if method == 'rav':
+        return sequential_thiele(approved, counts, seats, rav_constant)
+    if method == 'seq_phragmen':
+        result = seq_phragmen(approved, counts, seats)
+        result.pop('loads')
+        return result
+    if method == 'mes':
+        return equal_shares(approved, counts, seats)
+    if method == 'pav':
+        return pav(approved, counts, seats)
+    raise ValueError(f'Unknown committee method: {method}')
+
+
+def committee_results(profile: ScoreProfile,
+                      candidates: List[Dict[str, Any]],
+                      seats: int,
+                      methods: Optional[Sequence[str]] = None,
+                      threshold: Optional[int] = None,
+                      rav_constant: float = 0.5) -> Dict[str, Any]:
+    """
+    Committees chosen by each method from one approval profile
+
+    Args:
+        profile: Score ballots; a score of `threshold` or more approves
+        candidates: Candidate dicts in the profile's column order
+        seats: Committee size
+        methods: Names from COMMITTEE_METHODS (default: all)
+        threshold: Lowest approving score (default: above the midpoint)
+        rav_constant: Reweighting constant for 'rav'
+
+    Returns:
+        Dictionary with per-candidate approvals and, per method, the
+        winners' ids in order of election, per-round details, the PAV score
+        and the share of voters with at least one approved winner
+    """
+    methods = list(methods or COMMITTEE_METHODS)
+    unknown = [m for m in methods if m not in COMMITTEE_METHODS]
+    if unknown:
+        raise ValueError(f'Unknown committee method: {unknown[0]}')
+    if len(candidates) != len(profile.candidate_ids):
+        raise ValueError('Need one candidate per ballot column')
+
+    # Score ballots that approve the same set are one approval ballot
+    approvals = ScoreProfile(profile.approved(threshold), profile.counts, profile.candidate_ids, 1).aggregate()
+    approved = approvals.scores.astype(bool)
+    counts = approvals.counts
+    total = approvals.total_votes
+    ids = [c['id'] for c in candidates]
+
+    results = {}
+    for method in methods:
+        outcome = elect(approved, counts, seats, method, rav_constant)
+        winners = outcome.pop('winners')
+        for entry in outcome.get('rounds', []):
+            entry['candidate'] = ids[entry['candidate']]
+        represented = int(counts @ approved[:, winners].any(axis=1)) if winners else 0
+        results[method] = dict(
+            outcome,
+            winners=[ids[c] for c in winners],
+            method=METHOD_NAMES[method],
+            pav_score=pav_score(approved, counts, winners),
+            represented=represented,
+            represented_share=represented / total * 100 if total > 0 else 0
+        )
+
+    return {
+        'seats': seats,
+        'total_voters': total,
+        'unique_ballots': len(approvals),
+        'approvals': [
+            {'id': c['id'], 'name': c['name'], 'party': c['party_name'], 'color': c['color'],
+             'approvals': int(v)}
+            for c, v in zip(candidates, approvals.approvals(1))
+        ],
+        'methods': results
+    }
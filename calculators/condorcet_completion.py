@@ -0,0 +1,137 @@
+"""
+Condorcet Completion Methods
+Schulze, Ranked Pairs, Copeland and Minimax computed from a pairwise matrix
+
+Every method takes the (candidates x candidates) matrix produced by
+BallotProfile.pairwise_matrix(), where [i, j] is the number of voters ranking
+i above j, and returns candidate indices. Ties are broken in favour of the
+candidate listed first, so results are deterministic.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, Any, List
+
+
+def schulze(pairwise: np.ndarray) -> Dict[str, Any]:
+    """
+    Schulze method (winning votes)
+
+    Strongest path strengths come from a vectorized Floyd-Warshall widest-path
+    pass; i ranks above j when its strongest path to j beats j's path to i.
+    """
+    n = len(pairwise)
+    strength = np.where(pairwise > pairwise.T, pairwise, 0).astype(np.int64)
+
+    for k in range(n):
+        through_k = np.minimum(strength[:, k:k + 1], strength[k:k + 1, :])
+        np.maximum(strength, through_k, out=strength)
+    np.fill_diagonal(strength, 0)
+
+    beats = strength > strength.T
+    scores = beats.sum(axis=1)
+    ranking = _rank_by(-scores)
+
+    return {
+        'method': 'schulze',
+        'ranking': ranking,
+        'scores': scores.tolist(),
+        'strongest_paths': strength.tolist()
+    }
+
+
+def ranked_pairs(pairwise: np.ndarray) -> Dict[str, Any]:
+    """
+    Ranked Pairs (Tideman), winning votes
+
+    Majorities are locked from strongest to weakest (larger winning vote, then
+    smaller losing vote, then candidate order), skipping any that would close
+    a cycle. The cycle check is a DFS over the locked graph.
+    """
+    n = len(pairwise)
+    winners, losers = np.nonzero(pairwise > pairwise.T)
+    order = np.lexsort((losers, winners, pairwise[losers, winners], -pairwise[winners, losers]))
+
+    locked: List[List[int]] = [[] for _ in range(n)]
+    locked_pairs = []
+    for idx in order:
+        winner, loser = int(winners[idx]), int(losers[idx])
+        if not _reaches(locked, loser, winner):
+            locked[winner].append(loser)
+            locked_pairs.append([winner, loser])
+
+    # Topological order of the locked graph, earliest-listed source first
+    indegree = [0] * n
+    for edges in locked:
+        for loser in edges:
+            indegree[loser] += 1
+    ready = [i for i in range(n) if indegree[i] == 0]
+    heapq.heapify(ready)
+    ranking = []
+    while ready:
+        node = heapq.heappop(ready)
+        ranking.append(node)
+        for loser in locked[node]:
+            indegree[loser] -= 1
+            if indegree[loser] == 0:
+                heapq.heappush(ready, loser)
+
+    return {
+        'method': 'ranked_pairs',
+        'ranking': ranking,
+        'scores': [n - 1 - ranking.index(i) for i in range(n)],
+        'locked_pairs': locked_pairs
+    }
+
+
+def copeland(pairwise: np.ndarray) -> Dict[str, Any]:
+    """Copeland: one point per head-to-head win, half a point per tie"""
+    wins = (pairwise > pairwise.T).sum(axis=1)
+    ties = (pairwise == pairwise.T).sum(axis=1) - 1  # exclude the diagonal
+    scores = wins + 0.5 * ties
+
+    return {
+        'method': 'copeland',
+        'ranking': _rank_by(-scores),
+        'scores': scores.tolist()
+    }
+
+
+def minimax(pairwise: np.ndarray) -> Dict[str, Any]:
+    """Minimax (winning votes): elect the candidate whose worst defeat is smallest"""
+    defeats = np.where(pairwise.T > pairwise, pairwise.T, 0)
+    scores = defeats.max(axis=1, initial=0)
+
+    return {
+        'method': 'minimax',
+        'ranking': _rank_by(scores),
+        'scores': scores.tolist()
+    }
+
+
+COMPLETION_METHODS = {
+    'schulze': schulze,
+    'ranked_pairs': ranked_pairs,
+    'copeland': copeland,
+    'minimax': minimax,
+}
+
+
+def _rank_by(keys: np.ndarray) -> List[int]:
+    """Indices sorted by ascending key, ties kept in candidate order"""
+    return np.argsort(keys, kind='stable').tolist()
+
+
+def _reaches(graph: List[List[int]], start: int, target: int) -> bool:
+    """Iterative DFS: is `target` reachable from `start`?"""
+    stack = [start]
+    seen = {start}
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        for nxt in graph[node]:
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return False
@@ -0,0 +1,229 @@
+"""
+Counterfactual Counts
+IRV / STV outcomes when candidates withdraw, memoized over remaining-candidate sets
+
+Until the first candidate is elected every ballot still carries full
+weight, so the count's state is nothing more than the set of continuing
+candidates: a withdrawn candidate and one eliminated at full weight leave
+exactly the same tallies behind. Outcomes are therefore memoized by that
+set. The count with {A} withdrawn and the full count that eliminates A in
+round one share everything after it, and a sweep over many withdrawal sets
+only counts each distinct set of remaining candidates once. Along an
+elimination path only the eliminated candidate's ballots are moved on, so
+a whole-profile pass is needed once per query, not once per round.
+
+After the first election (multi-seat STV only) transfers carry fractional
+weights, so the remainder of the count is run by STVCalculator on the
+profile restricted to the remaining candidates and memoized as a whole.
+"""
+
+import itertools
+import numpy as np
+from typing import List, Dict, Any, FrozenSet, Iterable, Sequence, Tuple
+
+from .profile import BallotProfile
+from .incremental import round_decision
+from .irv import first_continuing, tally_first
+from .stv import STVCalculator, Candidate as STVCandidate
+
+
+def restrict_profile(profile: BallotProfile, keep: np.ndarray) -> BallotProfile:
+    """
+    Profile over the candidates where `keep` is True, with everyone else
+    struck from the ballots (emptied ballots stay, as exhausted votes)
+    """
+    live = np.append(keep, False)[profile.preferences]
+    # Stable sort moves kept entries to the front in their original order
+    order = np.argsort(~live, axis=1, kind='stable')
+    packed = np.take_along_axis(profile.preferences, order, axis=1)
+    packed[~np.take_along_axis(live, order, axis=1)] = BallotProfile.PAD
+
+    mapping = np.full(profile.num_candidates + 1, BallotProfile.PAD, dtype=np.int32)
+    kept = np.flatnonzero(keep)
+    mapping[kept] = np.arange(len(kept))
+    width = int(live.sum(axis=1).max()) if len(live) else 0
+    candidate_ids = [profile.candidate_ids[i] for i in kept]
+    return BallotProfile(mapping[packed[:, :width]], profile.counts, candidate_ids)
+
+
+class CounterfactualEngine:
+    """
+    Withdrawal queries against one profile
+
+    Args:
+        candidates: Candidate dicts (id, name, party_id, party_name, color)
+        ballots: BallotProfile (or ballots) over those candidates
+        seats: 1 for IRV, more for STV
+    """
+
+    def __init__(self, candidates: List[Dict[str, Any]], ballots: Any, seats: int = 1):
+        self.candidates = candidates
+        self.candidate_ids = [int(c['id']) for c in candidates]
+        self.index = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        self.seats = seats
+        self.profile = BallotProfile.coerce(ballots, self.candidate_ids).aggregate()
+        # Droop quota; withdrawals leave every ballot in the total
+        self.quota = self.profile.total_votes // (seats + 1) + 1
+
+        self._outcomes: Dict[FrozenSet[int], Tuple[int, ...]] = {}
+        self.queries = 0
+        self.memo_hits = 0
+        self.full_tallies = 0
+        self.transfers = 0
+        self.full_counts = 0
+
+    def _eliminate(self, first: np.ndarray, tallies: np.ndarray, loser: int,
+                   continuing: np.ndarray) -> np.ndarray:
+        """Move the loser's ballots on to their next continuing preference (updates `first`)"""
+        self.transfers += 1
+        rows = np.flatnonzero(first == loser)
+        first[rows] = first_continuing(self.profile.preferences[rows], continuing)
+        tallies = tallies + tally_first(first[rows], self.profile.counts[rows], len(self.candidate_ids))
+        tallies[loser] = 0
+        return tallies
+
+    def _count_from(self, remaining: FrozenSet[int]) -> Tuple[int, ...]:
+        """Rest of an STV count once someone reaches quota"""
+        keep = np.zeros(len(self.candidate_ids), dtype=bool)
+        keep[list(remaining)] = True
+        calculator = STVCalculator(
+            [STVCandidate(**self.candidates[i]) for i in sorted(remaining)], self.seats, engine='numpy'
+        )
+        self.full_counts += 1
+        elected = calculator.run_election(restrict_profile(self.profile, keep))['elected']
+        return tuple(self.index[cid] for cid in elected)
+
+    def outcome(self, remaining: Iterable[int]) -> Tuple[int, ...]:
+        """Elected candidate indices when only `remaining` (indices) stand"""
+        remaining = frozenset(remaining)
+        self.queries += 1
+        if remaining in self._outcomes:
+            self.memo_hits += 1
+            return self._outcomes[remaining]
+
+        path = []
+        continuing = np.zeros(len(self.candidate_ids), dtype=bool)
+        continuing[list(remaining)] = True
+        first = tallies = None
+        while remaining not in self._outcomes:
+            path.append(remaining)
+            if not remaining:
+                elected = ()
+                break
+            if first is None:
+                self.full_tallies += 1
+                first = first_continuing(self.profile.preferences, continuing)
+                tallies = tally_first(first, self.profile.counts, len(self.candidate_ids))
+            action, candidate = round_decision(tallies, continuing, self.quota, self.seats)
+
+            if action == 'eliminated':
+                remaining = remaining - {candidate}
+                continuing[candidate] = False
+                if remaining not in self._outcomes:
+                    tallies = self._eliminate(first, tallies, candidate, continuing)
+            elif action == 'elected_remaining':
+                elected = tuple(sorted(remaining))
+                break
+            elif self.seats == 1:
+                elected = (candidate,)
+                break
+            else:
+                elected = self._count_from(remaining)
+                break
+        else:
+            elected = self._outcomes[remaining]
+
+        for state in path:
+            self._outcomes[state] = elected
+        return elected
+
+    # ------------------------------------------------------------------
+    # Queries (candidate ids in, candidate ids out)
+    # ------------------------------------------------------------------
+
+    def _indices(self, candidate_ids: Iterable[int]) -> FrozenSet[int]:
+        try:
+            return frozenset(self.index[int(cid)] for cid in candidate_ids)
+        except KeyError as e:
+            raise ValueError(f'Unknown candidate id {e.args[0]}')
+
+    def elected_without(self, withdrawn: Iterable[int]) -> List[int]:
+        """Elected candidate ids when `withdrawn` (ids) leave the race"""
+        everyone = frozenset(range(len(self.candidate_ids)))
+        return [self.candidate_ids[i] for i in self.outcome(everyone - self._indices(withdrawn))]
+
+    def withdrawals(self, sets: Iterable[Sequence[int]]) -> List[Dict[str, Any]]:
+        """Outcome for every withdrawal set, flagged where it differs from the full count"""
+        baseline = set(self.elected_without([]))
+        rows = []
+        for withdrawn in sets:
+            withdrawn = sorted(int(cid) for cid in withdrawn)
+            elected = self.elected_without(withdrawn)
+            rows.append({
+                'withdrawn': withdrawn,
+                'elected': elected,
+                'changed': set(elected) != baseline
+            })
+        return rows
+
+    def single_withdrawals(self) -> List[Dict[str, Any]]:
+        return self.withdrawals([cid] for cid in self.candidate_ids)
+
+    def pair_withdrawals(self) -> List[Dict[str, Any]]:
+        return self.withdrawals(itertools.combinations(self.candidate_ids, 2))
+
+    def subset_withdrawals(self, max_size: int) -> List[Dict[str, Any]]:
+        """Every withdrawal set of 1..max_size candidates (never all of them)"""
+        sizes = range(1, min(max_size, len(self.candidate_ids) - 1) + 1)
+        return self.withdrawals(
+            itertools.chain.from_iterable(itertools.combinations(self.candidate_ids, k) for k in sizes)
+        )
+
+    def spoilers(self, pairs: bool = False) -> List[Dict[str, Any]]:
+        """
+        Losing candidates whose withdrawal changes who is elected
+
+        A spoiler's withdrawal elects at least one other candidate (a
+        beneficiary) who loses the full count. With `pairs`, pairs of losing
+        candidates that only change the outcome by withdrawing together are
+        reported as well.
+        """
+        baseline = set(self.elected_without([]))
+        losers = [cid for cid in self.candidate_ids if cid not in baseline]
+
+        found = []
+        single = set()
+        for cid in losers:
+            elected = self.elected_without([cid])
+            if set(elected) != baseline:
+                single.add(cid)
+                found.append({
+                    'withdrawn': [cid],
+                    'elected': elected,
+                    'beneficiaries': [e for e in elected if e not in baseline],
+                    'harmed': [e for e in self.candidate_ids if e in baseline and e not in elected]
+                })
+
+        if pairs:
+            for a, b in itertools.combinations(losers, 2):
+                if a in single or b in single:
+                    continue
+                elected = self.elected_without([a, b])
+                if set(elected) != baseline:
+                    found.append({
+                        'withdrawn': [a, b],
+                        'elected': elected,
+                        'beneficiaries': [e for e in elected if e not in baseline],
+                        'harmed': [e for e in self.candidate_ids if e in baseline and e not in elected]
+                    })
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queries': self.queries,
+            'memo_hits': self.memo_hits,
+            'states': len(self._outcomes),
+            'full_tallies': self.full_tallies,
+            'transfers': self.transfers,
+            'full_counts': self.full_counts
+        }
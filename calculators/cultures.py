@@ -0,0 +1,213 @@
+"""
+Statistical Cultures
+Standard random-profile models from the social choice literature
+
+- impartial_culture (IC): every voter draws a uniformly random ranking
+- impartial_anonymous_culture (IAC): every anonymous profile (multiset of
+  rankings) is equally likely
+- mallows: rankings concentrated around a reference ranking, drawn with the
+  repeated-insertion model; dispersion 0 gives only the reference, 1 is IC
+- plackett_luce: candidates picked in turn with probability proportional to
+  their weight, drawn all at once as a Gumbel-max argsort
+- polya_urn: Polya-Eggenberger urn; each drawn ranking goes back with
+  `alpha` extra copies (alpha 0 is IC, alpha 1 is IAC)
+
+Every sampler works on whole (voters x candidates) blocks and returns an
+aggregated BallotProfile; no per-voter objects are built. Samplers take a
+numpy Generator so seeded runs are reproducible.
+"""
+
+import math
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from .profile import BallotProfile
+
+
+# Voter x candidate cells drawn per block
+CHUNK_CELLS = 1 << 22
+
+CULTURES = ('impartial_culture', 'impartial_anonymous_culture', 'mallows', 'plackett_luce', 'polya_urn')
+
+CULTURE_ALIASES = {
+    'ic': 'impartial_culture',
+    'iac': 'impartial_anonymous_culture',
+    'urn': 'polya_urn',
+    'polya': 'polya_urn',
+    'pl': 'plackett_luce',
+}
+
+
+def _blocks(num_voters: int, num_candidates: int):
+    """Sizes of the voter blocks drawn at a time"""
+    size = max(1, CHUNK_CELLS // max(num_candidates, 1))
+    for start in range(0, num_voters, size):
+        yield min(size, num_voters - start)
+
+
+def _collect(blocks, candidate_ids: Sequence[int]) -> BallotProfile:
+    """One aggregated profile from a stream of (voters x candidates) index blocks"""
+    parts = [BallotProfile.from_index_matrix(block, candidate_ids) for block in blocks]
+    if not parts:
+        return BallotProfile(np.zeros((0, len(candidate_ids)), dtype=np.int32),
+                             np.zeros(0, dtype=np.int64), candidate_ids)
+    if len(parts) == 1:
+        return parts[0]
+    return BallotProfile.from_index_matrix(np.concatenate([p.preferences for p in parts]), candidate_ids,
+                                           np.concatenate([p.counts for p in parts]))
+
+
+def _uniform_rankings(rng: np.random.Generator, voters: int, num_candidates: int) -> np.ndarray:
+    return np.argsort(rng.random((voters, num_candidates)), axis=1).astype(np.int32)
+
+
+def impartial_culture_matrix(rng: np.random.Generator, voters: int, num_candidates: int) -> np.ndarray:
+    """(voters x candidates) uniformly random rankings, drawn block by block"""
+    if voters == 0:
+        return np.zeros((0, num_candidates), dtype=np.int32)
+    return np.concatenate([_uniform_rankings(rng, size, num_candidates)
+                           for size in _blocks(voters, num_candidates)])
+
+
+def impartial_culture(candidate_ids: Sequence[int], num_voters: int,
+                      rng: np.random.Generator) -> BallotProfile:
+    n = len(candidate_ids)
+    return _collect((_uniform_rankings(rng, size, n) for size in _blocks(num_voters, n)), candidate_ids)
+
+
+def mallows(candidate_ids: Sequence[int], num_voters: int, rng: np.random.Generator,
+            dispersion: float = 0.5, reference: Optional[Sequence[int]] = None) -> BallotProfile:
+    """
+    Repeated insertion: the i-th reference candidate is inserted at position
+    j of the ranking built so far (0 <= j <= i) with probability proportional
+    to dispersion^(i - j), the number of inversions it creates
+    """
+    if not 0 <= dispersion <= 1:
+        raise ValueError('Mallows dispersion must be between 0 and 1')
+    n = len(candidate_ids)
+    reference = np.arange(n) if reference is None else np.asarray(reference, dtype=np.int32)
+
+    # Cumulative insertion probabilities, one row per step
+    cumulative = np.ones((n, n))
+    for i in range(1, n):
+        weights = dispersion ** np.arange(i, -1, -1, dtype=np.float64)
+        cumulative[i, :i + 1] = np.cumsum(weights) / weights.sum()
+
+    # Positions are below n, so small candidate sets shift narrow integers
+    dtype = np.int8 if n <= 127 else np.int32
+
+    def block(size):
+        position = np.zeros((size, n), dtype=dtype)
+        for i in range(1, n):
+            j = np.searchsorted(cumulative[i, :i], rng.random(size)).astype(dtype)
+            # Everything at or after the insertion point moves down one place
+            position[:, :i] += position[:, :i] >= j[:, None]
+            position[:, i] = j
+        return reference[np.argsort(position, axis=1)]
+
+    return _collect((block(size) for size in _blocks(num_voters, n)), candidate_ids)
+
+
+def plackett_luce(candidate_ids: Sequence[int], num_voters: int, rng: np.random.Generator,
+                  weights: Optional[Sequence[float]] = None) -> BallotProfile:
+    """
+    Gumbel-max sampling: sorting log-weights plus Gumbel noise has the law of
+    picking candidates in turn by weight. Gumbel noise is -log of an
+    exponential, so this is drawn as the cheaper exponential race: ascending
+    Exp(1) / weight.
+    """
+    n = len(candidate_ids)
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    if weights.shape != (n,) or (weights <= 0).any():
+        raise ValueError(f'Plackett-Luce needs {n} positive weights')
+
+    def block(size):
+        return np.argsort(rng.standard_exponential((size, n)) / weights, axis=1).astype(np.int32)
+
+    return _collect((block(size) for size in _blocks(num_voters, n)), candidate_ids)
+
+
+def polya_urn(candidate_ids: Sequence[int], num_voters: int, rng: np.random.Generator,
+              alpha: float = 1.0) -> BallotProfile:
+    """
+    Urn starting with one copy of each of the n! rankings
+
+    After t draws the next voter copies the ranking of a uniformly chosen
+    earlier voter with probability alpha t / (n! + alpha t) and otherwise
+    draws a fresh ranking from IC, which is exactly the urn's law. Those
+    coin flips are independent, so every voter's source is drawn at once
+    and the copy chains are resolved by pointer jumping.
+    """
+    if alpha < 0:
+        raise ValueError('Urn alpha cannot be negative')
+    n = len(candidate_ids)
+    if num_voters == 0:
+        return impartial_culture(candidate_ids, 0, rng)
+
+    t = np.arange(num_voters, dtype=np.float64)
+    rankings = float(math.factorial(n)) if n < 171 else np.inf
+    copy_odds = alpha * t / (rankings + alpha * t) if np.isfinite(rankings) else np.zeros(num_voters)
+    copies = rng.random(num_voters) < copy_odds
+
+    source = np.arange(num_voters)
+    source[copies] = (rng.random(int(copies.sum())) * t[copies]).astype(np.int64)
+    while True:
+        jumped = source[source]
+        if np.array_equal(jumped, source):
+            break
+        source = jumped
+
+    roots, counts = np.unique(source, return_counts=True)
+    drawn = impartial_culture_matrix(rng, len(roots), n)
+    return BallotProfile.from_index_matrix(drawn, candidate_ids, counts)
+
+
+def normalize_culture(name: str) -> str:
+    return CULTURE_ALIASES.get(name, name)
+
+
+def is_culture(name: str) -> bool:
+    return normalize_culture(name) in CULTURES
+
+
+def generate_culture(candidate_ids: Sequence[int], num_voters: int, culture: str,
+                     seed=None, dispersion: float = 0.5, reference: Optional[Sequence[int]] = None,
+                     weights: Optional[Dict[int, float]] = None, alpha: float = 1.0) -> BallotProfile:
+    """
+    Profile drawn from a named culture
+
+    Args:
+        candidate_ids: Candidate ids, in index order
+        culture: A CULTURES name or alias ('ic', 'iac', 'urn', ...)
+        seed: Integer seed or numpy Generator
+        dispersion: Mallows dispersion (phi)
+        reference: Mallows reference ranking as candidate ids (default: listed order)
+        weights: Plackett-Luce weight per candidate id (default: equal)
+        alpha: Polya urn replacement parameter
+    """
+    rng = np.random.default_rng(seed)
+    culture = normalize_culture(culture)
+    candidate_ids = [int(cid) for cid in candidate_ids]
+    index = {cid: i for i, cid in enumerate(candidate_ids)}
+
+    if culture == 'impartial_culture':
+        return impartial_culture(candidate_ids, num_voters, rng)
+    if culture == 'impartial_anonymous_culture':
+        return polya_urn(candidate_ids, num_voters, rng, alpha=1.0)
+    if culture == 'polya_urn':
+        return polya_urn(candidate_ids, num_voters, rng, alpha=alpha)
+    if culture == 'mallows':
+        order = None
+        if reference is not None:
+            if sorted(int(cid) for cid in reference) != sorted(candidate_ids):
+                raise ValueError('Mallows reference must rank every candidate once')
+            order = [index[int(cid)] for cid in reference]
+        return mallows(candidate_ids, num_voters, rng, dispersion, order)
+    if culture == 'plackett_luce':
+        vector = None
+        if weights is not None:
+            weights = {int(k): v for k, v in weights.items()}
+            vector = [weights.get(cid, 1.0) for cid in candidate_ids]
+        return plackett_luce(candidate_ids, num_voters, rng, vector)
+    raise ValueError(f'Unknown culture: {culture}')
+
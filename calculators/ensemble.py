@@ -0,0 +1,242 @@
+"""
+Monte Carlo Ensembles
+Seeded trials over generated electorates with running aggregate statistics
+
+Each trial draws a fresh electorate from its own SeedSequence child, runs the
+requested systems and hands back only winners and party totals, so memory
+stays flat however many trials run. Aggregates are updated as trials finish:
+winner frequencies, Condorcet efficiency, and Welford mean/variance of seat
+shares and the Gallagher index.
+"""
+
+import numpy as np
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Iterator, Optional
+
+from .ballot_gen import BallotGenerator, Candidate
+from .batch import SYSTEM_RUNNERS, first_preferences, get_executor, reset_executor
+from .metrics import gallagher_index, shares
+
+
+class RunningMoments:
+    """Welford running mean and sample variance of a fixed-length vector"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, size: int):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    @property
+    def variance(self) -> np.ndarray:
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+
+class EnsembleAccumulator:
+    """
+    Running statistics over trial outcomes
+
+    An outcome (see `run_trial`) carries the trial's Condorcet winner, first
+    preference votes per party and, per system, the winning candidate
+    indices and seats per party. Nothing else from the trial is kept.
+    """
+
+    def __init__(self, systems: List[str], candidate_ids: List[int], party_ids: List[int]):
+        self.systems = list(systems)
+        self.candidate_ids = list(candidate_ids)
+        self.party_ids = party_ids
+        self.trials = 0
+        self.condorcet_trials = 0
+        self.wins = {s: np.zeros(len(candidate_ids), dtype=np.int64) for s in self.systems}
+        self.condorcet_agreements = {s: 0 for s in self.systems}
+        self.seat_shares = {s: RunningMoments(len(party_ids)) for s in self.systems}
+        self.gallagher = {s: RunningMoments(1) for s in self.systems}
+
+    def update(self, outcome: Dict[str, Any]) -> None:
+        self.trials += 1
+        condorcet_winner = outcome['condorcet_winner']
+        if condorcet_winner is not None:
+            self.condorcet_trials += 1
+        vote_shares = shares(outcome['party_votes'])
+
+        for system in self.systems:
+            winners = outcome['winners'][system]
+            np.add.at(self.wins[system], winners, 1)
+            if condorcet_winner is not None and condorcet_winner in winners:
+                self.condorcet_agreements[system] += 1
+
+            seat_shares = shares(outcome['seats'][system])
+            self.seat_shares[system].update(seat_shares)
+            self.gallagher[system].update([gallagher_index(vote_shares, seat_shares)])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable summary of everything seen so far"""
+        trials = max(self.trials, 1)
+        systems = {}
+        for system in self.systems:
+            moments = self.seat_shares[system]
+            systems[system] = {
+                'winner_frequency': {
+                    cid: int(w) / trials for cid, w in zip(self.candidate_ids, self.wins[system])
+                },
+                'condorcet_efficiency': (self.condorcet_agreements[system] / self.condorcet_trials
+                                         if self.condorcet_trials else None),
+                'seat_share': {
+                    pid: {'mean': float(m), 'variance': float(v)}
+                    for pid, m, v in zip(self.party_ids, moments.mean, moments.variance)
+                },
+                'gallagher': {
+                    'mean': float(self.gallagher[system].mean[0]),
+                    'variance': float(self.gallagher[system].variance[0])
+                }
+            }
+
+        return {
+            'trials': self.trials,
+            'condorcet_winner_rate': self.condorcet_trials / trials,
+            'systems': systems
+        }
+
+
+def _party_ids(candidates: List[Dict[str, Any]]) -> List[int]:
+    """Party ids in order of first appearance"""
+    return list(dict.fromkeys(c['party_id'] for c in candidates))
+
+
+def run_trial(seed: np.random.SeedSequence,
+              candidates: List[Dict[str, Any]],
+              num_voters: int,
+              distribution: str,
+              systems: List[str],
+              options: Dict[str, Any],
+              culture_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate one electorate, run every system and reduce to an outcome"""
+    rng = np.random.default_rng(seed)
+    profile = BallotGenerator.generate_profile(
+        [Candidate(**c) for c in candidates], num_voters, distribution, seed=rng, **(culture_params or {})
+    )
+    index = profile.index
+    party_ids = _party_ids(candidates)
+    party_of = np.array([party_ids.index(c['party_id']) for c in candidates])
+
+    # Strict Condorcet winner: beats every other candidate head-to-head
+    pairwise = profile.pairwise_matrix()
+    beats = (pairwise > pairwise.T).sum(axis=1)
+    strict = np.flatnonzero(beats == len(candidates) - 1)
+    condorcet_winner = int(strict[0]) if len(strict) else None
+
+    party_votes = np.bincount(party_of, weights=first_preferences(profile), minlength=len(party_ids))
+
+    winners = {}
+    seats = {}
+    for system in systems:
+        result = SYSTEM_RUNNERS[system](profile, candidates, options)
+        if system == 'party_list':
+            by_party = {r['party_id']: r['seats'] for r in result['results']}
+            winners[system] = []
+            seats[system] = [by_party.get(p, 0) for p in party_ids]
+            continue
+
+        if 'elected' in result:
+            elected = result['elected']
+        else:
+            winner = result.get('condorcet_winner' if system == 'condorcet' else 'winner')
+            elected = [] if winner is None else [winner]
+        winners[system] = [index[cid] for cid in elected]
+        seats[system] = np.bincount(party_of[winners[system]], minlength=len(party_ids)).tolist()
+
+    return {
+        'condorcet_winner': condorcet_winner,
+        'party_votes': party_votes.astype(np.int64).tolist(),
+        'winners': winners,
+        'seats': seats
+    }
+
+
+def run_trials(seeds: List[np.random.SeedSequence], *args) -> List[Dict[str, Any]]:
+    """Worker entry point: a chunk of trials"""
+    return [run_trial(seed, *args) for seed in seeds]
+
+
+def run_ensemble(candidates: List[Dict[str, Any]],
+                 trials: int,
+                 num_voters: int,
+                 distribution: str = 'normal',
+                 systems: Optional[List[str]] = None,
+                 options: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None,
+                 max_workers: int = 1,
+                 chunk_size: Optional[int] = None,
+                 culture_params: Optional[Dict[str, Any]] = None) -> Iterator[EnsembleAccumulator]:
+    """
+    Run `trials` seeded trials, yielding the accumulator after each chunk
+
+    culture_params go to BallotGenerator.generate_profile with a statistical
+    culture as the distribution (dispersion, reference, weights, alpha).
+
+    Trial i always uses the i-th child of SeedSequence(seed), so results do
+    not depend on how trials are split across workers. At most two chunks
+    per worker are in flight at a time. Arguments are validated before the
+    first trial starts.
+    """
+    systems = list(dict.fromkeys(systems or ['fptp', 'irv']))
+    unknown = [s for s in systems if s not in SYSTEM_RUNNERS]
+    if unknown:
+        raise ValueError(f'Unknown system: {unknown[0]}')
+    if trials < 1:
+        raise ValueError('trials must be positive')
+
+    options = options or {}
+    accumulator = EnsembleAccumulator(systems, [c['id'] for c in candidates], _party_ids(candidates))
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+    chunk_size = chunk_size or max(1, min(50, trials // (max(max_workers, 1) * 8)))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, trials, chunk_size)]
+    args = (candidates, num_voters, distribution, systems, options, culture_params or {})
+
+    if max_workers > 1 and len(chunks) > 1:
+        return _run_parallel(chunks, args, accumulator, max_workers)
+    return _run_serial(chunks, args, accumulator)
+
+
+def _run_serial(chunks: List[List[np.random.SeedSequence]], args: tuple,
+                accumulator: EnsembleAccumulator) -> Iterator[EnsembleAccumulator]:
+    for chunk in chunks:
+        for outcome in run_trials(chunk, *args):
+            accumulator.update(outcome)
+        yield accumulator
+
+
+def _run_parallel(chunks: List[List[np.random.SeedSequence]], args: tuple,
+                  accumulator: EnsembleAccumulator, max_workers: int) -> Iterator[EnsembleAccumulator]:
+    """Feed chunks to the shared process pool, folding outcomes in as they finish"""
+    executor = get_executor(max_workers)
+    queue = deque(chunks)
+    pending = set()
+    try:
+        while queue or pending:
+            while queue and len(pending) < 2 * max_workers:
+                pending.add(executor.submit(run_trials, queue.popleft(), *args))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for outcome in future.result():
+                    accumulator.update(outcome)
+                yield accumulator
+    except BrokenProcessPool:
+        reset_executor()
+        raise
+    finally:
+        # Stop queued work if the consumer goes away early
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,309 @@
+"""
+Incremental Recounts
+A ballot profile plus cached count state that is updated by ballot deltas
+
+A delta adds (or, with a negative count, removes) copies of one ranking.
+First preferences, Borda scores and the pairwise matrix are additive, so a
+delta touches at most one entry, one entry per ranked position and one entry
+per ranked pair. The IRV count is kept round by round: each round's tallies
+are patched where the delta's ballot sits in that round, and the count is
+resumed from the first round whose decision changes. Earlier rounds are
+never recounted. Rounds are decided, and reported, exactly as IRVCalculator
+does.
+
+Multi-seat STV transfers fractional weights that depend on every earlier
+round, so it is recounted in full (on the numpy engine), lazily and only
+when the result is asked for.
+"""
+
+import threading
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+from .profile import BallotProfile
+from .batch import first_preferences
+from .positional import positional_scores
+from .irv import first_continuing_tally
+from .stv import STVCalculator, Candidate as STVCandidate
+
+
+def round_decision(tallies: np.ndarray, continuing: np.ndarray, quota: int,
+                   seats: int = 1) -> Tuple[str, int]:
+    """
+    One round before anyone is elected, decided as STV does: elect the
+    leader at quota, elect everyone left once they fit the seats, otherwise
+    eliminate the lowest (ties go to the first-listed candidate either way).
+    With one seat this is single-seat STV, whose quota counts exhausted
+    ballots; see irv_decision for an IRV round.
+    """
+    active = np.flatnonzero(continuing)
+    winner = int(active[np.argmax(tallies[active])])
+    if tallies[winner] >= quota:
+        return 'elected', winner
+    if len(active) <= seats:
+        return 'elected_remaining', winner
+    return 'eliminated', int(active[np.argmin(tallies[active])])
+
+
+def irv_decision(tallies: np.ndarray, continuing: np.ndarray) -> Tuple[str, int]:
+    """
+    One IRV round, decided as IRVCalculator does: the leader wins with a
+    majority of the votes still in play, otherwise the lowest is eliminated
+    (ties go to the first-listed candidate).
+    """
+    active = np.flatnonzero(continuing)
+    leader = int(active[np.argmax(tallies[active])])
+    if 2 * tallies[leader] > tallies[active].sum():
+        return 'winner', leader
+    return 'eliminated', int(active[np.argmin(tallies[active])])
+
+
+class RecountSession:
+    """
+    Ballot profile with incrementally maintained count state
+
+    Rankings are stored once each in a growable preference matrix, so a
+    delta for a ranking already present only changes its count.
+
+    Args:
+        candidates: Candidate dicts (id, name, party_id, party_name, color)
+        ballots: Initial BallotProfile (or ballots) over those candidates
+        seats: Seats for the STV count; the IRV count is always kept
+    """
+
+    def __init__(self, candidates: List[Dict[str, Any]], ballots: Any, seats: int = 1):
+        if not candidates:
+            raise ValueError('A recount session needs at least one candidate')
+        self.candidates = candidates
+        self.candidate_ids = [int(c['id']) for c in candidates]
+        self.index = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        self.seats = seats
+        self.lock = threading.Lock()
+
+        profile = BallotProfile.coerce(ballots, self.candidate_ids).aggregate()
+        n = len(self.candidate_ids)
+
+        self._rows: Dict[Tuple[int, ...], int] = {}
+        self._preferences = np.full((max(16, len(profile)), n), BallotProfile.PAD, dtype=np.int32)
+        self._counts = np.zeros(len(self._preferences), dtype=np.int64)
+
+        ordered = np.sort(profile.preferences, axis=1)
+        repeats = ((ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] != BallotProfile.PAD)).any()
+        if repeats:
+            for row, count in zip(profile.preferences.tolist(), profile.counts.tolist()):
+                row = self._row(self._clean(row))
+                self._counts[row] += count
+        else:
+            # Aggregated rows are already distinct rankings; copy them in bulk
+            size, width = profile.preferences.shape
+            self._preferences[:size, :width] = profile.preferences
+            self._counts[:size] = profile.counts
+            for i, (row, length) in enumerate(zip(profile.preferences.tolist(), profile.lengths.tolist())):
+                self._rows[tuple(row[:length])] = i
+
+        current = self.profile
+        self.total_votes = current.total_votes
+        self.first_preferences = first_preferences(current)
+        self.borda = positional_scores(current, ['borda'])[0].round().astype(np.int64)
+        self.pairwise = current.pairwise_matrix().copy()
+
+        self.rounds: List[Dict[str, Any]] = []
+        self.resumed_from: Optional[int] = None
+        self._run_irv(0)
+        self._stv: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    # Ranking store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _clean(row: Iterable[int]) -> Tuple[int, ...]:
+        """Candidate indices up to the padding, repeats dropped"""
+        ranking = []
+        for i in row:
+            if i == BallotProfile.PAD:
+                break
+            if i not in ranking:
+                ranking.append(i)
+        return tuple(ranking)
+
+    def _row(self, ranking: Tuple[int, ...]) -> int:
+        row = self._rows.get(ranking)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._counts):
+                self._preferences = np.concatenate(
+                    [self._preferences, np.full_like(self._preferences, BallotProfile.PAD)])
+                self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+            self._preferences[row, :len(ranking)] = ranking
+            self._rows[ranking] = row
+        return row
+
+    @property
+    def profile(self) -> BallotProfile:
+        """Current ballots as a profile (a view, not a copy)"""
+        size = len(self._rows)
+        return BallotProfile(self._preferences[:size], self._counts[:size], self.candidate_ids)
+
+    # ------------------------------------------------------------------
+    # IRV rounds
+    # ------------------------------------------------------------------
+
+    def _run_irv(self, start: int) -> None:
+        """Count IRV rounds from round `start` (its tallies already in place, if kept)"""
+        del self.rounds[start + 1:]
+        size = len(self._rows)
+        preferences, counts = self._preferences[:size], self._counts[:size]
+
+        if start < len(self.rounds):
+            current = self.rounds[start]
+        elif len(self.candidate_ids) < 2:
+            # A lone candidate wins without a round, as in IRVCalculator
+            return
+        else:
+            continuing = np.ones(len(self.candidate_ids), dtype=bool)
+            current = {'continuing': continuing,
+                       'tallies': first_continuing_tally(preferences, counts, continuing)}
+            self.rounds.append(current)
+
+        while True:
+            action, candidate = irv_decision(current['tallies'], current['continuing'])
+            current['action'], current['candidate'] = action, candidate
+            if action == 'winner':
+                break
+            continuing = current['continuing'].copy()
+            continuing[candidate] = False
+            if continuing.sum() < 2:
+                # Last candidate standing
+                break
+            current = {'continuing': continuing,
+                       'tallies': first_continuing_tally(preferences, counts, continuing)}
+            self.rounds.append(current)
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+
+    def apply(self, deltas: Sequence[Tuple[Sequence[int], int]]) -> Optional[int]:
+        """
+        Add `count` copies of each ranking (candidate ids); negative counts
+        remove copies. Returns the 1-based IRV round the count resumed from,
+        or None when every round's decision stands.
+        """
+        changes = []
+        for preferences, count in deltas:
+            try:
+                ranking = self._clean(self.index[int(cid)] for cid in preferences)
+            except KeyError as e:
+                raise ValueError(f'Ballot references unknown candidate id {e.args[0]}')
+            changes.append((ranking, int(count)))
+
+        # Validate the whole batch before touching any state
+        net: Dict[Tuple[int, ...], int] = {}
+        for ranking, count in changes:
+            net[ranking] = net.get(ranking, 0) + count
+        for ranking, count in net.items():
+            row = self._rows.get(ranking)
+            if (self._counts[row] if row is not None else 0) + count < 0:
+                raise ValueError('Cannot remove more ballots than the profile holds for a ranking')
+
+        n = len(self.candidate_ids)
+        for ranking, count in changes:
+            if count == 0:
+                continue
+            row = self._row(ranking)
+            self._counts[row] += count
+            self.total_votes += count
+            if ranking:
+                positions = np.array(ranking)
+                self.first_preferences[ranking[0]] += count
+                self.borda[positions] += count * (n - 1 - np.arange(len(ranking)))
+                # Every earlier-ranked candidate beats every later one
+                upper = np.triu_indices(len(ranking), 1)
+                np.add.at(self.pairwise, (positions[upper[0]], positions[upper[1]]), count)
+
+            for current in self.rounds:
+                continuing = current['continuing']
+                target = next((i for i in ranking if continuing[i]), None)
+                if target is not None:
+                    current['tallies'][target] += count
+
+        self._stv = None
+        self.resumed_from = None
+        for r, current in enumerate(self.rounds):
+            decision = irv_decision(current['tallies'], current['continuing'])
+            if decision != (current['action'], current['candidate']):
+                self._run_irv(r)
+                self.resumed_from = r + 1
+                break
+        return self.resumed_from
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    @property
+    def irv_winner(self) -> int:
+        """Candidate index of the IRV winner"""
+        if not self.rounds:
+            return 0
+        final = self.rounds[-1]
+        if final['action'] == 'winner':
+            return final['candidate']
+        remaining = final['continuing'].copy()
+        remaining[final['candidate']] = False
+        return int(np.flatnonzero(remaining)[0])
+
+    def irv_result(self) -> Dict[str, Any]:
+        """IRV count with `rounds` in IRVCalculator's round-by-round.js schema"""
+        ids = self.candidate_ids
+        rounds = []
+        for number, r in enumerate(self.rounds, start=1):
+            active_votes = int(r['tallies'][r['continuing']].sum())
+            candidate = ids[r['candidate']]
+            rounds.append({
+                'round': number,
+                'voteCounts': dict(zip(ids, r['tallies'].tolist())),
+                'totalVotes': active_votes,
+                'exhaustedVotes': int(self.total_votes) - active_votes,
+                'eliminated': candidate if r['action'] == 'eliminated' else None,
+                'winner': candidate if r['action'] == 'winner' else None,
+                'action': r['action']
+            })
+        return {
+            'winner': ids[self.irv_winner],
+            'eliminated': [ids[r['candidate']] for r in self.rounds if r['action'] == 'eliminated'],
+            'rounds': rounds,
+            'resumed_from_round': self.resumed_from
+        }
+
+    def stv_result(self) -> Dict[str, Any]:
+        """Full STV count of the current ballots, cached until the next delta"""
+        if self._stv is None:
+            calculator = STVCalculator([STVCandidate(**c) for c in self.candidates], self.seats, engine='numpy')
+            self._stv = calculator.run_election(self.profile)
+        return self._stv
+
+    def condorcet_winner(self) -> Optional[int]:
+        beats = self.pairwise > self.pairwise.T
+        undefeated = np.flatnonzero(~beats.any(axis=0))
+        return self.candidate_ids[undefeated[0]] if len(undefeated) else None
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serializable summary of every maintained count"""
+        ids = self.candidate_ids
+        state = {
+            'total_votes': int(self.total_votes),
+            'unique_rankings': int(np.count_nonzero(self._counts[:len(self._rows)])),
+            'first_preferences': dict(zip(ids, self.first_preferences.tolist())),
+            'borda': dict(zip(ids, self.borda.tolist())),
+            'pairwise': {
+                a: {b: int(self.pairwise[i, j]) for j, b in enumerate(ids) if i != j}
+                for i, a in enumerate(ids)
+            },
+            'condorcet_winner': self.condorcet_winner(),
+            'irv': self.irv_result()
+        }
+        if self.seats > 1:
+            state['stv'] = self.stv_result()
+        return state
@@ -0,0 +1,206 @@
+"""
+Streaming Ballot Ingestion
+Folds NDJSON or CSV ballot rows into a deduplicated count table as they are read
+
+Rows are read one at a time and never collected; memory grows with the
+number of distinct rankings (plus a bounded batch of distinct raw rows), not
+with the number of ballots. The resulting table becomes a BallotProfile for
+any calculator.
+
+NDJSON: the first line is a meta object holding "candidates" (and any other
+request options); every following line is a ballot, either
+{"preferences": [1, 2, 3], "count": 4} or a bare [1, 2, 3].
+
+CSV: meta is supplied separately. The header names the columns; a "count"
+column is optional and every other column is a ranking position, in order.
+Cells hold candidate ids or names. Blank, "skipped" and "undervote" cells
+are passed over, an "overvote" ends the ranking, and repeated candidates
+keep their first position.
+"""
+
+import csv
+import json
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
+from .profile import BallotProfile
+
+
+SKIPPED = {'', 'skipped', 'undervote'}
+OVERVOTE = 'overvote'
+
+
+class RankingTally:
+    """Count table of distinct rankings (tuples of candidate ids)"""
+
+    __slots__ = ('counts', 'ballots')
+
+    def __init__(self):
+        self.counts: Dict[Tuple[int, ...], int] = {}
+        self.ballots = 0
+
+    def add(self, ranking: Tuple[int, ...], count: int = 1) -> None:
+        if count < 0:
+            raise ValueError('Ballot count cannot be negative')
+        self.counts[ranking] = self.counts.get(ranking, 0) + count
+        self.ballots += count
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def to_profile(self, candidate_ids: List[int]) -> BallotProfile:
+        return BallotProfile.from_rankings(self.counts.items(), candidate_ids)
+
+
+class _CandidateLookup:
+    """Resolve a ballot entry (id, numeric string or candidate name) to an id"""
+
+    def __init__(self, candidates: List[Dict[str, Any]]):
+        self.ids = {int(c['id']) for c in candidates}
+        self.by_text = {str(c['id']): int(c['id']) for c in candidates}
+        for c in candidates:
+            self.by_text.setdefault(str(c.get('name', '')).strip().lower(), int(c['id']))
+
+    def __call__(self, entry: Union[int, str]) -> int:
+        if isinstance(entry, int) and entry in self.ids:
+            return entry
+        key = str(entry).strip()
+        cid = self.by_text.get(key, self.by_text.get(key.lower()))
+        if cid is None:
+            raise ValueError(f'Ballot references unknown candidate {entry!r}')
+        return cid
+
+
+def _ranking(entries: Iterable[Union[int, str]], lookup: _CandidateLookup) -> Tuple[int, ...]:
+    ranking = []
+    for entry in entries:
+        if isinstance(entry, str):
+            marker = entry.strip().lower()
+            if marker in SKIPPED:
+                continue
+            if marker == OVERVOTE:
+                break
+        cid = lookup(entry)
+        if cid not in ranking:
+            ranking.append(cid)
+    return tuple(ranking)
+
+
+def _text_lines(stream: Iterable[Union[bytes, str]]) -> Iterable[str]:
+    for line in stream:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+class _RawFold:
+    """
+    Identical raw rows counted before they are parsed
+
+    Cast-vote records repeat the same few rows many times, so each distinct
+    row is parsed once per batch. The table is flushed into the tally every
+    RAW_BATCH distinct rows, which keeps it bounded even when every row is
+    unique (e.g. rows carrying a ballot id).
+    """
+
+    RAW_BATCH = 1 << 16
+
+    def __init__(self, parse, tally: RankingTally, label: str):
+        self.parse = parse
+        self.tally = tally
+        self.label = label
+        self.rows: Dict[Any, List[int]] = {}
+
+    def add(self, key, number: int) -> None:
+        seen = self.rows.get(key)
+        if seen is None:
+            self.rows[key] = [1, number]
+            if len(self.rows) >= self.RAW_BATCH:
+                self.flush()
+        else:
+            seen[0] += 1
+
+    def flush(self) -> None:
+        for key, (occurrences, number) in self.rows.items():
+            try:
+                ranking, count = self.parse(key)
+                self.tally.add(ranking, count * occurrences)
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                raise ValueError(f'{self.label} {number}: {e}')
+        self.rows = {}
+
+
+def read_ndjson(stream: Iterable[Union[bytes, str]]) -> Tuple[Dict[str, Any], RankingTally]:
+    """Parse a meta line followed by ballot lines; returns (meta, tally)"""
+    lines = iter(stream)
+    meta = None
+    for line in lines:
+        if line.strip():
+            meta = json.loads(line)
+            break
+    if not isinstance(meta, dict) or 'candidates' not in meta:
+        raise ValueError('NDJSON ballots must start with a meta line holding "candidates"')
+
+    lookup = _CandidateLookup(meta['candidates'])
+
+    def parse(line):
+        ballot = json.loads(line)
+        if isinstance(ballot, dict):
+            return _ranking(ballot['preferences'], lookup), int(ballot.get('count', 1))
+        return _ranking(ballot, lookup), 1
+
+    tally = RankingTally()
+    fold = _RawFold(parse, tally, 'Line')
+    for number, line in enumerate(lines, start=2):
+        line = line.strip()
+        if line:
+            fold.add(line, number)
+    fold.flush()
+
+    return meta, tally
+
+
+def read_csv(stream: Iterable[Union[bytes, str]], candidates: List[Dict[str, Any]]) -> RankingTally:
+    """Parse CSV ranking rows (header first) into a tally"""
+    rows = csv.reader(_text_lines(stream))
+    header = next(rows, None)
+    tally = RankingTally()
+    if header is None:
+        return tally
+
+    columns = [name.strip().lower() for name in header]
+    count_column = columns.index('count') if 'count' in columns else None
+    rank_columns = [i for i in range(len(columns)) if i != count_column]
+    lookup = _CandidateLookup(candidates)
+
+    def parse(row):
+        count = int(row[count_column]) if count_column is not None else 1
+        return _ranking((row[i] for i in rank_columns if i < len(row)), lookup), count
+
+    fold = _RawFold(parse, tally, 'Row')
+    for number, row in enumerate(rows, start=2):
+        if row:
+            fold.add(tuple(row), number)
+    fold.flush()
+
+    return tally
+
+
+def read_ballot_stream(stream: Iterable[Union[bytes, str]],
+                       content_type: str,
+                       meta: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], BallotProfile]:
+    """
+    Read a streamed ballot upload into (meta, profile)
+
+    Args:
+        stream: Binary or text line iterator (e.g. a request stream)
+        content_type: 'application/x-ndjson' or 'text/csv'
+        meta: Request options for CSV uploads, including "candidates"
+    """
+    if content_type == 'application/x-ndjson':
+        meta, tally = read_ndjson(stream)
+    elif content_type == 'text/csv':
+        if not meta or 'candidates' not in meta:
+            raise ValueError('CSV ballots need meta with "candidates"')
+        tally = read_csv(stream, meta['candidates'])
+    else:
+        raise ValueError(f'Unsupported ballot content type: {content_type}')
+
+    return meta, tally.to_profile([c['id'] for c in meta['candidates']])
@@ -0,0 +1,169 @@
+"""
+Instant-Runoff Voting (IRV) Calculator
+Round-by-round IRV with the output schema of calculateIRV_Full in calculations.js
+
+Each round counts every ballot for its first continuing preference. A
+candidate holding more than half of the votes still in play wins; otherwise
+the candidate with the fewest votes is eliminated (ties go to the
+first-listed candidate) and only that candidate's ballots move on. Every
+ballot keeps a pointer to its current preference, so a round touches the
+eliminated candidate's rows instead of the whole profile.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Union
+from dataclasses import dataclass
+
+from .profile import BallotProfile
+
+
+@dataclass
+class Candidate:
+    """Candidate data structure"""
+    id: int
+    name: str
+    party_id: int
+    party_name: str
+    color: str
+
+
+@dataclass
+class Ballot:
+    """Ballot with ranked preferences"""
+    preferences: List[int]
+    count: int = 1
+
+
+def first_continuing(preferences: np.ndarray, continuing: np.ndarray) -> np.ndarray:
+    """Each row's first continuing candidate index (-1 once exhausted)"""
+    # The -1 padding indexes the appended False
+    live = np.append(continuing, False)[preferences]
+    first = np.full(len(preferences), BallotProfile.PAD, dtype=np.int32)
+    rows = np.flatnonzero(live.any(axis=1))
+    if len(rows):
+        first[rows] = preferences[rows, live[rows].argmax(axis=1)]
+    return first
+
+
+def tally_first(first: np.ndarray, counts: np.ndarray, num_candidates: int) -> np.ndarray:
+    """Votes per candidate index for a first_continuing vector"""
+    ranked = first != BallotProfile.PAD
+    return np.bincount(first[ranked], weights=counts[ranked],
+                       minlength=num_candidates).round().astype(np.int64)
+
+
+def first_continuing_tally(preferences: np.ndarray, counts: np.ndarray,
+                           continuing: np.ndarray) -> np.ndarray:
+    """Votes per candidate index, each ballot counting for its first continuing preference"""
+    return tally_first(first_continuing(preferences, continuing), counts, len(continuing))
+
+
+class IRVCalculator:
+    """
+    Instant-Runoff Voting: repeated elimination until one candidate holds a
+    majority of the continuing votes
+    """
+
+    def __init__(self, candidates: List[Candidate]):
+        self.candidates = {c.id: c for c in candidates}
+
+    def calculate(self, ballots: Union[List[Ballot], BallotProfile]) -> Dict[str, Any]:
+        """
+        Run the count
+
+        Args:
+            ballots: List of Ballot objects or a BallotProfile
+
+        Returns:
+            Dictionary with `rounds` in the round-by-round.js schema
+            ({round, voteCounts, totalVotes, exhaustedVotes, eliminated,
+            winner, action}), the elimination order, the winner and the
+            final-round results per candidate
+        """
+        candidate_ids = list(self.candidates.keys())
+        profile = BallotProfile.coerce(ballots, candidate_ids)
+        n = len(candidate_ids)
+        counts = profile.counts
+        total_votes = profile.total_votes
+
+        continuing = np.ones(n, dtype=bool)
+        first = first_continuing(profile.preferences, continuing)
+        tallies = tally_first(first, counts, n)
+
+        rounds = []
+        eliminated = []
+        winner = None
+
+        while len(eliminated) < n - 1:
+            active = np.flatnonzero(continuing)
+            active_votes = int(tallies[active].sum())
+
+            round_info = {
+                'round': len(rounds) + 1,
+                'voteCounts': {cid: int(v) for cid, v in zip(candidate_ids, tallies)},
+                'totalVotes': active_votes,
+                'exhaustedVotes': total_votes - active_votes,
+                'eliminated': None,
+                'winner': None
+            }
+            rounds.append(round_info)
+
+            # Majority of the votes still in play
+            leader = int(active[np.argmax(tallies[active])])
+            if 2 * tallies[leader] > active_votes:
+                winner = leader
+                round_info['winner'] = candidate_ids[leader]
+                round_info['action'] = 'winner'
+                break
+
+            loser = int(active[np.argmin(tallies[active])])
+            continuing[loser] = False
+            eliminated.append(loser)
+            round_info['eliminated'] = candidate_ids[loser]
+            round_info['action'] = 'eliminated'
+
+            # Move only the loser's ballots on to their next continuing preference
+            moving = np.flatnonzero(first == loser)
+            first[moving] = first_continuing(profile.preferences[moving], continuing)
+            tallies += tally_first(first[moving], counts[moving], n)
+            tallies[loser] = 0
+
+        if winner is None and continuing.any():
+            # Last candidate standing
+            winner = int(np.flatnonzero(continuing)[0])
+
+        return self._build_results(tallies, eliminated, winner, rounds, total_votes)
+
+    def _build_results(self, tallies: np.ndarray, eliminated: List[int], winner: Any,
+                       rounds: List[Dict[str, Any]], total_votes: int) -> Dict[str, Any]:
+        candidate_ids = list(self.candidates.keys())
+        eliminated_ids = [candidate_ids[i] for i in eliminated]
+        winner_id = candidate_ids[winner] if winner is not None else None
+
+        results = []
+        for i, (cid, candidate) in enumerate(self.candidates.items()):
+            votes = int(tallies[i])
+            results.append({
+                'id': cid,
+                'name': candidate.name,
+                'party': candidate.party_name,
+                'color': candidate.color,
+                'votes': votes,
+                'percentage': (votes / total_votes * 100) if total_votes > 0 else 0,
+                'eliminated': cid in eliminated_ids,
+                'winner': cid == winner_id
+            })
+
+        results.sort(key=lambda x: x['votes'], reverse=True)
+        exhausted = total_votes - int(tallies.sum())
+
+        return {
+            'results': results,
+            'winner': winner_id,
+            'winner_name': self.candidates[winner_id].name if winner_id is not None else None,
+            'eliminated': eliminated_ids,
+            'rounds': rounds,
+            'total_votes': total_votes,
+            'exhausted_votes': exhausted,
+            'method': 'Instant-Runoff Voting'
+        }
@@ -0,0 +1,28 @@
+"""
+Proportionality Metrics
+Disproportionality indices comparing party vote shares with seat shares
+
+Shares are percentages. Both functions reduce over the last axis, so a
+(scenarios x parties) pair of arrays gives one index per scenario.
+"""
+
+import numpy as np
+
+
+def gallagher_index(vote_shares, seat_shares) -> np.ndarray:
+    """Gallagher least-squares index: sqrt(1/2 * sum((v - s)^2))"""
+    diff = np.asarray(vote_shares, dtype=np.float64) - np.asarray(seat_shares, dtype=np.float64)
+    return np.sqrt(0.5 * np.square(diff).sum(axis=-1))
+
+
+def loosemore_hanby_index(vote_shares, seat_shares) -> np.ndarray:
+    """Loosemore-Hanby index: 1/2 * sum(|v - s|)"""
+    diff = np.asarray(vote_shares, dtype=np.float64) - np.asarray(seat_shares, dtype=np.float64)
+    return 0.5 * np.abs(diff).sum(axis=-1)
+
+
+def shares(counts) -> np.ndarray:
+    """Percentage shares along the last axis (all zero where the total is zero)"""
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts * 100, total, out=np.zeros_like(counts), where=total > 0)
@@ -3,9 +3,24 @@ Multi-District Electoral Systems
 Handles MMP and Parallel Voting across multiple districts
 """
 
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence, Union
 from dataclasses import dataclass
-from collections import defaultdict
+
+from .apportionment import LARGEST_REMAINDER_METHODS, allocate_seats, minimum_house_size, normalize_method
+from .metrics import gallagher_index, loosemore_hanby_index, shares
+from .proportional import allocate_matrix, award_order, eligible_parties, seats_from_order
+
+
+# How MMP handles district seats beyond a party's proportional entitlement:
+# - overhang: keep them and let the house grow by the excess
+# - leveling: enlarge the house until every party's district seats fit
+# - capped: drop the weakest excess district wins so the house stays fixed
+# - regional: allocate list seats region by region (Scottish additional member)
+MMP_MODES = ('overhang', 'leveling', 'capped', 'regional')
+
+# MMP modes a parameter sweep can share precomputation across
+SWEEP_MMP_MODES = ('overhang', 'leveling')
 
 
 @dataclass
@@ -25,6 +40,132 @@ class District:
     name: str
     candidates: List[int]  # List of candidate IDs
     votes: Dict[int, int]  # Map candidate_id -> votes
+    region_id: Optional[int] = None  # List region, for regional MMP
+
+
+class DistrictMatrix:
+    """
+    Columnar district results
+
+    - votes: (districts x candidates) vote matrix, one column per candidate
+    - candidate_ids / party_ids: candidate id and party id of every column
+    - contested: optional (districts x candidates) mask of who stands where;
+      None means every candidate stands in every district
+    - region_ids: optional list region of every district
+
+    Winners, margins, turnout and party seat counts are array reductions over
+    the matrix, so a national map costs a handful of NumPy calls rather than
+    one Python loop iteration per district. Ties go to the leftmost column.
+    """
+
+    __slots__ = ('votes', 'candidate_ids', 'party_ids', 'district_ids', 'district_names',
+                 'contested', 'region_ids')
+
+    def __init__(self,
+                 votes: np.ndarray,
+                 candidate_ids: Sequence[int],
+                 party_ids: Sequence[int],
+                 district_ids: Optional[Sequence[int]] = None,
+                 district_names: Optional[Sequence[str]] = None,
+                 contested: Optional[np.ndarray] = None,
+                 region_ids: Optional[Sequence[int]] = None):
+        votes = np.asarray(votes)
+        if votes.ndim != 2:
+            raise ValueError('District votes must be a (districts x candidates) matrix')
+        if votes.dtype.kind not in 'iuf':
+            votes = votes.astype(np.float64)
+        if len(candidate_ids) != votes.shape[1] or len(party_ids) != votes.shape[1]:
+            raise ValueError('Need one candidate id and party id per vote column')
+        if (votes < 0).any():
+            raise ValueError('District votes cannot be negative')
+
+        self.votes = votes
+        self.candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+        self.party_ids = np.asarray(party_ids, dtype=np.int64)
+        self.district_ids = (np.arange(1, len(votes) + 1) if district_ids is None
+                             else np.asarray(district_ids, dtype=np.int64))
+        self.district_names = district_names
+        self.contested = None if contested is None else np.asarray(contested, dtype=bool)
+        self.region_ids = None if region_ids is None else np.asarray(region_ids, dtype=np.int64)
+
+    @classmethod
+    def from_districts(cls, districts: List[District], candidates: Dict[int, Candidate]) -> 'DistrictMatrix':
+        """Build the matrix from District dataclasses, one column per known candidate"""
+        column = {cid: i for i, cid in enumerate(candidates)}
+        votes = np.zeros((len(districts), len(column)), dtype=np.float64)
+        contested = np.zeros(votes.shape, dtype=bool)
+        integral = True
+
+        for row, district in enumerate(districts):
+            for cid, v in district.votes.items():
+                try:
+                    col = column[int(cid)]
+                except KeyError:
+                    raise ValueError(f'District {district.id} references unknown candidate id {cid}')
+                votes[row, col] = v
+                contested[row, col] = True
+                integral = integral and isinstance(v, int)
+
+        return cls(
+            votes.astype(np.int64) if integral else votes,
+            list(column),
+            [c.party_id for c in candidates.values()],
+            district_ids=[d.id for d in districts],
+            district_names=[d.name for d in districts],
+            contested=contested,
+            region_ids=None if any(d.region_id is None for d in districts) else [d.region_id for d in districts]
+        )
+
+    def __len__(self) -> int:
+        return len(self.votes)
+
+    def fptp(self) -> Dict[str, np.ndarray]:
+        """
+        Per-district FPTP reductions
+
+        Returns arrays of length `districts`: winner (column index),
+        winner_votes, runner_up_votes, margin and turnout.
+        """
+        return fptp_tally(self.votes, self.contested)
+
+    def party_seats(self, winners: np.ndarray) -> Dict[int, int]:
+        """Districts won per party (only parties that won at least one)"""
+        parties, seats = np.unique(self.party_ids[winners], return_counts=True)
+        return dict(zip(parties.tolist(), seats.tolist()))
+
+
+def fptp_tally(votes: np.ndarray, contested: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    FPTP winner, runner-up, margin and turnout along the last axis of `votes`
+
+    Works on (districts x candidates) as well as (scenarios x districts x
+    candidates) stacks. Candidates outside `contested` can never win.
+    """
+    votes = np.asarray(votes)
+    if votes.shape[-1] == 0:
+        raise ValueError('Every district needs at least one candidate')
+
+    standing = votes
+    if contested is not None:
+        if not contested.any(axis=-1).all():
+            raise ValueError('Every district needs at least one candidate')
+        standing = np.where(contested, votes, -1)
+
+    winner = standing.argmax(axis=-1)
+    winner_votes = np.take_along_axis(votes, winner[..., None], axis=-1)[..., 0]
+    if votes.shape[-1] > 1:
+        runner_up = np.partition(standing, -2, axis=-1)[..., -2]
+        runner_up = np.maximum(runner_up, 0)
+    else:
+        runner_up = np.zeros_like(winner_votes)
+
+    return {
+        'winner': winner,
+        'winner_votes': winner_votes,
+        'runner_up_votes': runner_up,
+        'margin': winner_votes - runner_up,
+        'turnout': votes.sum(axis=-1)
+    }
 
 
 class MultiDistrictCalculator:
@@ -37,77 +178,183 @@ class MultiDistrictCalculator:
         self.candidates = {c.id: c for c in candidates}
         self.parties = {int(k): v for k, v in parties.items()}  # Ensure integer keys
     
-    def calculate_fptp_winners(self, districts: List[District]) -> Dict[str, Any]:
+    def calculate_fptp_winners(
+        self,
+        districts: Union[List[District], DistrictMatrix],
+        include_districts: bool = True,
+        page: Optional[int] = None,
+        page_size: int = 100
+    ) -> Dict[str, Any]:
         """
         Calculate FPTP winners across multiple districts
         
+        Args:
+            districts: District list or a columnar DistrictMatrix
+            include_districts: Build the per-district winner dicts
+            page: 1-based page of districts to return (None returns them all)
+            page_size: Districts per page
+        
         Returns district winners and party aggregation
         """
-        district_winners = []
-        party_district_seats = defaultdict(int)
+        matrix = self._as_matrix(districts)
+        return self._fptp_results(matrix, matrix.fptp(), include_districts, page, page_size)
+    
+    def _fptp_results(self, matrix: DistrictMatrix, tally: Dict[str, np.ndarray],
+                      include_districts: bool = True, page: Optional[int] = None,
+                      page_size: int = 100) -> Dict[str, Any]:
+        """FPTP summary (and optionally district rows) from precomputed reductions"""
+        results = {
+            'party_district_seats': matrix.party_seats(tally['winner']),
+            'total_districts': len(matrix),
+            'total_votes': tally['turnout'].sum().item()
+        }
         
-        for district in districts:
-            # Ensure votes dict has integer keys
-            votes_int = {int(k): v for k, v in district.votes.items()}
-            
-            # Find winner in this district
-            winner_id = max(votes_int.keys(), key=lambda k: votes_int[k])
-            winner = self.candidates[winner_id]
-            winner_votes = votes_int[winner_id]
-            
-            district_winners.append({
-                'district_id': district.id,
-                'district_name': district.name,
+        if include_districts:
+            start, stop = 0, len(matrix)
+            if page is not None:
+                if page < 1 or page_size < 1:
+                    raise ValueError('page and page_size must be positive')
+                start = min((page - 1) * page_size, len(matrix))
+                stop = min(start + page_size, len(matrix))
+                results['page'] = page
+                results['page_size'] = page_size
+                results['total_pages'] = -(-len(matrix) // page_size)
+            results['district_winners'] = self._district_rows(matrix, tally, start, stop)
+        
+        return results
+    
+    def calculate_fptp_scenarios(self, votes: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        FPTP summaries for a stack of scenarios over the same district map
+        
+        Args:
+            votes: (scenarios x districts x candidates) votes, columns in
+                candidate order
+        
+        Returns one {party_district_seats, total_districts, total_votes,
+        mean_margin} summary per scenario
+        """
+        votes = np.asarray(votes)
+        if votes.ndim != 3 or votes.shape[2] != len(self.candidates):
+            raise ValueError('Scenario votes must be scenarios x districts x candidates')
+        
+        tally = fptp_tally(votes)
+        party_ids = [c.party_id for c in self.candidates.values()]
+        parties, party_index = np.unique(party_ids, return_inverse=True)
+        
+        # Seats per (scenario, party) with one bincount over offset party indices
+        winners = party_index[tally['winner']] + np.arange(len(votes))[:, None] * len(parties)
+        seats = np.bincount(winners.ravel(), minlength=len(votes) * len(parties))
+        seats = seats.reshape(len(votes), len(parties))
+        
+        return [
+            {
+                'party_district_seats': {int(p): int(n) for p, n in zip(parties, row) if n > 0},
+                'total_districts': votes.shape[1],
+                'total_votes': tally['turnout'][i].sum().item(),
+                'mean_margin': float(tally['margin'][i].mean()) if votes.shape[1] else 0.0
+            }
+            for i, row in enumerate(seats)
+        ]
+    
+    def _as_matrix(self, districts: Union[List[District], DistrictMatrix]) -> DistrictMatrix:
+        if isinstance(districts, DistrictMatrix):
+            return districts
+        return DistrictMatrix.from_districts(districts, self.candidates)
+    
+    def _district_rows(self, matrix: DistrictMatrix, tally: Dict[str, np.ndarray],
+                       start: int, stop: int) -> List[Dict[str, Any]]:
+        """Per-district winner dicts for districts[start:stop]"""
+        rows = []
+        winners = tally['winner'][start:stop].tolist()
+        winner_ids = matrix.candidate_ids[tally['winner'][start:stop]].tolist()
+        columns = zip(
+            matrix.district_ids[start:stop].tolist(),
+            winner_ids,
+            tally['winner_votes'][start:stop].tolist(),
+            tally['turnout'][start:stop].tolist(),
+            tally['margin'][start:stop].tolist()
+        )
+        
+        for offset, (district_id, winner_id, votes, turnout, margin) in enumerate(columns):
+            winner = self.candidates.get(winner_id)
+            party_id = int(matrix.party_ids[winners[offset]])
+            names = matrix.district_names
+            rows.append({
+                'district_id': district_id,
+                'district_name': names[start + offset] if names is not None else f'District {district_id}',
                 'winner_id': winner_id,
-                'winner_name': winner.name,
-                'party_id': winner.party_id,
-                'party_name': winner.party_name,
-                'votes': winner_votes,
-                'total_votes': sum(votes_int.values())
+                'winner_name': winner.name if winner else f'Candidate {winner_id}',
+                'party_id': party_id,
+                'party_name': winner.party_name if winner else self._party_name(party_id),
+                'votes': votes,
+                'total_votes': turnout,
+                'margin': margin
             })
-            
-            party_district_seats[winner.party_id] += 1
         
-        return {
-            'district_winners': district_winners,
-            'party_district_seats': dict(party_district_seats),
-            'total_districts': len(districts)
-        }
+        return rows
+    
+    def _party_name(self, party_id: int) -> str:
+        party_info = self.parties.get(party_id, {})
+        return party_info.get('name', f'Party {party_id}') if isinstance(party_info, dict) else f'Party {party_id}'
     
     def calculate_multi_district_mmp(
         self, 
-        districts: List[District],
+        districts: Union[List[District], DistrictMatrix],
         party_votes: Dict[int, int],
         list_seats: int,
         allocation_method: str = 'dhondt',
-        threshold: float = 0.0
+        threshold: float = 0.0,
+        include_districts: bool = True,
+        mode: str = 'overhang',
+        regions: Optional[Dict[int, Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """
         Calculate MMP results with multiple districts
         
         Districts elect representatives via FPTP
         List seats are allocated to achieve proportionality
+        
+        Args:
+            mode: 'overhang', 'leveling', 'capped' or 'regional' (see MMP_MODES)
+            regions: For regional mode, map region_id -> {"name", "party_votes",
+                "list_seats"}; `party_votes` and `list_seats` are then ignored
         """
+        if mode not in MMP_MODES:
+            raise ValueError(f'Unknown MMP mode: {mode}')
+        
         # Calculate district winners
-        district_results = self.calculate_fptp_winners(districts)
+        matrix = self._as_matrix(districts)
+        tally = matrix.fptp()
+        district_results = self._fptp_results(matrix, tally, include_districts)
         party_district_seats = district_results['party_district_seats']
         
+        if mode == 'regional':
+            return self._mmp_regional(matrix, tally, district_results, regions or {},
+                                      allocation_method, threshold)
+        
         # Calculate total seats each party should get (proportional)
-        total_seats = len(districts) + list_seats
+        base_seats = len(matrix) + list_seats
+        total_seats = base_seats
         total_party_votes = sum(party_votes.values())
+        qualifying_parties = self._qualifying(party_votes, threshold)
         
-        # Apply threshold
-        qualifying_parties = {}
-        for party_id, votes in party_votes.items():
-            vote_share = (votes / total_party_votes * 100) if total_party_votes > 0 else 0
-            if vote_share >= threshold:
-                qualifying_parties[party_id] = votes
+        if mode == 'leveling':
+            # Smallest house in which every qualifying party's district seats fit
+            party_ids = list(qualifying_parties)
+            total_seats = minimum_house_size(
+                [qualifying_parties[p] for p in party_ids],
+                [party_district_seats.get(p, 0) for p in party_ids],
+                base_seats,
+                allocation_method
+            )
         
         # Allocate total seats proportionally
-        if allocation_method == 'dhondt':
-            entitled_seats = self._allocate_dhondt(qualifying_parties, total_seats)
-        else:
-            entitled_seats = self._allocate_sainte_lague(qualifying_parties, total_seats)
+        entitled_seats = self._allocate(qualifying_parties, total_seats, allocation_method)
+        
+        uncovered = []
+        if mode == 'capped':
+            party_district_seats, uncovered = self._cap_district_seats(matrix, tally, entitled_seats)
         
         # Calculate list seats and overhang
         party_results = []
@@ -124,49 +371,191 @@ class MultiDistrictCalculator:
             overhang = max(0, district_won - entitled)
             total_overhang += overhang
             
-            actual_seats = district_won + list_won
+            party_results.append(self._mmp_party_row(
+                party_id, party_votes.get(party_id, 0), total_party_votes,
+                district_won, list_won, entitled, overhang, party_id not in qualifying_parties
+            ))
+        
+        # Calculate final parliament size
+        final_parliament_size = total_seats + total_overhang
+        
+        results = {
+            'type': 'multi_district_mmp',
+            'mode': mode,
+            'party_results': sorted(party_results, key=lambda x: x['actual_seats'], reverse=True),
+            'district_results': district_results,
+            'total_districts': len(matrix),
+            'list_seats': list_seats,
+            'total_overhang': total_overhang,
+            'final_parliament_size': final_parliament_size,
+            'allocation_method': allocation_method,
+            'threshold': threshold
+        }
+        if mode == 'leveling':
+            results['leveling_seats'] = total_seats - base_seats
+        if mode == 'capped':
+            results['uncovered_districts'] = uncovered
+        return results
+    
+    def _qualifying(self, party_votes: Dict[int, int], threshold: float) -> Dict[int, int]:
+        """Parties whose vote share (percent) reaches the threshold"""
+        total_party_votes = sum(party_votes.values())
+        qualifying_parties = {}
+        for party_id, votes in party_votes.items():
+            vote_share = (votes / total_party_votes * 100) if total_party_votes > 0 else 0
+            if vote_share >= threshold:
+                qualifying_parties[party_id] = votes
+        return qualifying_parties
+    
+    def _mmp_party_row(self, party_id: int, votes: int, total_party_votes: int, district_won: int,
+                       list_won: int, entitled: int, overhang: int, below_threshold: bool) -> Dict[str, Any]:
+        # Safely get party info
+        party_info = self.parties.get(party_id, {})
+        party_name = party_info.get('name', f'Party {party_id}') if isinstance(party_info, dict) else f'Party {party_id}'
+        party_color = party_info.get('color', '#666') if isinstance(party_info, dict) else '#666'
+        
+        return {
+            'party_id': party_id,
+            'party_name': party_name,
+            'color': party_color,
+            'party_votes': votes,
+            'vote_share': (votes / total_party_votes * 100) if total_party_votes > 0 else 0,
+            'district_seats': district_won,
+            'list_seats': list_won,
+            'entitled_seats': entitled,
+            'actual_seats': district_won + list_won,
+            'overhang_seats': overhang,
+            'below_threshold': below_threshold
+        }
+    
+    def _cap_district_seats(self, matrix: DistrictMatrix, tally: Dict[str, np.ndarray],
+                            entitled_seats: Dict[int, int]):
+        """
+        Keep each party's strongest district wins up to its entitlement
+        
+        Returns (district seats kept per party, uncovered district rows).
+        Wins are ranked by the winner's share of the district vote; equal
+        shares keep the earlier district.
+        """
+        winners = tally['winner']
+        winner_party = matrix.party_ids[winners]
+        turnout = tally['turnout'].astype(np.float64)
+        share = np.divide(tally['winner_votes'], turnout, out=np.zeros(len(turnout)), where=turnout > 0)
+        
+        # Group districts by party, strongest share first, and rank within each group
+        order = np.lexsort((-share, winner_party))
+        grouped = winner_party[order]
+        rank = np.arange(len(order)) - np.searchsorted(grouped, grouped, side='left')
+        parties, party_index = np.unique(grouped, return_inverse=True)
+        allowed = np.array([entitled_seats.get(int(p), 0) for p in parties], dtype=np.int64)
+        
+        covered = np.empty(len(order), dtype=bool)
+        covered[order] = rank < allowed[party_index]
+        
+        uncovered = []
+        for row in np.flatnonzero(~covered).tolist():
+            district_id = int(matrix.district_ids[row])
+            names = matrix.district_names
+            uncovered.append({
+                'district_id': district_id,
+                'district_name': names[row] if names is not None else f'District {district_id}',
+                'winner_id': int(matrix.candidate_ids[winners[row]]),
+                'party_id': int(winner_party[row]),
+                'vote_share': float(share[row] * 100)
+            })
+        
+        return matrix.party_seats(winners[covered]), uncovered
+    
+    def _mmp_regional(self, matrix: DistrictMatrix, tally: Dict[str, np.ndarray],
+                      district_results: Dict[str, Any], regions: Dict[int, Dict[str, Any]],
+                      allocation_method: str, threshold: float) -> Dict[str, Any]:
+        """
+        Regional additional member system (Scottish Parliament style)
+        
+        Each region's list seats are allocated with the divisor of every party
+        starting from the district seats it won in that region, so there is no
+        house-wide overhang to settle afterwards.
+        """
+        if not regions:
+            raise ValueError('Regional MMP needs regions with party_votes and list_seats')
+        if matrix.region_ids is None:
+            raise ValueError('Regional MMP needs a region_id for every district')
+        
+        regions = {int(k): v for k, v in regions.items()}
+        unknown = set(np.unique(matrix.region_ids).tolist()) - set(regions)
+        if unknown:
+            raise ValueError(f'No regional list for region {min(unknown)}')
+        
+        party_votes: Dict[int, int] = {}
+        list_totals: Dict[int, int] = {}
+        entitled_totals: Dict[int, int] = {}
+        overhang_totals: Dict[int, int] = {}
+        qualified = set()
+        region_results = []
+        
+        for region_id, region in regions.items():
+            in_region = matrix.region_ids == region_id
+            district_won = matrix.party_seats(tally['winner'][in_region])
+            votes = {int(k): v for k, v in region['party_votes'].items()}
+            qualifying_parties = self._qualifying(votes, threshold)
             
-            # Safely get party info
-            party_info = self.parties.get(party_id, {})
-            party_name = party_info.get('name', f'Party {party_id}') if isinstance(party_info, dict) else f'Party {party_id}'
-            party_color = party_info.get('color', '#666') if isinstance(party_info, dict) else '#666'
+            list_won = self._allocate_from(qualifying_parties, region['list_seats'],
+                                           allocation_method, district_won)
+            entitled = self._allocate(qualifying_parties, int(in_region.sum()) + region['list_seats'],
+                                      allocation_method)
             
-            party_results.append({
-                'party_id': party_id,
-                'party_name': party_name,
-                'color': party_color,
-                'party_votes': party_votes.get(party_id, 0),
-                'vote_share': (party_votes.get(party_id, 0) / total_party_votes * 100) if total_party_votes > 0 else 0,
+            for party_id in set(votes) | set(district_won):
+                party_votes[party_id] = party_votes.get(party_id, 0) + votes.get(party_id, 0)
+                list_totals[party_id] = list_totals.get(party_id, 0) + list_won.get(party_id, 0)
+                entitled_totals[party_id] = entitled_totals.get(party_id, 0) + entitled.get(party_id, 0)
+                overhang = max(0, district_won.get(party_id, 0) - entitled.get(party_id, 0))
+                overhang_totals[party_id] = overhang_totals.get(party_id, 0) + overhang
+            qualified.update(qualifying_parties)
+            
+            region_results.append({
+                'region_id': region_id,
+                'region_name': region.get('name', f'Region {region_id}'),
+                'districts': int(in_region.sum()),
+                'list_seats': region['list_seats'],
                 'district_seats': district_won,
-                'list_seats': list_won,
-                'entitled_seats': entitled,
-                'actual_seats': actual_seats,
-                'overhang_seats': overhang,
-                'below_threshold': party_id not in qualifying_parties
+                'party_list_seats': {p: n for p, n in list_won.items() if n > 0}
             })
         
-        # Calculate final parliament size
-        final_parliament_size = len(districts) + list_seats + total_overhang
+        total_party_votes = sum(party_votes.values())
+        party_district_seats = district_results['party_district_seats']
+        party_results = [
+            self._mmp_party_row(
+                party_id, party_votes.get(party_id, 0), total_party_votes,
+                party_district_seats.get(party_id, 0), list_totals.get(party_id, 0),
+                entitled_totals.get(party_id, 0), overhang_totals.get(party_id, 0),
+                party_id not in qualified
+            )
+            for party_id in party_votes
+        ]
+        total_list_seats = sum(r['list_seats'] for r in regions.values())
         
         return {
             'type': 'multi_district_mmp',
+            'mode': 'regional',
             'party_results': sorted(party_results, key=lambda x: x['actual_seats'], reverse=True),
             'district_results': district_results,
-            'total_districts': len(districts),
-            'list_seats': list_seats,
-            'total_overhang': total_overhang,
-            'final_parliament_size': final_parliament_size,
+            'region_results': region_results,
+            'total_districts': len(matrix),
+            'list_seats': total_list_seats,
+            'total_overhang': sum(overhang_totals.values()),
+            'final_parliament_size': len(matrix) + total_list_seats,
             'allocation_method': allocation_method,
             'threshold': threshold
         }
     
     def calculate_multi_district_parallel(
         self,
-        districts: List[District],
+        districts: Union[List[District], DistrictMatrix],
         party_votes: Dict[int, int],
         list_seats: int,
         allocation_method: str = 'dhondt',
-        threshold: float = 0.0
+        threshold: float = 0.0,
+        include_districts: bool = True
     ) -> Dict[str, Any]:
         """
         Calculate Parallel Voting results with multiple districts
@@ -174,7 +563,7 @@ class MultiDistrictCalculator:
         District and list seats are calculated independently
         """
         # Calculate district winners
-        district_results = self.calculate_fptp_winners(districts)
+        district_results = self.calculate_fptp_winners(districts, include_districts)
         party_district_seats = district_results['party_district_seats']
         
         # Allocate list seats independently
@@ -188,10 +577,7 @@ class MultiDistrictCalculator:
                 qualifying_parties[party_id] = votes
         
         # Allocate list seats
-        if allocation_method == 'dhondt':
-            party_list_seats = self._allocate_dhondt(qualifying_parties, list_seats)
-        else:
-            party_list_seats = self._allocate_sainte_lague(qualifying_parties, list_seats)
+        party_list_seats = self._allocate(qualifying_parties, list_seats, allocation_method)
         
         # Combine results
         party_results = []
@@ -225,41 +611,138 @@ class MultiDistrictCalculator:
             'threshold': threshold
         }
     
-    def _allocate_dhondt(self, party_votes: Dict[int, int], seats: int) -> Dict[int, int]:
-        """D'Hondt allocation method"""
-        allocation = defaultdict(int)
+    def calculate_parameter_sweep(
+        self,
+        districts: Union[List[District], DistrictMatrix],
+        party_votes: Dict[int, int],
+        system: str = 'mmp',
+        thresholds: Sequence[float] = (0.0,),
+        list_seats: Sequence[int] = (0,),
+        allocation_methods: Sequence[str] = ('dhondt',),
+        mode: str = 'overhang'
+    ) -> Dict[str, Any]:
+        """
+        MMP or parallel results over a grid of thresholds, list seats and
+        allocation methods
         
-        for _ in range(seats):
-            max_quotient = -1
-            max_party = None
-            
-            for party_id, votes in party_votes.items():
-                quotient = votes / (allocation[party_id] + 1)
-                if quotient > max_quotient:
-                    max_quotient = quotient
-                    max_party = party_id
+        District winners are counted once for the whole grid. For divisor
+        methods each threshold's quotient table is sorted once and read off
+        for every house size in the grid (divisor methods are
+        house-monotone), so adding list-seat values costs a bincount each.
+        
+        Args:
+            system: 'mmp' or 'parallel'
+            mode: MMP mode, 'overhang' or 'leveling'
+        
+        Returns:
+            Party and grid axes plus cubes indexed [method][threshold][list_seats]
+            (then [party] for the per-party cubes): total seats, list seats,
+            parliament size, overhang and disproportionality
+        """
+        if system not in ('mmp', 'parallel'):
+            raise ValueError(f'Unknown sweep system: {system}')
+        if system == 'mmp' and mode not in SWEEP_MMP_MODES:
+            raise ValueError(f'MMP sweep supports modes {", ".join(SWEEP_MMP_MODES)}, not {mode}')
+        if not thresholds or not list_seats or not allocation_methods:
+            raise ValueError('Every sweep grid needs at least one value')
+        
+        matrix = self._as_matrix(districts)
+        district_won = matrix.party_seats(matrix.fptp()['winner'])
+        
+        # Party axis: party-vote order, then parties that only won districts
+        party_ids = [int(p) for p in party_votes]
+        party_ids += sorted(p for p in district_won if p not in party_votes)
+        votes = np.array([party_votes.get(p, 0) for p in party_ids], dtype=np.float64)
+        district_seats = np.array([district_won.get(p, 0) for p in party_ids], dtype=np.int64)
+        listed = np.array([p in party_votes for p in party_ids], dtype=bool)
+        
+        thresholds = [float(t) for t in thresholds]
+        list_seats = np.asarray(list_seats, dtype=np.int64)
+        if (list_seats < 0).any():
+            raise ValueError('List seats cannot be negative')
+        
+        # (thresholds x parties): only parties on the party vote qualify
+        vote_rows = np.broadcast_to(votes, (len(thresholds), len(votes)))
+        eligible = np.stack([eligible_parties(votes, t)[0] & listed for t in thresholds])
+        
+        base = list_seats + (len(matrix) if system == 'mmp' else 0)
+        methods = [normalize_method(m) for m in allocation_methods]
+        shape = (len(methods), len(thresholds), len(list_seats))
+        houses = np.empty(shape, dtype=np.int64)
+        allocation = np.empty(shape + (len(party_ids),), dtype=np.int64)
+        
+        for m, method in enumerate(methods):
+            houses[m] = base[None, :]
+            if system == 'mmp' and mode == 'leveling':
+                for t in range(len(thresholds)):
+                    qualifying = np.flatnonzero(eligible[t])
+                    needed = minimum_house_size(votes[qualifying], district_seats[qualifying], 0, method)
+                    houses[m, t] = np.maximum(base, needed)
             
-            if max_party is not None:
-                allocation[max_party] += 1
+            if method in LARGEST_REMAINDER_METHODS:
+                allocation[m] = allocate_matrix(
+                    np.repeat(vote_rows, len(list_seats), axis=0), houses[m].ravel(), method,
+                    eligible=np.repeat(eligible, len(list_seats), axis=0)
+                ).reshape(allocation[m].shape)
+            else:
+                order = award_order(vote_rows, int(houses[m].max()), method, eligible)
+                for i in range(len(list_seats)):
+                    allocation[m, :, i] = seats_from_order(order, houses[m, :, i], len(party_ids))
         
-        return dict(allocation)
+        if system == 'mmp':
+            list_won = np.maximum(allocation - district_seats, 0)
+            overhang = np.maximum(district_seats - allocation, 0).sum(axis=-1)
+            parliament = houses + overhang
+        else:
+            list_won = allocation
+            overhang = np.zeros(shape, dtype=np.int64)
+            parliament = houses + len(matrix)
+        total = district_seats + list_won
+        
+        vote_shares = shares(votes)
+        seat_shares = shares(total)
+        
+        parties = []
+        for party_id in party_ids:
+            party_info = self.parties.get(party_id, {})
+            parties.append({
+                'party_id': party_id,
+                'party_name': self._party_name(party_id),
+                'color': party_info.get('color', '#666') if isinstance(party_info, dict) else '#666'
+            })
+        
+        return {
+            'type': f'multi_district_{system}_sweep',
+            'mode': mode if system == 'mmp' else None,
+            'parties': parties,
+            'total_districts': len(matrix),
+            'district_seats': district_seats.tolist(),
+            'vote_shares': vote_shares.round(4).tolist(),
+            'allocation_methods': methods,
+            'thresholds': thresholds,
+            'list_seats': list_seats.tolist(),
+            'axes': ['allocation_method', 'threshold', 'list_seats', 'party'],
+            'seats': total.tolist(),
+            'list_seats_won': list_won.tolist(),
+            'parliament_size': parliament.tolist(),
+            'overhang': overhang.tolist(),
+            'gallagher': gallagher_index(vote_shares, seat_shares).round(4).tolist(),
+            'loosemore_hanby': loosemore_hanby_index(vote_shares, seat_shares).round(4).tolist()
+        }
+    
+    def _allocate(self, party_votes: Dict[int, int], seats: int, method: str) -> Dict[int, int]:
+        """Allocate seats with any supported divisor or largest-remainder method"""
+        return allocate_seats(party_votes, seats, method)
+    
+    def _allocate_from(self, party_votes: Dict[int, int], seats: int, method: str,
+                       initial: Dict[int, int]) -> Dict[int, int]:
+        """Allocate seats with each party's divisor continuing from `initial` seats held"""
+        return allocate_seats(party_votes, seats, method, initial=initial)
+    
+    def _allocate_dhondt(self, party_votes: Dict[int, int], seats: int) -> Dict[int, int]:
+        """D'Hondt allocation method"""
+        return allocate_seats(party_votes, seats, 'dhondt')
     
     def _allocate_sainte_lague(self, party_votes: Dict[int, int], seats: int) -> Dict[int, int]:
         """Sainte-Laguë allocation method"""
-        allocation = defaultdict(int)
-        
-        for _ in range(seats):
-            max_quotient = -1
-            max_party = None
-            
-            for party_id, votes in party_votes.items():
-                quotient = votes / (2 * allocation[party_id] + 1)
-                if quotient > max_quotient:
-                    max_quotient = quotient
-                    max_party = party_id
-            
-            if max_party is not None:
-                allocation[max_party] += 1
-        
-        return dict(allocation)
-
+        return allocate_seats(party_votes, seats, 'sainte_lague')
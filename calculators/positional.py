@@ -0,0 +1,129 @@
+"""
+Positional Scoring Engine
+Borda, Dowdall, truncated-ballot Borda variants and custom score vectors
+
+Scores come from the profile's position tensor: tally[L, i, k] is the number
+of voters whose ballot ranks L candidates and puts candidate i in position k.
+A rule is a (ballot length x position) score table, so scoring a profile is
+one tensor contraction however many ballots it holds, and many rules can be
+scored against the same tensor.
+"""
+
+import numpy as np
+from typing import Dict, List, Sequence, Tuple, Union
+
+from .profile import BallotProfile
+
+
+ScoringRule = Union[str, Sequence[float]]
+
+RULE_LABELS = {
+    'borda': 'Borda Count (n-1, n-2, ..., 0)',
+    'dowdall': 'Dowdall (1, 1/2, 1/3, ...)',
+    'modified_borda': 'Modified Borda (m, m-1, ..., 1 for m ranked)',
+    'averaged_borda': 'Averaged Borda (unranked candidates share the remaining points)',
+    'plurality': 'Plurality (1, 0, ..., 0)',
+    'antiplurality': 'Anti-plurality (1, ..., 1, 0)',
+}
+
+
+def position_tensor(profile: BallotProfile) -> np.ndarray:
+    """
+    (ballot length + 1) x candidates x positions tensor of voter counts,
+    built with a single bincount over every ranked cell of the profile
+    """
+    n = profile.num_candidates
+    width = profile.preferences.shape[1]
+    lengths = profile.lengths.astype(np.int64)
+
+    cells = (lengths[:, None] * n + profile.preferences) * width + np.arange(width)
+    weights = np.broadcast_to(profile.counts[:, None], cells.shape)
+
+    ranked = profile.preferences != BallotProfile.PAD
+    if not ranked.all():
+        cells, weights = cells[ranked], weights[ranked]
+
+    tally = np.bincount(cells.ravel(), weights=weights.ravel(),
+                        minlength=(width + 1) * n * width)
+    return tally.reshape(width + 1, n, width).astype(np.int64)
+
+
+def score_table(rule: ScoringRule, num_candidates: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the score table for a rule
+
+    Returns (ranked, unranked): ranked[L, k] is the score for position k on a
+    ballot ranking L candidates; unranked[L] is what each candidate left off
+    such a ballot receives.
+    """
+    n = num_candidates
+    lengths = np.arange(width + 1)[:, None]
+    positions = np.arange(width)[None, :]
+    unranked = np.zeros(width + 1)
+
+    if not isinstance(rule, str):
+        vector = np.zeros(width)
+        custom = np.asarray(rule, dtype=np.float64)[:width]
+        vector[:len(custom)] = custom
+        ranked = np.broadcast_to(vector, (width + 1, width))
+    elif rule == 'borda':
+        ranked = np.broadcast_to(n - 1 - positions, (width + 1, width))
+    elif rule == 'dowdall':
+        ranked = np.broadcast_to(1.0 / (positions + 1), (width + 1, width))
+    elif rule == 'modified_borda':
+        ranked = np.maximum(lengths - positions, 0)
+    elif rule == 'averaged_borda':
+        ranked = np.broadcast_to(n - 1 - positions, (width + 1, width))
+        # Candidates left off share the points for positions L..n-1 equally
+        unranked = np.maximum(n - 1 - lengths[:, 0], 0) / 2
+    elif rule == 'plurality':
+        ranked = np.broadcast_to((positions == 0).astype(np.float64), (width + 1, width))
+    elif rule == 'antiplurality':
+        ranked = np.broadcast_to((positions < n - 1).astype(np.float64), (width + 1, width))
+        unranked = (lengths[:, 0] < n - 1).astype(np.float64)
+    else:
+        raise ValueError(f'Unknown scoring rule: {rule}')
+
+    return np.asarray(ranked, dtype=np.float64), unranked
+
+
+def rule_label(rule: ScoringRule) -> str:
+    """Human-readable method description"""
+    if isinstance(rule, str):
+        return RULE_LABELS[rule]
+    return f'Custom positional scores {list(rule)}'
+
+
+def positional_scores(profile: BallotProfile, rules: List[ScoringRule]) -> np.ndarray:
+    """(rules x candidates) matrix of total scores for every rule"""
+    n = profile.num_candidates
+    width = profile.preferences.shape[1]
+    tally = position_tensor(profile).astype(np.float64)
+
+    # Voters per ballot length who did not rank each candidate
+    ballots_per_length = np.bincount(profile.lengths, weights=profile.counts, minlength=width + 1)
+    left_off = ballots_per_length[:, None] - tally.sum(axis=2)
+
+    scores = np.empty((len(rules), n))
+    for r, rule in enumerate(rules):
+        ranked, unranked = score_table(rule, n, width)
+        scores[r] = np.einsum('lik,lk->i', tally, ranked) + unranked @ left_off
+    return scores
+
+
+def normalize_rules(scoring) -> Dict[str, ScoringRule]:
+    """
+    Turn a request's `scoring` value into {label: rule}
+
+    Accepts a rule name, a custom score vector, or a list of those.
+    """
+    if isinstance(scoring, str):
+        return {scoring: scoring}
+    if scoring and all(isinstance(x, (int, float)) for x in scoring):
+        return {'custom': list(scoring)}
+
+    rules = {}
+    for i, rule in enumerate(scoring):
+        key = rule if isinstance(rule, str) else f'custom_{i}'
+        rules[key] = rule
+    return rules
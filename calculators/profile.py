@@ -0,0 +1,229 @@
+"""
+Ballot Profile
+Compact array-backed store of aggregated ranked ballots shared by all calculators
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+
+class BallotProfile:
+    """
+    Aggregated ranked ballots held as NumPy arrays
+
+    - preferences: (unique ballots x longest ranking) int32 matrix of candidate
+      indices, padded with -1 after the last ranked candidate
+    - counts: int64 vector with the number of voters casting each row
+    - candidate_ids: candidate id for every index used in `preferences`
+
+    Calculators work on candidate indices internally and translate back to
+    ids through `candidate_ids` / `index` when building results.
+    """
+
+    PAD = -1
+
+    # Comparison cells per chunk when building the pairwise matrix
+    PAIRWISE_CHUNK = 1 << 21
+
+    __slots__ = ('preferences', 'counts', 'candidate_ids', 'index', '_rank_matrix', '_pairwise')
+
+    def __init__(self, preferences: np.ndarray, counts: np.ndarray, candidate_ids: Sequence[int]):
+        preferences = np.asarray(preferences, dtype=np.int32)
+        if preferences.ndim != 2:
+            preferences = preferences.reshape(len(preferences), -1)
+        counts = np.asarray(counts, dtype=np.int64)
+
+        if len(counts) != len(preferences):
+            raise ValueError('preferences and counts must have the same number of rows')
+
+        self.preferences = preferences
+        self.counts = counts
+        self.candidate_ids = [int(cid) for cid in candidate_ids]
+        self.index = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        self._rank_matrix = None
+        self._pairwise = None
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_rankings(cls,
+                      rankings: Iterable[Tuple[Sequence[int], int]],
+                      candidate_ids: Sequence[int]) -> 'BallotProfile':
+        """Build a profile from (candidate id list, count) pairs"""
+        candidate_ids = [int(cid) for cid in candidate_ids]
+        index = {cid: i for i, cid in enumerate(candidate_ids)}
+
+        rows = []
+        counts = []
+        for preferences, count in rankings:
+            try:
+                rows.append([index[int(cid)] for cid in preferences])
+            except KeyError as e:
+                raise ValueError(f'Ballot references unknown candidate id {e.args[0]}')
+            counts.append(count)
+
+        width = max((len(row) for row in rows), default=0)
+        matrix = np.full((len(rows), width), cls.PAD, dtype=np.int32)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+
+        return cls(matrix, np.array(counts, dtype=np.int64), candidate_ids)
+
+    @classmethod
+    def from_ballots(cls, ballots: Iterable[Any], candidate_ids: Sequence[int]) -> 'BallotProfile':
+        """Build a profile from Ballot dataclasses (any object with preferences/count)"""
+        return cls.from_rankings(((b.preferences, b.count) for b in ballots), candidate_ids)
+
+    @classmethod
+    def from_dicts(cls, ballots: Iterable[Dict[str, Any]], candidate_ids: Sequence[int]) -> 'BallotProfile':
+        """Build a profile straight from JSON ballots: {"preferences": [...], "count": n}"""
+        return cls.from_rankings(((b['preferences'], b.get('count', 1)) for b in ballots), candidate_ids)
+
+    @classmethod
+    def from_index_matrix(cls,
+                          rankings: np.ndarray,
+                          candidate_ids: Sequence[int],
+                          counts: Optional[np.ndarray] = None) -> 'BallotProfile':
+        """
+        Aggregated profile from a (voters x depth) matrix of candidate
+        indices with no padding, as drawn by the ballot generators
+
+        Rows are merged through one integer key per row when the ranking fits
+        in int64 (depth * log2(candidates) < 62) and np.unique over rows
+        otherwise. Rows come back sorted, as from aggregate().
+        """
+        rankings = np.asarray(rankings, dtype=np.int32)
+        counts = np.ones(len(rankings), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        num_candidates, depth = len(candidate_ids), rankings.shape[1]
+        if len(rankings) == 0 or depth * np.log2(max(num_candidates, 2)) >= 62:
+            return cls(rankings, counts, candidate_ids).aggregate()
+
+        place = num_candidates ** np.arange(depth - 1, -1, -1, dtype=np.int64)
+        keys = rankings @ place
+        order = np.argsort(keys)
+        keys = keys[order]
+        # Rows sharing a key are identical, so any one of them stands for the run
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        return cls(rankings[order[starts]], np.add.reduceat(counts[order], starts), candidate_ids)
+
+    @classmethod
+    def coerce(cls,
+               ballots: Union['BallotProfile', Iterable[Any]],
+               candidate_ids: Sequence[int]) -> 'BallotProfile':
+        """
+        Return `ballots` as a profile indexed by `candidate_ids`
+
+        Profiles already using the same candidate order are returned as-is,
+        so passing a profile between calculators never copies the ballots.
+        """
+        candidate_ids = [int(cid) for cid in candidate_ids]
+        if isinstance(ballots, cls):
+            if ballots.candidate_ids == candidate_ids:
+                return ballots
+            return ballots.reindex(candidate_ids)
+        return cls.from_ballots(ballots, candidate_ids)
+
+    def reindex(self, candidate_ids: Sequence[int]) -> 'BallotProfile':
+        """Re-express the profile against a different candidate ordering"""
+        candidate_ids = [int(cid) for cid in candidate_ids]
+        index = {cid: i for i, cid in enumerate(candidate_ids)}
+
+        mapping = np.empty(self.num_candidates + 1, dtype=np.int32)
+        mapping[-1] = self.PAD
+        for i, cid in enumerate(self.candidate_ids):
+            mapping[i] = index.get(cid, self.PAD)
+
+        used = np.unique(self.preferences[self.preferences != self.PAD])
+        missing = [self.candidate_ids[i] for i in used if mapping[i] == self.PAD]
+        if missing:
+            raise ValueError(f'Ballot references unknown candidate id {missing[0]}')
+
+        return BallotProfile(mapping[self.preferences], self.counts, candidate_ids)
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def num_candidates(self) -> int:
+        return len(self.candidate_ids)
+
+    @property
+    def total_votes(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of candidates ranked on each row"""
+        return (self.preferences != self.PAD).sum(axis=1)
+
+    def rank_matrix(self) -> np.ndarray:
+        """
+        (rows x candidates) matrix of the position each candidate holds on each
+        ballot; unranked candidates get the ranking width as their position.
+        Repeated entries keep their first position. Cached on the profile.
+        """
+        if self._rank_matrix is None:
+            rows, width = self.preferences.shape
+            ranks = np.full((rows, self.num_candidates), width, dtype=np.int32)
+            # Write later positions first so the earliest occurrence wins
+            for position in range(width - 1, -1, -1):
+                column = self.preferences[:, position]
+                ranked = column != self.PAD
+                ranks[np.nonzero(ranked)[0], column[ranked]] = position
+            self._rank_matrix = ranks
+        return self._rank_matrix
+
+    def pairwise_matrix(self) -> np.ndarray:
+        """
+        (candidates x candidates) int64 matrix where [i, j] is the number of
+        voters ranking i above j. Only pairs that both appear on a ballot are
+        counted. Built from the rank matrix with one broadcasted comparison per
+        row, weighted by counts, in bounded-size chunks. Cached on the profile.
+        """
+        if self._pairwise is None:
+            n = self.num_candidates
+            ranks = self.rank_matrix()
+            width = self.preferences.shape[1]
+
+            # i beats j on a row when rank_i < rank_j and j is ranked at all:
+            # unranked candidates sit at `width` on the left and -1 on the right
+            right = np.where(ranks < width, ranks, -1)
+            counts = self.counts.astype(np.float64)
+
+            totals = np.zeros(n * n, dtype=np.float64)
+            step = max(1, self.PAIRWISE_CHUNK // max(1, n * n))
+            for start in range(0, len(self), step):
+                stop = start + step
+                beats = ranks[start:stop, :, None] < right[start:stop, None, :]
+                totals += counts[start:stop] @ beats.reshape(len(beats), n * n)
+
+            self._pairwise = totals.reshape(n, n).astype(np.int64)
+        return self._pairwise
+
+    def iter_rankings(self) -> Iterator[Tuple[List[int], int]]:
+        """Yield (candidate id list, count) for every row"""
+        ids = np.array(self.candidate_ids + [self.PAD], dtype=np.int64)
+        for row, count in zip(self.preferences, self.counts):
+            yield ids[row[row != self.PAD]].tolist(), int(count)
+
+    def to_ballots(self, ballot_cls) -> List[Any]:
+        """Materialize one `ballot_cls(preferences=..., count=...)` per row"""
+        return [ballot_cls(preferences=prefs, count=count) for prefs, count in self.iter_rankings()]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """JSON-serializable ballot list"""
+        return [{'preferences': prefs, 'count': count} for prefs, count in self.iter_rankings()]
+
+    def aggregate(self) -> 'BallotProfile':
+        """Merge rows holding the same ranking (rows come back sorted)"""
+        if len(self) == 0:
+            return self
+        unique, inverse = np.unique(self.preferences, axis=0, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=self.counts, minlength=len(unique))
+        return BallotProfile(unique, counts.astype(np.int64), self.candidate_ids)
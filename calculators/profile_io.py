@@ -0,0 +1,249 @@
+"""
+Binary Profile Files
+Save and load BallotProfiles as NumPy .npz archives or Arrow IPC files
+
+Both formats hold the same three things: an int32 preference matrix padded
+with -1, an int64 count column and the candidate ids. Archives written by
+`save_npz` are uncompressed, so `load_npz` can memory-map each member
+straight from disk instead of reading it into memory. Arrow files are
+memory-mapped through pyarrow, which is only needed for that format.
+Loaded arrays are checked as strictly as ballots built by from_rankings,
+since a file can hold indices no ranking maps to.
+"""
+
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+import numpy as np
+from typing import BinaryIO, Dict, Optional, Union
+
+from .profile import BallotProfile
+
+
+FORMATS = ('npz', 'arrow')
+
+MIMETYPES = {
+    'npz': 'application/x-npz',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+def save_profile(profile: BallotProfile, sink: Union[str, os.PathLike, BinaryIO], fmt: str = 'npz') -> None:
+    """Write a profile in the given binary format"""
+    if fmt == 'npz':
+        save_npz(profile, sink)
+    elif fmt == 'arrow':
+        save_arrow(profile, sink)
+    else:
+        raise ValueError(f'Unknown profile format: {fmt}')
+
+
+def load_profile(source: Source, fmt: str = 'npz', mmap: bool = True) -> BallotProfile:
+    """Read a profile written by save_profile"""
+    if fmt == 'npz':
+        return load_npz(source, mmap)
+    if fmt == 'arrow':
+        return load_arrow(source, mmap)
+    raise ValueError(f'Unknown profile format: {fmt}')
+
+
+def profile_bytes(profile: BallotProfile, fmt: str = 'npz') -> bytes:
+    """Profile serialized in memory, e.g. for an HTTP response"""
+    buffer = io.BytesIO()
+    save_profile(profile, buffer, fmt)
+    return buffer.getvalue()
+
+
+def read_upload(stream: BinaryIO, fmt: str = 'npz') -> BallotProfile:
+    """
+    Spool an uploaded profile to a temporary file and map it
+
+    The body is copied to disk in blocks, so it is never held in memory as a
+    whole; the mapping outlives the (already unlinked) file. pyarrow only
+    maps files it opens by path, so Arrow uploads get a named file.
+    """
+    if fmt == 'arrow':
+        fd, path = tempfile.mkstemp(suffix='.arrow')
+        try:
+            with os.fdopen(fd, 'wb') as upload:
+                shutil.copyfileobj(stream, upload, 1 << 20)
+            return load_arrow(path, mmap=True)
+        finally:
+            os.unlink(path)
+
+    with tempfile.TemporaryFile() as upload:
+        shutil.copyfileobj(stream, upload, 1 << 20)
+        upload.seek(0)
+        return load_profile(upload, fmt, mmap=True)
+
+
+# ----------------------------------------------------------------------
+# NumPy .npz
+# ----------------------------------------------------------------------
+
+def save_npz(profile: BallotProfile, sink: Union[str, os.PathLike, BinaryIO]) -> None:
+    np.savez(
+        sink,
+        preferences=profile.preferences.astype(np.int32, copy=False),
+        counts=profile.counts.astype(np.int64, copy=False),
+        candidate_ids=np.array(profile.candidate_ids, dtype=np.int64)
+    )
+
+
+def load_npz(source: Source, mmap: bool = True) -> BallotProfile:
+    arrays = _mmap_npz(source) if mmap and _is_file(source) else None
+    if arrays is None:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with np.load(source, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+
+    missing = {'preferences', 'counts', 'candidate_ids'} - set(arrays)
+    if missing:
+        raise ValueError(f'Profile archive is missing {sorted(missing)[0]}')
+    return _checked_profile(arrays['preferences'], arrays['counts'], arrays['candidate_ids'])
+
+
+def _checked_profile(preferences: np.ndarray, counts: np.ndarray, candidate_ids) -> BallotProfile:
+    """
+    Profile from loaded arrays, rejecting what from_rankings could never
+    build: non-integer arrays, mismatched rows, negative counts and
+    preferences outside PAD..n-1 (NumPy would wrap a negative index to
+    another candidate)
+    """
+    ids = np.asarray(candidate_ids)
+    if ids.ndim != 1 or (ids.size and not np.issubdtype(ids.dtype, np.integer)):
+        raise ValueError('Profile candidate_ids must be a list of integers')
+    if not (np.issubdtype(preferences.dtype, np.integer) and np.issubdtype(counts.dtype, np.integer)):
+        raise ValueError('Profile preferences and counts must be integer arrays')
+    if preferences.ndim != 2 or counts.ndim != 1:
+        raise ValueError('Profile preferences must be a matrix and counts a column')
+    if len(preferences) != len(counts):
+        raise ValueError('Profile preferences and counts must have the same number of rows')
+
+    n = len(ids)
+    if preferences.size and (preferences.min() < BallotProfile.PAD or preferences.max() >= n):
+        raise ValueError(f'Profile preferences must be candidate indices 0..{n - 1} '
+                         f'or {BallotProfile.PAD} for padding')
+    if counts.size and counts.min() < 0:
+        raise ValueError('Profile counts cannot be negative')
+    return BallotProfile(preferences, counts, ids.tolist())
+
+
+def _is_file(source: Source) -> bool:
+    """Paths and real (fileno-backed) files can be memory-mapped"""
+    if isinstance(source, (str, os.PathLike)):
+        return True
+    try:
+        source.fileno()
+        return True
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+
+def _mmap_npz(source: Source) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Map every .npy member of an uncompressed archive in place
+
+    Each member's data starts after its zip local file header (30 bytes plus
+    name and extra field) and its .npy header. Returns None when a member is
+    compressed, so the caller falls back to np.load.
+    """
+    owned = isinstance(source, (str, os.PathLike))
+    f = open(source, 'rb') if owned else source
+    try:
+        f.seek(0)
+        arrays = {}
+        with zipfile.ZipFile(f) as archive:
+            members = archive.infolist()
+        for info in members:
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith('.npy'):
+                return None
+            f.seek(info.header_offset)
+            local = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', local[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError('Profile archives cannot hold object arrays')
+
+            key = info.filename[:-4]
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[key] = np.memmap(f, dtype=dtype, mode='r', shape=shape,
+                                        order='F' if fortran else 'C', offset=f.tell())
+        return arrays
+    finally:
+        if owned:
+            f.close()
+
+
+# ----------------------------------------------------------------------
+# Arrow IPC (optional pyarrow)
+# ----------------------------------------------------------------------
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ValueError('Arrow profiles need pyarrow (pip install pyarrow)')
+    return pyarrow
+
+
+def save_arrow(profile: BallotProfile, sink: Union[str, os.PathLike, BinaryIO]) -> None:
+    """
+    Arrow IPC file: `preferences` as a fixed-size list column, `counts` as
+    int64, candidate ids in the schema metadata
+    """
+    pa = _pyarrow()
+    width = profile.preferences.shape[1]
+    values = pa.array(profile.preferences.astype(np.int32, copy=False).ravel(), type=pa.int32())
+    table = pa.table(
+        {
+            'preferences': pa.FixedSizeListArray.from_arrays(values, width),
+            'counts': pa.array(profile.counts, type=pa.int64())
+        },
+        metadata={'candidate_ids': json.dumps(profile.candidate_ids)}
+    )
+    if isinstance(sink, (str, os.PathLike)):
+        sink = str(sink)
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def load_arrow(source: Source, mmap: bool = True) -> BallotProfile:
+    pa = _pyarrow()
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(str(source), 'r') if mmap else pa.OSFile(str(source), 'r')
+    elif hasattr(source, 'seek'):
+        source.seek(0)
+
+    table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    if b'candidate_ids' not in metadata:
+        raise ValueError('Arrow profile is missing candidate_ids metadata')
+
+    # A single chunk (as save_arrow writes) is viewed in place; only tables
+    # written in several batches are combined into a copy
+    column, counts = table.column('preferences'), table.column('counts')
+    width = column.type.list_size
+    if column.num_chunks == 1:
+        preferences = column.chunk(0).flatten().to_numpy(zero_copy_only=True).reshape(-1, width)
+        counts = counts.chunk(0).to_numpy(zero_copy_only=True)
+    else:
+        preferences = column.combine_chunks().flatten().to_numpy(zero_copy_only=False).reshape(-1, width)
+        counts = counts.to_numpy()
+    return _checked_profile(preferences, counts, json.loads(metadata[b'candidate_ids']))
@@ -0,0 +1,198 @@
+"""
+Proportional Allocation over Many Scenarios
+Party-list seat allocation and disproportionality for a (scenarios x parties) vote matrix
+
+Every row of the vote matrix is one scenario. Allocations follow
+apportionment.allocate_seats exactly (same methods, same tie-breaking in
+favour of the party listed first) but are computed for all rows at once:
+
+- Divisor methods build each row's quotient table and sort it once. The
+  sorted table is the order in which seats are awarded, and since these
+  methods are house-monotone the first h entries give the allocation for a
+  house of h seats, for every h up to the largest requested.
+- Largest-remainder methods are a handful of array operations per matrix.
+
+Parties below the threshold (percent of the row's votes) take no part in
+the allocation but still count in the vote shares behind the indices.
+"""
+
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Union
+
+from .apportionment import DIVISOR_METHODS, LARGEST_REMAINDER_METHODS, normalize_method, quotient
+from .metrics import gallagher_index, loosemore_hanby_index, shares
+
+
+# Quotient table cells sorted per chunk of scenarios
+TABLE_CHUNK = 1 << 22
+
+Seats = Union[int, Sequence[int], np.ndarray]
+
+
+def _vote_matrix(votes) -> np.ndarray:
+    votes = np.asarray(votes, dtype=np.float64)
+    if votes.ndim == 1:
+        votes = votes[None, :]
+    if votes.ndim != 2:
+        raise ValueError('votes must be a (scenarios x parties) matrix')
+    if (votes < 0).any():
+        raise ValueError('Party votes cannot be negative')
+    return votes
+
+
+def _seat_vector(seats: Seats, scenarios: int) -> np.ndarray:
+    seats = np.broadcast_to(np.asarray(seats, dtype=np.int64), (scenarios,))
+    if (seats < 0).any():
+        raise ValueError('Seats cannot be negative')
+    return seats
+
+
+def eligible_parties(votes, threshold: float = 0.0) -> np.ndarray:
+    """Parties whose vote share (percent of the row) reaches the threshold"""
+    votes = _vote_matrix(votes)
+    if threshold <= 0:
+        return np.ones(votes.shape, dtype=bool)
+    return shares(votes) >= threshold
+
+
+def award_order(votes, max_seats: int, method: str = 'dhondt',
+                eligible: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (scenarios x max_seats) matrix of the party index winning each
+    successive seat under a divisor method (-1 where no eligible party is
+    left to take it)
+
+    Quotients are sorted largest first; equal quotients go to the party
+    listed first, as in allocate_seats.
+    """
+    method = normalize_method(method)
+    if method not in DIVISOR_METHODS:
+        raise ValueError(f'{method} is not a divisor method')
+    votes = _vote_matrix(votes)
+    scenarios, parties = votes.shape
+    order = np.full((scenarios, max_seats), -1, dtype=np.int64)
+    if max_seats == 0 or parties == 0:
+        return order
+    if eligible is None:
+        eligible = np.ones(votes.shape, dtype=bool)
+
+    divisor = DIVISOR_METHODS[method]
+    held = np.arange(max_seats)
+    step = max(1, TABLE_CHUNK // (parties * max_seats))
+    for start in range(0, scenarios, step):
+        stop = min(start + step, scenarios)
+        table = quotient(votes[start:stop, :, None], held[None, None, :], divisor)
+        table = np.where(eligible[start:stop, :, None], table, -np.inf).reshape(stop - start, -1)
+
+        # Stable sort on the party-major table breaks ties by party, then by seat
+        top = np.argsort(-table, axis=1, kind='stable')[:, :max_seats]
+        valid = np.take_along_axis(table, top, axis=1) > -np.inf
+        order[start:stop] = np.where(valid, top // max_seats, -1)
+    return order
+
+
+def seats_from_order(order: np.ndarray, seats: Seats, parties: int) -> np.ndarray:
+    """(scenarios x parties) allocation from the first `seats` entries of each award order row"""
+    scenarios, width = order.shape
+    seats = _seat_vector(seats, scenarios)
+    taken = (np.arange(width)[None, :] < seats[:, None]) & (order >= 0)
+    rows = np.broadcast_to(np.arange(scenarios)[:, None], order.shape)
+    cells = rows[taken] * parties + order[taken]
+    return np.bincount(cells, minlength=scenarios * parties).reshape(scenarios, parties).astype(np.int64)
+
+
+def _largest_remainder(votes: np.ndarray, seats: np.ndarray, method: str,
+                       eligible: np.ndarray) -> np.ndarray:
+    """Hare or Droop quota per row, remaining seats by largest remainder"""
+    votes = np.where(eligible, votes, 0.0)
+    total = votes.sum(axis=1)
+    live = (total > 0) & (seats > 0)
+
+    if method == 'hare':
+        quota = np.divide(total, seats, out=np.ones_like(total), where=live)
+    else:
+        quota = np.floor(total / (seats + 1)) + 1
+    exact = votes / quota[:, None]
+    allocation = np.floor(exact).astype(np.int64)
+    remainders = np.where(eligible, exact - allocation, -np.inf)
+
+    # Leftover seats go round the eligible parties in remainder order (more
+    # than one lap only with the Droop quota on tiny totals)
+    remaining = seats - allocation.sum(axis=1)
+    laps = np.maximum(eligible.sum(axis=1), 1)
+    order = np.argsort(-remainders, axis=1, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(votes.shape[1])[None, :], axis=1)
+    extra = (remaining // laps)[:, None] + (rank < (remaining % laps)[:, None])
+    allocation += np.where(eligible, extra, 0)
+
+    allocation[~live] = 0
+    return allocation
+
+
+def allocate_matrix(votes, seats: Seats, method: str = 'dhondt', threshold: float = 0.0,
+                    eligible: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Seats per party for every scenario
+
+    Args:
+        votes: (scenarios x parties) votes, or one vote vector
+        seats: House size, for all scenarios or one per scenario
+        method: Any allocate_seats method
+        threshold: Minimum vote share (percent) to take part
+        eligible: Optional (scenarios x parties) mask of parties allowed to
+            take part at all, on top of the threshold
+
+    Returns:
+        (scenarios x parties) int64 allocation
+    """
+    method = normalize_method(method)
+    votes = _vote_matrix(votes)
+    scenarios, parties = votes.shape
+    seats = _seat_vector(seats, scenarios)
+    qualified = eligible_parties(votes, threshold)
+    eligible = qualified if eligible is None else qualified & eligible
+
+    if method in LARGEST_REMAINDER_METHODS:
+        return _largest_remainder(votes, seats, method, eligible)
+
+    order = award_order(votes, int(seats.max()) if scenarios else 0, method, eligible)
+    return seats_from_order(order, seats, parties)
+
+
+def disproportionality(votes, allocation) -> Dict[str, np.ndarray]:
+    """Gallagher and Loosemore-Hanby indices per scenario (vote shares over all parties)"""
+    vote_shares = shares(_vote_matrix(votes))
+    seat_shares = shares(allocation)
+    return {
+        'gallagher': gallagher_index(vote_shares, seat_shares),
+        'loosemore_hanby': loosemore_hanby_index(vote_shares, seat_shares)
+    }
+
+
+def proportional_results(votes, seats: Seats, methods: Sequence[str] = ('dhondt',),
+                         threshold: float = 0.0) -> Dict[str, Any]:
+    """
+    Allocations and indices for every scenario under each method, as lists
+
+    Returns:
+        Dictionary with the scenario and party counts, vote shares and, per
+        method, a seats matrix plus Gallagher and Loosemore-Hanby vectors
+    """
+    votes = _vote_matrix(votes)
+    results = {}
+    for method in methods:
+        allocation = allocate_matrix(votes, seats, method, threshold)
+        indices = disproportionality(votes, allocation)
+        results[normalize_method(method)] = {
+            'seats': allocation.tolist(),
+            'gallagher': indices['gallagher'].round(4).tolist(),
+            'loosemore_hanby': indices['loosemore_hanby'].round(4).tolist()
+        }
+    return {
+        'scenarios': votes.shape[0],
+        'parties': votes.shape[1],
+        'threshold': threshold,
+        'vote_shares': shares(votes).round(4).tolist(),
+        'methods': results
+    }
@@ -2,9 +2,13 @@
 Ranked Voting Systems: Borda Count and Condorcet
 """
 
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Union
 from dataclasses import dataclass
-from collections import defaultdict
+
+from .profile import BallotProfile
+from .condorcet_completion import COMPLETION_METHODS
+from .positional import ScoringRule, positional_scores, rule_label
 
 
 @dataclass
@@ -34,31 +38,40 @@ class BordaCountCalculator:
         self.candidates = {c.id: c for c in candidates}
         self.num_candidates = len(candidates)
     
-    def calculate(self, ballots: List[Ballot]) -> Dict[str, Any]:
+    def calculate(self, ballots: Union[List[Ballot], BallotProfile],
+                  scoring: ScoringRule = 'borda') -> Dict[str, Any]:
         """
         Calculate Borda Count results
         
         Points: n-1 for 1st, n-2 for 2nd, ..., 0 for last
         where n = number of candidates
-        """
-        points = defaultdict(float)
         
-        for ballot in ballots:
-            for rank_index, candidate_id in enumerate(ballot.preferences):
-                # n-1 points for first place, n-2 for second, etc.
-                score = self.num_candidates - rank_index - 1
-                points[candidate_id] += score * ballot.count
+        Args:
+            ballots: List of Ballot objects or a BallotProfile
+            scoring: Positional rule name ('borda', 'dowdall', 'modified_borda',
+                'averaged_borda', 'plurality', 'antiplurality') or a custom
+                list of points per position
+        """
+        return self.calculate_many(ballots, [scoring])[0]
+    
+    def calculate_many(self, ballots: Union[List[Ballot], BallotProfile],
+                       rules: List[ScoringRule]) -> List[Dict[str, Any]]:
+        """Score several positional rules against the same profile in one pass"""
+        profile = BallotProfile.coerce(ballots, list(self.candidates.keys()))
+        scores = positional_scores(profile, rules)
         
-        # Build results
+        return [self._build_results(points, rule) for points, rule in zip(scores, rules)]
+    
+    def _build_results(self, points: np.ndarray, rule: ScoringRule) -> Dict[str, Any]:
+        """Result dictionary for one rule's per-candidate points"""
         results = []
-        for cid, candidate in self.candidates.items():
-            total_points = points.get(cid, 0)
+        for i, (cid, candidate) in enumerate(self.candidates.items()):
             results.append({
                 'id': cid,
                 'name': candidate.name,
                 'party': candidate.party_name,
                 'color': candidate.color,
-                'points': float(total_points)
+                'points': float(points[i])
             })
         
         results.sort(key=lambda x: x['points'], reverse=True)
@@ -72,7 +85,7 @@ class BordaCountCalculator:
             'results': results,
             'winner': results[0]['id'] if results else None,
             'total_points': total_points,
-            'method': 'Borda Count (n-1, n-2, ..., 0)'
+            'method': rule_label(rule)
         }
 
 
@@ -85,56 +98,41 @@ class CondorcetCalculator:
     def __init__(self, candidates: List[Candidate]):
         self.candidates = {c.id: c for c in candidates}
     
-    def calculate(self, ballots: List[Ballot]) -> Dict[str, Any]:
+    def calculate(self, ballots: Union[List[Ballot], BallotProfile],
+                  completion: Union[str, List[str], None] = None) -> Dict[str, Any]:
         """
         Calculate Condorcet winner using pairwise comparisons
         
         Returns winner if exists, otherwise identifies Condorcet paradox
+        
+        Args:
+            ballots: List of Ballot objects or a BallotProfile
+            completion: Completion method name(s) to resolve paradoxes:
+                'schulze', 'ranked_pairs', 'copeland', 'minimax' or 'all'.
+                All methods share the profile's cached pairwise matrix.
         """
         candidate_ids = list(self.candidates.keys())
+        profile = BallotProfile.coerce(ballots, candidate_ids)
         
-        # Build pairwise preference matrix
-        # pairwise[i][j] = number of voters who prefer candidate i to candidate j
-        pairwise = defaultdict(lambda: defaultdict(int))
-        
-        for ballot in ballots:
-            # For each pair of candidates in the ranking
-            for i, cand_i in enumerate(ballot.preferences):
-                for cand_j in ballot.preferences[i+1:]:
-                    # Voter prefers cand_i to cand_j
-                    pairwise[cand_i][cand_j] += ballot.count
+        # pairwise[i, j] = number of voters who prefer candidate i to candidate j
+        pairwise = profile.pairwise_matrix()
         
-        # Find Condorcet winner (beats all others head-to-head)
-        condorcet_winner = None
-        wins = {}
+        # Head-to-head outcomes: beats[i, j] when i wins its contest against j
+        beats = pairwise > pairwise.T
+        win_counts = beats.sum(axis=1)
         
-        for cand_i in candidate_ids:
-            beats_all = True
-            win_count = 0
-            
-            for cand_j in candidate_ids:
-                if cand_i != cand_j:
-                    votes_i_over_j = pairwise[cand_i][cand_j]
-                    votes_j_over_i = pairwise[cand_j][cand_i]
-                    
-                    if votes_i_over_j > votes_j_over_i:
-                        win_count += 1
-                    elif votes_j_over_i > votes_i_over_j:
-                        beats_all = False
-            
-            wins[cand_i] = win_count
-            
-            if beats_all:
-                condorcet_winner = cand_i
-                break
+        # Condorcet winner loses no head-to-head contest (first such candidate)
+        undefeated = np.nonzero(~beats.any(axis=0))[0]
+        condorcet_winner = candidate_ids[undefeated[0]] if len(undefeated) else None
+        wins = {cid: int(win_counts[i]) for i, cid in enumerate(candidate_ids)}
         
         # Build pairwise matrix for display
         pairwise_matrix = []
-        for cand_i in candidate_ids:
+        for i, cand_i in enumerate(candidate_ids):
             row = {'candidate_id': cand_i, 'candidate_name': self.candidates[cand_i].name, 'matchups': {}}
-            for cand_j in candidate_ids:
-                if cand_i != cand_j:
-                    row['matchups'][cand_j] = pairwise[cand_i][cand_j]
+            for j, cand_j in enumerate(candidate_ids):
+                if i != j:
+                    row['matchups'][cand_j] = int(pairwise[i, j])
             pairwise_matrix.append(row)
         
         # Build results
@@ -151,11 +149,58 @@ class CondorcetCalculator:
         
         results.sort(key=lambda x: x['pairwise_wins'], reverse=True)
         
-        return {
+        output = {
             'results': results,
             'condorcet_winner': condorcet_winner,
             'has_paradox': condorcet_winner is None,
             'pairwise_matrix': pairwise_matrix,
-            'winner_name': self.candidates[condorcet_winner].name if condorcet_winner else None
+            'winner_name': self.candidates[condorcet_winner].name if condorcet_winner is not None else None
         }
+        
+        if completion:
+            output['completion'] = self.complete(profile, completion)
+        
+        return output
+    
+    def complete(self, ballots: Union[List[Ballot], BallotProfile],
+                 methods: Union[str, List[str]]) -> Dict[str, Any]:
+        """
+        Run Condorcet completion methods on the profile's pairwise matrix
+        
+        Returns a dict keyed by method name with the winner, full ranking and
+        per-candidate scores, all expressed in candidate ids.
+        """
+        candidate_ids = list(self.candidates.keys())
+        profile = BallotProfile.coerce(ballots, candidate_ids)
+        
+        if methods == 'all':
+            methods = list(COMPLETION_METHODS)
+        elif isinstance(methods, str):
+            methods = [methods]
+        
+        unknown = [m for m in methods if m not in COMPLETION_METHODS]
+        if unknown:
+            raise ValueError(f'Unknown completion method: {unknown[0]}')
+        
+        pairwise = profile.pairwise_matrix()
+        completed = {}
+        
+        for method in methods:
+            outcome = COMPLETION_METHODS[method](pairwise)
+            ranking = [candidate_ids[i] for i in outcome['ranking']]
+            winner = ranking[0] if ranking else None
+            
+            entry = {
+                'winner': winner,
+                'winner_name': self.candidates[winner].name if winner is not None else None,
+                'ranking': ranking,
+                'scores': {cid: outcome['scores'][i] for i, cid in enumerate(candidate_ids)}
+            }
+            if method == 'ranked_pairs':
+                entry['locked_pairs'] = [
+                    [candidate_ids[a], candidate_ids[b]] for a, b in outcome['locked_pairs']
+                ]
+            completed[method] = entry
+        
+        return completed
 
@@ -0,0 +1,163 @@
+"""
+Spatial Voter Model
+Ranked ballots from voter and candidate positions in a multi-dimensional issue space
+
+Every voter ranks the candidates by utility, the negative salience-weighted
+Euclidean distance to each candidate, optionally perturbed by Gaussian
+noise. Distances come from one matrix product per block rather than one
+pass per dimension. Voters are drawn from a Gaussian mixture (or one of the
+BallotGenerator distributions applied on every axis) and processed in
+chunks, so the distance block held in memory is bounded by CHUNK_CELLS
+however many voters there are. Each chunk is reduced to distinct rankings
+with counts before the next one is drawn, and the result is the same
+aggregated BallotProfile the 1-D generator returns.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+from .profile import BallotProfile
+
+
+# Voter x candidate cells per distance block
+CHUNK_CELLS = 1 << 22
+
+# Ballots up to this depth are ranked by repeated argmax instead of a sort
+SELECT_DEPTH = 8
+
+
+def default_positions(num_candidates: int, dimensions: int) -> np.ndarray:
+    """Candidates spread evenly along the first axis, centred on the others"""
+    positions = np.full((num_candidates, dimensions), 0.5)
+    if dimensions:
+        positions[:, 0] = np.linspace(0, 1, num_candidates)
+    return positions
+
+
+class SpatialModel:
+    """
+    Multi-dimensional proximity model
+
+    Args:
+        candidate_positions: (candidates x dimensions) coordinates
+        salience: Weight of each dimension in the distance (default all 1)
+        mixture: Voter population as Gaussian components, each
+            {"weight", "mean": [...], "std": scalar or per-dimension}; None
+            draws every axis from `distribution`
+        distribution: BallotGenerator distribution name used without a mixture
+        noise: Standard deviation of Gaussian noise added to each utility
+        depth: Rank only each voter's top `depth` candidates (None ranks all)
+    """
+
+    def __init__(self,
+                 candidate_positions: Union[Sequence[Sequence[float]], np.ndarray],
+                 salience: Optional[Sequence[float]] = None,
+                 mixture: Optional[List[Dict[str, Any]]] = None,
+                 distribution: str = 'normal',
+                 noise: float = 0.0,
+                 depth: Optional[int] = None):
+        positions = np.asarray(candidate_positions, dtype=np.float64)
+        if positions.ndim == 1:
+            positions = positions[:, None]
+        if positions.ndim != 2 or positions.shape[1] == 0:
+            raise ValueError('Candidate positions must be a (candidates x dimensions) matrix')
+        self.positions = positions
+        num_candidates, dimensions = positions.shape
+
+        self.salience = np.ones(dimensions) if salience is None else np.asarray(salience, dtype=np.float64)
+        if self.salience.shape != (dimensions,) or (self.salience < 0).any():
+            raise ValueError(f'Salience needs {dimensions} non-negative weights')
+
+        self.components = None
+        if mixture:
+            weights = np.array([float(c.get('weight', 1.0)) for c in mixture])
+            if (weights < 0).any() or weights.sum() <= 0:
+                raise ValueError('Mixture weights must be non-negative and not all zero')
+            means = np.array([np.broadcast_to(np.asarray(c['mean'], dtype=np.float64), (dimensions,))
+                              for c in mixture])
+            stds = np.array([np.broadcast_to(np.asarray(c.get('std', 0.1), dtype=np.float64), (dimensions,))
+                             for c in mixture])
+            if (stds < 0).any():
+                raise ValueError('Mixture standard deviations cannot be negative')
+            self.components = (weights / weights.sum(), means, stds)
+
+        if noise < 0:
+            raise ValueError('Noise cannot be negative')
+        self.distribution = distribution
+        self.noise = noise
+        self.depth = num_candidates if depth is None else max(1, min(int(depth), num_candidates))
+
+    @property
+    def dimensions(self) -> int:
+        return self.positions.shape[1]
+
+    def draw_voters(self, rng: np.random.Generator, num_voters: int) -> np.ndarray:
+        """(voters x dimensions) positions"""
+        if self.components is None:
+            from .ballot_gen import BallotGenerator
+            return np.stack([BallotGenerator._draw_positions(rng, num_voters, self.distribution)
+                             for _ in range(self.dimensions)], axis=1)
+
+        weights, means, stds = self.components
+        component = rng.choice(len(weights), size=num_voters, p=weights)
+        return means[component] + stds[component] * rng.standard_normal((num_voters, self.dimensions))
+
+    def utilities(self, voters: np.ndarray, rng: Optional[np.random.Generator] = None,
+                  ordinal: bool = True) -> np.ndarray:
+        """
+        (voters x candidates) utilities: minus the weighted distance, plus noise
+
+        With `ordinal` and no noise the square root is skipped, since only
+        the order of the utilities matters for a ranking.
+        """
+        # |x - c|^2 = x.Wx - 2 x.Wc + c.Wc, with the cross term as one matrix product
+        weighted = self.positions * self.salience
+        squared = voters @ (-2 * weighted.T)
+        squared += np.square(voters) @ self.salience[:, None]
+        squared += (weighted * self.positions).sum(axis=1)
+        np.maximum(squared, 0, out=squared)
+        noisy = self.noise and rng is not None
+        if ordinal and not noisy:
+            return np.negative(squared, out=squared)
+        utility = -np.sqrt(squared, out=squared)
+        if noisy:
+            utility += rng.normal(0.0, self.noise, utility.shape)
+        return utility
+
+    def rankings(self, utility: np.ndarray) -> np.ndarray:
+        """Candidate indices by decreasing utility (ties to the first-listed), top `depth` only"""
+        if self.depth > SELECT_DEPTH:
+            return np.argsort(-utility, axis=1, kind='stable')[:, :self.depth].astype(np.int32)
+
+        # Short ballots: one argmax pass per position beats sorting every row
+        utility = utility.copy()
+        ranked = np.empty((len(utility), self.depth), dtype=np.int32)
+        rows = np.arange(len(utility))
+        for position in range(self.depth):
+            choice = utility.argmax(axis=1)
+            ranked[:, position] = choice
+            utility[rows, choice] = -np.inf
+        return ranked
+
+    def generate(self, candidate_ids: Sequence[int], num_voters: int,
+                 seed: Optional[Union[int, np.random.Generator]] = None,
+                 chunk_size: Optional[int] = None) -> BallotProfile:
+        """Aggregated profile of `num_voters` spatial voters"""
+        if len(candidate_ids) != len(self.positions):
+            raise ValueError('Need one position per candidate')
+        rng = np.random.default_rng(seed)
+        chunk_size = chunk_size or max(1, CHUNK_CELLS // max(len(self.positions), 1))
+
+        chunks = []
+        for start in range(0, num_voters, chunk_size):
+            size = min(chunk_size, num_voters - start)
+            ranked = self.rankings(self.utilities(self.draw_voters(rng, size), rng))
+            chunks.append(BallotProfile.from_index_matrix(ranked, candidate_ids))
+
+        if not chunks:
+            return BallotProfile(np.zeros((0, self.depth), dtype=np.int32),
+                                 np.zeros(0, dtype=np.int64), candidate_ids)
+        if len(chunks) == 1:
+            return chunks[0]
+        return BallotProfile.from_index_matrix(np.concatenate([c.preferences for c in chunks]), candidate_ids,
+                                               np.concatenate([c.counts for c in chunks]))
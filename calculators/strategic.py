@@ -1,11 +1,20 @@
 """
 Strategic Voting Simulator
 Models tactical voting behavior under different electoral systems
+
+simulate_fptp_strategic is the original fixed-split FPTP model.
+BestResponseDynamics is poll-driven: voter groups (one per distinct
+ballot) repeatedly best-respond to the latest poll until no group moves or
+a previous state comes back.
 """
 
-from typing import List, Dict, Any
+import math
+import numpy as np
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+from .profile import BallotProfile
+
 
 @dataclass
 class Candidate:
@@ -88,4 +97,301 @@ class StrategicVotingSimulator:
             'vote_changes': vote_changes,
             'analysis': f'{sum(abs(v) for v in vote_changes.values()) // 2} voters voted strategically'
         }
+    
+    @staticmethod
+    def simulate_dynamics(candidates: List[Candidate],
+                          profile: BallotProfile,
+                          system: str = 'fptp',
+                          polling_data: Optional[Dict[int, float]] = None,
+                          precision: float = 20.0,
+                          max_iterations: int = 100) -> Dict[str, Any]:
+        """
+        Poll-driven best-response dynamics (see BestResponseDynamics)
+        
+        Args:
+            candidates: List of Candidate objects
+            profile: Sincere ranked ballots
+            system: One of DYNAMICS_RULES
+            polling_data: Dictionary of candidate_id -> poll share the first
+                response reacts to (default: the sincere result)
+            precision: How sharply pivot chances fall with poll distance
+            max_iterations: Upper bound on rounds of responses
+            
+        Returns:
+            Dictionary with sincere_votes, strategic_votes, vote_changes and
+            analysis as for simulate_fptp_strategic, plus the winners, the
+            status, cycle_length and the per-iteration trajectory
+        """
+        ids = [c.id for c in candidates]
+        profile = BallotProfile.coerce(profile, ids)
+        dynamics = BestResponseDynamics(profile, system, precision)
+        
+        poll = None
+        if polling_data:
+            poll = np.array([float(polling_data.get(cid, 0.0)) for cid in ids])
+            if poll.sum() > 1.5:
+                poll = poll / 100  # percentages
+        run = dynamics.run(poll, max_iterations)
+        
+        def by_id(tallies):
+            return {cid: int(round(v)) for cid, v in zip(ids, tallies)}
+        
+        sincere_votes = by_id(run['sincere_count']['tallies'])
+        strategic_votes = by_id(run['count']['tallies'])
+        vote_changes = {cid: strategic_votes[cid] - sincere_votes[cid]
+                        for cid in ids if strategic_votes[cid] != sincere_votes[cid]}
+        strategic_voters = int(dynamics.weights[run['strategy'] != run['sincere']].sum())
+        
+        return {
+            'system': system,
+            'sincere_votes': sincere_votes,
+            'strategic_votes': strategic_votes,
+            'vote_changes': vote_changes,
+            'sincere_winner': ids[run['sincere_count']['winner']],
+            'winner': ids[run['count']['winner']],
+            'status': run['status'],
+            'iterations': len(run['trajectory']),
+            'cycle_length': run['cycle_length'],
+            'trajectory': [
+                {
+                    'iteration': step['iteration'],
+                    'votes': by_id(step['tallies']),
+                    'winner': ids[step['winner']],
+                    'switched': int(step['switched'])
+                }
+                for step in run['trajectory']
+            ],
+            'analysis': f'{strategic_voters} voters voted strategically ({run["status"].replace("_", " ")} '
+                        f'after {len(run["trajectory"])} iterations)'
+        }
+
+
+DYNAMICS_RULES = ('fptp', 'two_round', 'irv', 'approval')
+
+
+class BestResponseDynamics:
+    """
+    Iterated best response to polls
+
+    Each distinct ballot of the profile is a voter group with Borda-style
+    utilities from its sincere ranking (n for the first choice down to 1,
+    0 for unranked candidates). A strategy is one integer per group:
+
+    - fptp: the candidate voted for
+    - two_round: the first-round vote; the runoff is sincere
+    - irv: the candidate moved to the top of the sincere ranking
+    - approval: k, approving the top k of the sincere ranking
+
+    Every iteration the poll is the result of the current strategies (or
+    the supplied poll, for the first response). Groups weigh each
+    candidate pair (c, j) by how likely they are to be pivotal between
+    them, exp(-precision * (gap_c + gap_j)), where gap is a candidate's
+    distance in vote share from the contested place: first place for fptp
+    and approval, the last runoff place for two_round and irv (counted
+    with three candidates left for irv). A group's expected gain from
+    backing c is the sum over j of that weight times the utility it
+    gains when c rather than j wins (or, for runoffs, goes through
+    against the poll's strongest remaining candidate). Each group takes
+    the option with the highest expected gain and keeps its current one
+    on ties. All groups respond at once, as matrix operations over
+    groups, so an iteration costs a few (groups x candidates) passes.
+    """
 
+    def __init__(self, profile: BallotProfile, rule: str = 'fptp', precision: float = 20.0):
+        if rule not in DYNAMICS_RULES:
+            raise ValueError(f'Unknown strategic rule: {rule}')
+        if precision <= 0:
+            raise ValueError('Poll precision must be positive')
+        if profile.num_candidates < 2:
+            raise ValueError('Strategic voting needs at least two candidates')
+        self.profile = profile
+        self.rule = rule
+        self.precision = float(precision)
+
+        n = profile.num_candidates
+        preferences = profile.preferences
+        ranked = preferences != BallotProfile.PAD
+        self.active = ranked[:, 0] if preferences.shape[1] else np.zeros(len(profile), dtype=bool)
+        self.weights = np.where(self.active, profile.counts, 0).astype(np.float64)
+        self.depth = ranked.sum(axis=1)
+
+        # Position of every candidate on every ballot (n when unranked)
+        rows, places = np.nonzero(ranked)
+        self.positions = np.full((len(profile), n), n, dtype=np.int64)
+        self.positions[rows, preferences[rows, places]] = places
+        self.utility = np.where(self.positions < n, n - self.positions, 0).astype(np.float64)
+        # Every ballot's ranking followed by its unranked candidates
+        self.order = np.argsort(self.positions, axis=1, kind='stable')
+
+        # Sincere majority winner of every head-to-head runoff
+        wins = np.array([self.weights @ (self.positions[:, [a]] < self.positions) for a in range(n)])
+        self.runoff = np.where((wins > wins.T) | ((wins == wins.T) & (np.arange(n)[:, None] <= np.arange(n))),
+                               np.arange(n)[:, None], np.arange(n)[None, :])
+
+    # ------------------------------------------------------------------
+    # Outcomes
+    # ------------------------------------------------------------------
+
+    def sincere(self) -> np.ndarray:
+        if self.rule == 'approval':
+            half = math.ceil(self.profile.num_candidates / 2)
+            return np.maximum(np.minimum(self.depth, half), 1)
+        return np.where(self.active, self.order[:, 0], 0)
+
+    def count(self, strategy: np.ndarray) -> Dict[str, Any]:
+        """Tallies shown in the poll and the winner (candidate indices)"""
+        n = self.profile.num_candidates
+        if self.rule == 'approval':
+            tallies = self.weights @ (self.positions < strategy[:, None])
+            return {'tallies': tallies, 'winner': int(np.argmax(tallies))}
+
+        if self.rule == 'irv':
+            return self._instant_runoff(strategy)
+
+        tallies = np.bincount(strategy, weights=self.weights, minlength=n)
+        leader = int(np.argmax(tallies))
+        if self.rule == 'fptp' or tallies[leader] * 2 > tallies.sum():
+            return {'tallies': tallies, 'winner': leader}
+        first, second = np.argsort(-tallies, kind='stable')[:2]
+        return {'tallies': tallies, 'winner': int(self.runoff[first, second])}
+
+    def _instant_runoff(self, strategy: np.ndarray) -> Dict[str, Any]:
+        """IRV on the strategic ballots; the poll is the count with three candidates left"""
+        n = self.profile.num_candidates
+        rows = np.arange(len(strategy))
+        keys = self.positions.astype(np.float64)
+        keys[rows, strategy] = -1
+        keys[~self.active] = np.inf
+        eliminated = np.zeros(n, dtype=bool)
+        poll = None
+
+        while True:
+            masked = np.where(eliminated, np.inf, keys)
+            top = np.argmin(masked, axis=1)
+            counted = masked[rows, top] < n
+            tallies = np.bincount(top[counted], weights=self.weights[counted], minlength=n)
+            remaining = n - int(eliminated.sum())
+            if remaining <= 3 and poll is None:
+                poll = tallies
+            standing = np.where(eliminated, -np.inf, tallies)
+            leader = int(np.argmax(standing))
+            if remaining == 1 or standing[leader] * 2 > tallies.sum():
+                return {'tallies': poll if poll is not None else tallies, 'winner': leader}
+            eliminated[int(np.argmin(np.where(eliminated, np.inf, tallies)))] = True
+
+    # ------------------------------------------------------------------
+    # Best response
+    # ------------------------------------------------------------------
+
+    def _pivot_weights(self, shares: np.ndarray) -> np.ndarray:
+        if self.rule in ('fptp', 'approval'):
+            gap = shares.max() - shares
+        else:
+            ranked = np.sort(shares)[::-1]
+            gap = np.abs(shares - (ranked[1] + ranked[2]) / 2) if len(shares) > 2 else np.zeros_like(shares)
+        closeness = gap[:, None] + gap[None, :]
+        weights = np.exp(-self.precision * (closeness - closeness.min()))
+        np.fill_diagonal(weights, 0)
+        return weights
+
+    def expected_gains(self, shares: np.ndarray) -> np.ndarray:
+        """(groups x candidates) expected utility gain from backing each candidate"""
+        pivot = self._pivot_weights(shares)
+        if self.rule in ('fptp', 'approval'):
+            return self.utility * pivot.sum(axis=1) - self.utility @ pivot.T
+
+        # Runoffs: backing c over j sends c rather than j against the
+        # poll's strongest other candidate
+        n = len(shares)
+        if n < 3:
+            return np.zeros_like(self.utility)
+        by_poll = np.argsort(-shares, kind='stable')
+        gains = np.zeros_like(self.utility)
+        for c in range(n):
+            for j in range(n):
+                if c == j or pivot[c, j] == 0:
+                    continue
+                rival = next(int(r) for r in by_poll if r != c and r != j)
+                outcome = self.utility[:, self.runoff[c, rival]] - self.utility[:, self.runoff[j, rival]]
+                gains[:, c] += pivot[c, j] * outcome
+        return gains
+
+    def best_response(self, shares: np.ndarray, strategy: np.ndarray) -> np.ndarray:
+        gains = self.expected_gains(shares)
+        rows = np.arange(len(strategy))
+        if self.rule == 'approval':
+            # Approving the top k gains the sum of the first k candidates' gains
+            cumulative = np.cumsum(gains[rows[:, None], self.order], axis=1)
+            options = np.arange(1, gains.shape[1] + 1)
+            allowed = (options <= np.minimum(self.depth, gains.shape[1] - 1)[:, None]) | (options == 1)
+            cumulative = np.where(allowed, cumulative, -np.inf)
+            best = np.argmax(cumulative, axis=1) + 1
+            current = cumulative[rows, strategy - 1]
+            best_gain = cumulative[rows, best - 1]
+        else:
+            best = np.argmax(gains, axis=1)
+            current = gains[rows, strategy]
+            best_gain = gains[rows, best]
+
+        tolerance = 1e-9 * max(float(np.abs(gains).max()), 1e-300)
+        keep = (current >= best_gain - tolerance) | ~self.active
+        return np.where(keep, strategy, best)
+
+    def run(self, poll: Optional[np.ndarray] = None, max_iterations: int = 100) -> Dict[str, Any]:
+        """
+        Iterate from sincere voting until a fixed point, a cycle or
+        max_iterations
+
+        Args:
+            poll: Vote shares per candidate index for the first response
+                (default: the sincere result)
+            max_iterations: Upper bound on rounds of responses
+
+        Returns:
+            Dictionary with the sincere and final strategies and counts, the
+            status ('fixed_point', 'cycle' or 'max_iterations'), the cycle
+            length, and one entry per iteration with its tallies, winner and
+            the number of voters who switched
+        """
+        strategy = self.sincere()
+        sincere_count = self.count(strategy)
+        total = self.weights.sum()
+        shares = sincere_count['tallies'] / total if total > 0 else sincere_count['tallies']
+        external = poll is not None
+        if external:
+            shares = np.asarray(poll, dtype=np.float64)
+            if shares.shape != (self.profile.num_candidates,):
+                raise ValueError('Poll needs one share per candidate')
+
+        # A state's successor only follows from its own count once the
+        # supplied poll has been answered
+        seen = {} if external else {strategy.tobytes(): 0}
+        trajectory = []
+        status, cycle_length = 'max_iterations', None
+        for iteration in range(1, max_iterations + 1):
+            response = self.best_response(shares, strategy)
+            switched = float(self.weights[response != strategy].sum())
+            strategy = response
+            outcome = self.count(strategy)
+            trajectory.append({'iteration': iteration, 'tallies': outcome['tallies'],
+                               'winner': outcome['winner'], 'switched': switched})
+            shares = outcome['tallies'] / total if total > 0 else outcome['tallies']
+
+            if switched == 0 and not (external and iteration == 1):
+                status = 'fixed_point'
+                break
+            key = strategy.tobytes()
+            if key in seen and switched:
+                status, cycle_length = 'cycle', iteration - seen[key]
+                break
+            seen[key] = iteration
+
+        return {
+            'sincere': self.sincere(),
+            'strategy': strategy,
+            'sincere_count': sincere_count,
+            'count': self.count(strategy),
+            'status': status,
+            'cycle_length': cycle_length,
+            'trajectory': trajectory
+        }
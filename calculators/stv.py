@@ -4,10 +4,13 @@ Implements accurate STV with Droop Quota and fractional surplus transfer
 """
 
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from collections import defaultdict
 from dataclasses import dataclass
 
+from .profile import BallotProfile
+from .arithmetic import get_arithmetic
+
 
 @dataclass
 class Candidate:
@@ -33,9 +36,34 @@ class STVCalculator:
     using Droop Quota and fractional vote weighting
     """
     
-    def __init__(self, candidates: List[Candidate], seats: int):
+    ENGINES = ('python', 'numpy')
+    
+    def __init__(self, candidates: List[Candidate], seats: int, engine: str = 'python',
+                 arithmetic: str = 'float', decimals: int = 5):
+        """
+        Args:
+            candidates: List of Candidate objects
+            seats: Number of seats to fill
+            engine: 'python' walks each ballot per round; 'numpy' keeps a pointer
+                and weight vector over the preference matrix and tallies with
+                np.bincount. Both produce identical results.
+            arithmetic: Number system for ballot weights
+                - 'float': float64, fastest
+                - 'fixed': integers scaled by 10**decimals, truncated after each
+                  transfer; reproducible and still vectorized
+                - 'fraction': exact fractions.Fraction, Python engine only
+            decimals: Precision of the 'fixed' arithmetic
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f'Unknown STV engine: {engine}')
+        
+        self.arithmetic = get_arithmetic(arithmetic, decimals)
+        if engine == 'numpy' and not self.arithmetic.vectorized:
+            raise ValueError(f'{arithmetic} arithmetic requires the python engine')
+        
         self.candidates = {c.id: c for c in candidates}
         self.seats = seats
+        self.engine = engine
         self.rounds = []
         
     def calculate_droop_quota(self, total_votes: int) -> int:
@@ -45,35 +73,49 @@ class STVCalculator:
         """
         return int(np.floor(total_votes / (self.seats + 1))) + 1
     
-    def run_election(self, ballots: List[Ballot]) -> Dict[str, Any]:
+    def run_election(self, ballots: Union[List[Ballot], BallotProfile]) -> Dict[str, Any]:
         """
         Execute full STV election with accurate surplus transfer
         
+        Args:
+            ballots: List of Ballot objects or a BallotProfile
+        
         Returns:
             Dictionary containing results, elected candidates, rounds data
         """
-        total_votes = sum(b.count for b in ballots)
+        profile = BallotProfile.coerce(ballots, list(self.candidates.keys()))
+        
+        if self.engine == 'numpy':
+            return self._run_vectorized(profile)
+        return self._run_python(profile)
+    
+    def _run_python(self, profile: BallotProfile) -> Dict[str, Any]:
+        """Reference engine: walk every working ballot each round"""
+        arith = self.arithmetic
+        total_votes = profile.total_votes
         quota = self.calculate_droop_quota(total_votes)
+        threshold = arith.scale_quota(quota)
         
         # Initialize working ballots with weights
         working_ballots = [
             {
-                'preferences': b.preferences[:],
-                'count': b.count,
-                'weight': 1.0,
+                'preferences': preferences,
+                'count': count,
+                'weight': arith.one(),
                 'current_index': 0
-            } for b in ballots
+            } for preferences, count in profile.iter_rankings()
         ]
         
         elected = []
         eliminated = set()
         round_num = 0
+        vote_counts = {}
         
         while len(elected) < self.seats and len(elected) + len(eliminated) < len(self.candidates):
             round_num += 1
             
             # Count weighted votes for each active candidate
-            vote_counts = defaultdict(float)
+            vote_counts = defaultdict(arith.zero)
             
             for ballot in working_ballots:
                 # Find first non-eliminated, non-elected preference
@@ -88,7 +130,7 @@ class STVCalculator:
             round_info = {
                 'round': round_num,
                 'quota': quota,
-                'vote_counts': {cid: float(vc) for cid, vc in vote_counts.items()},
+                'vote_counts': {cid: arith.to_float(vc) for cid, vc in vote_counts.items()},
                 'action': None,
                 'candidate_id': None,
                 'candidate_name': None
@@ -105,7 +147,7 @@ class STVCalculator:
             
             max_votes = max(vote_counts.get(cid, 0) for cid in active_candidates)
             
-            if max_votes >= quota:
+            if max_votes >= threshold:
                 # Elect candidate with most votes
                 winner_id = max(active_candidates, key=lambda cid: vote_counts.get(cid, 0))
                 elected.append(winner_id)
@@ -115,20 +157,20 @@ class STVCalculator:
                 round_info['candidate_name'] = self.candidates[winner_id].name
                 
                 # Calculate surplus and transfer value
-                surplus = vote_counts[winner_id] - quota
+                surplus = vote_counts[winner_id] - threshold
                 if vote_counts[winner_id] > 0:
-                    transfer_value = surplus / vote_counts[winner_id]
+                    transfer_value = arith.transfer_value(surplus, vote_counts[winner_id])
                 else:
-                    transfer_value = 0
+                    transfer_value = arith.zero()
                 
-                round_info['surplus'] = float(surplus)
-                round_info['transfer_value'] = float(transfer_value)
+                round_info['surplus'] = arith.to_float(surplus)
+                round_info['transfer_value'] = arith.to_float(transfer_value)
                 
                 # Transfer surplus votes
                 for ballot in working_ballots:
                     if (ballot['current_index'] < len(ballot['preferences']) and
                         ballot['preferences'][ballot['current_index']] == winner_id):
-                        ballot['weight'] *= transfer_value
+                        ballot['weight'] = arith.multiply(ballot['weight'], transfer_value)
                         ballot['current_index'] += 1
                         
             elif len(elected) + len(active_candidates) <= self.seats:
@@ -161,7 +203,139 @@ class STVCalculator:
             if round_num > 100:
                 break
         
-        # Build final results
+        return self._build_results(vote_counts, elected, eliminated, quota, total_votes)
+    
+    def _run_vectorized(self, profile: BallotProfile) -> Dict[str, Any]:
+        """
+        Array engine: same count as _run_python on a pointer vector into the
+        preference matrix and a per-row weight vector
+        """
+        arith = self.arithmetic
+        total_votes = profile.total_votes
+        quota = self.calculate_droop_quota(total_votes)
+        threshold = arith.scale_quota(quota)
+        
+        candidate_ids = profile.candidate_ids
+        num_candidates = len(candidate_ids)
+        preferences = profile.preferences
+        rows, width = preferences.shape
+        row_index = np.arange(rows)
+        lengths = profile.lengths
+        counts = profile.counts
+        
+        weights = arith.initial_weights(rows)
+        pointer = np.zeros(rows, dtype=np.int64)
+        
+        # continuing[-1] stands in for the -1 padding, which never continues
+        continuing = np.ones(num_candidates + 1, dtype=bool)
+        continuing[-1] = False
+        
+        # Columns padded with one extra -1 so exhausted pointers stay in range
+        padded = np.concatenate(
+            [preferences, np.full((rows, 1), BallotProfile.PAD, dtype=np.int32)], axis=1
+        )
+        columns = np.arange(width + 1)
+        
+        elected = []
+        eliminated = set()
+        round_num = 0
+        vote_counts = {}
+        
+        while len(elected) < self.seats and len(elected) + len(eliminated) < len(self.candidates):
+            round_num += 1
+            
+            # Advance stale pointers to the next continuing preference
+            current = padded[row_index, pointer]
+            stale = np.nonzero(~continuing[current] & (pointer < lengths))[0]
+            if len(stale):
+                live = continuing[padded[stale]] & (columns >= pointer[stale, None])
+                pointer[stale] = np.where(live.any(axis=1), live.argmax(axis=1), lengths[stale])
+                current = padded[row_index, pointer]
+            
+            # Weighted tally of every live ballot
+            active_rows = pointer < lengths
+            targets = current[active_rows]
+            tallies = arith.tally(targets, counts[active_rows], weights[active_rows], num_candidates)
+            
+            # Keep the first-seen key order the reference engine produces
+            seen, first_row = np.unique(targets, return_index=True)
+            vote_counts = {
+                candidate_ids[i]: tallies[i] for i in seen[np.argsort(first_row, kind='stable')]
+            }
+            
+            # Record round information
+            round_info = {
+                'round': round_num,
+                'quota': quota,
+                'vote_counts': {cid: arith.to_float(vc) for cid, vc in vote_counts.items()},
+                'action': None,
+                'candidate_id': None,
+                'candidate_name': None
+            }
+            
+            active_mask = continuing[:-1]
+            if not active_mask.any():
+                break
+            
+            winner = int(np.argmax(np.where(active_mask, tallies, -np.inf)))
+            max_votes = tallies[winner].item()
+            
+            if max_votes >= threshold:
+                winner_id = candidate_ids[winner]
+                elected.append(winner_id)
+                continuing[winner] = False
+                
+                round_info['action'] = 'elected'
+                round_info['candidate_id'] = winner_id
+                round_info['candidate_name'] = self.candidates[winner_id].name
+                
+                surplus = max_votes - threshold
+                if max_votes > 0:
+                    transfer_value = arith.transfer_value(surplus, max_votes)
+                else:
+                    transfer_value = arith.zero()
+                
+                round_info['surplus'] = arith.to_float(surplus)
+                round_info['transfer_value'] = arith.to_float(transfer_value)
+                
+                # Transfer surplus votes
+                moving = active_rows & (current == winner)
+                weights[moving] = arith.multiply_array(weights[moving], transfer_value)
+                pointer[moving] += 1
+                
+            elif len(elected) + int(active_mask.sum()) <= self.seats:
+                # Elect all remaining candidates
+                for i in np.nonzero(active_mask)[0]:
+                    elected.append(candidate_ids[i])
+                round_info['action'] = 'elected_remaining'
+                break
+                
+            else:
+                # Eliminate candidate with fewest votes
+                loser = int(np.argmin(np.where(active_mask, tallies, np.inf)))
+                loser_id = candidate_ids[loser]
+                eliminated.add(loser_id)
+                continuing[loser] = False
+                
+                round_info['action'] = 'eliminated'
+                round_info['candidate_id'] = loser_id
+                round_info['candidate_name'] = self.candidates[loser_id].name
+                
+                # Transfer votes at full weight to next preference
+                moving = active_rows & (current == loser)
+                pointer[moving] += 1
+            
+            self.rounds.append(round_info)
+            
+            # Safety check
+            if round_num > 100:
+                break
+        
+        return self._build_results(vote_counts, elected, eliminated, quota, total_votes)
+    
+    def _build_results(self, vote_counts: Dict[int, float], elected: List[int],
+                       eliminated: set, quota: int, total_votes: int) -> Dict[str, Any]:
+        """Assemble the result dictionary shared by both engines"""
         results = []
         for cid, candidate in self.candidates.items():
             final_votes = vote_counts.get(cid, 0)
@@ -170,7 +344,7 @@ class STVCalculator:
                 'name': candidate.name,
                 'party': candidate.party_name,
                 'color': candidate.color,
-                'votes': float(final_votes),
+                'votes': self.arithmetic.to_float(final_votes),
                 'elected': cid in elected,
                 'eliminated': cid in eliminated
             })
@@ -181,6 +355,6 @@ class STVCalculator:
             'eliminated': list(eliminated),
             'rounds': self.rounds,
             'quota': quota,
-            'total_votes': total_votes
+            'total_votes': total_votes,
+            'arithmetic': self.arithmetic.name
         }
-
@@ -3,12 +3,14 @@ Unit Tests for Electoral Systems Simulator
 Tests all calculator modules and API endpoints
 """
 
+import itertools
 import unittest
 import numpy as np
 from calculators import (
     STVCalculator, 
     StrategicVotingSimulator,
     BallotGenerator,
+    BallotProfile,
     STVCandidate,
     STVBallot
 )
@@ -67,6 +69,104 @@ class TestSTVCalculator(unittest.TestCase):
         self.assertEqual(len(result['elected']), 1)
 
 
+class TestSTVEngineEquivalence(unittest.TestCase):
+    """The numpy STV engine must reproduce the reference engine exactly"""
+    
+    def assertEnginesAgree(self, candidates, ballots, seats):
+        reference = STVCalculator(candidates, seats, engine='python').run_election(ballots)
+        vectorized = STVCalculator(candidates, seats, engine='numpy').run_election(ballots)
+        self.assertEqual(vectorized, reference)
+    
+    def test_random_truncated_profiles(self):
+        """Random partial rankings, seat counts and zero-count rows"""
+        rng = np.random.default_rng(2024)
+        
+        for _ in range(300):
+            num_candidates = int(rng.integers(1, 8))
+            candidates = [
+                STVCandidate(id=10 + 3 * i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+                for i in range(num_candidates)
+            ]
+            ballots = []
+            for _ in range(int(rng.integers(1, 25))):
+                length = int(rng.integers(0, num_candidates + 1))
+                order = rng.permutation(num_candidates)[:length]
+                ballots.append(STVBallot(
+                    preferences=[candidates[i].id for i in order],
+                    count=int(rng.integers(0, 40))
+                ))
+            seats = int(rng.integers(1, num_candidates + 1))
+            
+            with self.subTest(candidates=num_candidates, seats=seats):
+                self.assertEnginesAgree(candidates, ballots, seats)
+    
+    def test_generated_profiles(self):
+        """Large generated electorates with surplus transfers"""
+        from calculators.ballot_gen import Candidate
+        
+        candidates = [
+            Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in range(1, 9)
+        ]
+        stv_candidates = [STVCandidate(**c.__dict__) for c in candidates]
+        
+        for seed, distribution in enumerate(['normal', 'polarized', 'left', 'right', 'uniform']):
+            profile = BallotGenerator.generate_ideological_profile(
+                candidates, 20000, distribution, seed=seed
+            )
+            for seats in (1, 3, 5):
+                with self.subTest(distribution=distribution, seats=seats):
+                    self.assertEnginesAgree(stv_candidates, profile, seats)
+    
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            STVCalculator([], 1, engine='fortran')
+
+
+class TestSTVArithmetic(unittest.TestCase):
+    """Test the float, fixed-point and exact STV weight arithmetic"""
+    
+    def setUp(self):
+        self.candidates = [
+            STVCandidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in (1, 2, 3, 4)
+        ]
+        # Quota is 32, so 1 transfers a surplus of 11/43 = 0.25581...
+        self.ballots = [
+            STVBallot(preferences=[1, 2, 3], count=43),
+            STVBallot(preferences=[2, 3], count=14),
+            STVBallot(preferences=[3, 4], count=20),
+            STVBallot(preferences=[4, 2], count=16),
+        ]
+    
+    def test_fixed_point_truncates(self):
+        """Fixed point truncates the transfer value to the configured decimals"""
+        result = STVCalculator(self.candidates, 2, arithmetic='fixed', decimals=4).run_election(self.ballots)
+        
+        first = result['rounds'][0]
+        self.assertEqual(first['action'], 'elected')
+        self.assertEqual(first['transfer_value'], 0.2558)
+        self.assertEqual(result['arithmetic'], 'fixed')
+    
+    def test_fixed_point_engines_agree(self):
+        """Both engines produce identical fixed-point counts"""
+        python = STVCalculator(self.candidates, 2, engine='python', arithmetic='fixed').run_election(self.ballots)
+        vectorized = STVCalculator(self.candidates, 2, engine='numpy', arithmetic='fixed').run_election(self.ballots)
+        self.assertEqual(python, vectorized)
+    
+    def test_fraction_matches_float_winners(self):
+        """Exact arithmetic elects the same candidates on a clear-cut count"""
+        exact = STVCalculator(self.candidates, 2, arithmetic='fraction').run_election(self.ballots)
+        approximate = STVCalculator(self.candidates, 2).run_election(self.ballots)
+        self.assertEqual(exact['elected'], approximate['elected'])
+    
+    def test_fraction_requires_python_engine(self):
+        with self.assertRaises(ValueError):
+            STVCalculator(self.candidates, 2, engine='numpy', arithmetic='fraction')
+        with self.assertRaises(ValueError):
+            STVCalculator(self.candidates, 2, arithmetic='decimal')
+
+
 class TestStrategicVoting(unittest.TestCase):
     """Test strategic voting simulator"""
     
@@ -103,6 +203,73 @@ class TestStrategicVoting(unittest.TestCase):
         
         # Should be no changes
         self.assertEqual(result['strategic_votes'], sincere_votes)
+    
+    def test_best_response_abandons_trailing_candidate(self):
+        """Charlie's voters move to Bob once the poll shows Charlie out of contention"""
+        profile = BallotProfile.from_dicts([
+            {'preferences': [1, 3, 2], 'count': 45},
+            {'preferences': [2, 3, 1], 'count': 40},
+            {'preferences': [3, 2, 1], 'count': 15},
+        ], [1, 2, 3])
+        
+        result = StrategicVotingSimulator.simulate_dynamics(self.candidates, profile, 'fptp')
+        self.assertEqual(result['sincere_winner'], 1)
+        self.assertEqual(result['strategic_votes'], {1: 45, 2: 55, 3: 0})
+        self.assertEqual(result['winner'], 2)
+        self.assertEqual(result['status'], 'fixed_point')
+        self.assertEqual([step['switched'] for step in result['trajectory']], [15, 0])
+        
+        # A poll putting Charlie level with Bob keeps everyone sincere at first
+        polled = StrategicVotingSimulator.simulate_dynamics(self.candidates, profile, 'fptp',
+                                                            {1: 0.30, 2: 0.35, 3: 0.35})
+        self.assertEqual(polled['trajectory'][0]['switched'], 0)
+        self.assertEqual(polled['winner'], 2)
+        
+        # Two-round and IRV reach Charlie, who beats both head to head
+        for rule in ('two_round', 'irv'):
+            self.assertEqual(StrategicVotingSimulator.simulate_dynamics(
+                self.candidates, profile, rule)['winner'], 3)
+    
+    def test_dynamics_stop_on_fixed_point_or_cycle(self):
+        from calculators.cultures import generate_culture
+        from calculators.strategic import BestResponseDynamics, DYNAMICS_RULES
+        
+        statuses = set()
+        for seed in range(12):
+            profile = generate_culture([1, 2, 3, 4, 5], 301, 'ic', seed=seed)
+            for rule in DYNAMICS_RULES:
+                run = BestResponseDynamics(profile, rule, precision=5).run(max_iterations=200)
+                statuses.add(run['status'])
+                with self.subTest(seed=seed, rule=rule):
+                    self.assertIn(run['status'], ('fixed_point', 'cycle'))
+                    tallies = [run['sincere_count']['tallies']] + [step['tallies'] for step in run['trajectory']]
+                    if run['status'] == 'cycle':
+                        np.testing.assert_allclose(tallies[-1], tallies[-1 - run['cycle_length']])
+                    else:
+                        self.assertEqual(run['trajectory'][-1]['switched'], 0)
+        self.assertEqual(statuses, {'fixed_point', 'cycle'})
+    
+    def test_dynamics_with_truncated_ballots(self):
+        from calculators.strategic import BestResponseDynamics, DYNAMICS_RULES
+        
+        profile = BallotProfile.from_rankings([([1, 2], 40), ([2, 1], 35), ([3], 25)], [1, 2, 3])
+        for rule in DYNAMICS_RULES:
+            with self.subTest(rule=rule):
+                run = BestResponseDynamics(profile, rule).run()
+                self.assertEqual(run['status'], 'fixed_point')
+                self.assertEqual(run['count']['winner'], 0)
+    
+    def test_polled_start_is_not_part_of_a_cycle(self):
+        from calculators.strategic import BestResponseDynamics
+        
+        # The sincere strategy recurs, but its first response came from the poll
+        profile = BallotProfile.from_rankings(
+            [([2, 3], 74), ([3, 1], 75), ([3, 1], 98), ([1, 2], 1), ([2, 3, 1], 97)], [1, 2, 3])
+        poll = np.array([0.296, 0.522, 0.182])
+        run = BestResponseDynamics(profile, 'approval', precision=2).run(poll)
+        self.assertEqual((run['status'], run['cycle_length']), ('cycle', 4))
+        run = BestResponseDynamics(profile, 'approval', precision=100).run(poll)
+        self.assertEqual(run['status'], 'fixed_point')
 
 
 class TestBallotGenerator(unittest.TestCase):
@@ -146,6 +313,1202 @@ class TestBallotGenerator(unittest.TestCase):
             )
             self.assertEqual(sum(b.count for b in ballots), 100)
 
+    def test_seed_reproducible(self):
+        """Same seed gives the same aggregated ballots"""
+        first = BallotGenerator.generate_ideological_ballots(
+            self.candidates, num_voters=5000, distribution='polarized', seed=7
+        )
+        second = BallotGenerator.generate_ideological_ballots(
+            self.candidates, num_voters=5000, distribution='polarized', seed=7
+        )
+        self.assertEqual(first, second)
+
+    def test_matches_per_voter_ranking(self):
+        """Batched ranking agrees with ranking each voter by distance"""
+        from collections import Counter
+
+        positions = BallotGenerator._draw_positions(
+            np.random.default_rng(11), 2000, 'uniform'
+        )
+        candidate_positions = np.linspace(0, 1, len(self.candidates))
+        expected = Counter(
+            tuple(self.candidates[i].id for i in np.argsort(np.abs(candidate_positions - p)))
+            for p in positions
+        )
+
+        ballots = BallotGenerator.generate_ideological_ballots(
+            self.candidates, num_voters=2000, distribution='uniform', seed=11
+        )
+
+        self.assertEqual({tuple(b.preferences): b.count for b in ballots}, dict(expected))
+
+
+class TestSpatialModel(unittest.TestCase):
+    """Test the multi-dimensional spatial ballot model"""
+    
+    def test_matches_per_voter_distances(self):
+        from collections import Counter
+        from calculators.spatial import SpatialModel
+        
+        rng = np.random.default_rng(21)
+        positions = rng.random((6, 3))
+        salience = np.array([1.0, 0.5, 2.0])
+        model = SpatialModel(positions, salience=salience, mixture=[
+            {'weight': 2, 'mean': [0.3, 0.3, 0.5], 'std': 0.15},
+            {'weight': 1, 'mean': [0.8, 0.6, 0.4], 'std': [0.1, 0.2, 0.1]}
+        ])
+        
+        voters = model.draw_voters(np.random.default_rng(5), 3000)
+        distances = np.sqrt((salience * np.square(voters[:, None, :] - positions[None, :, :])).sum(axis=2))
+        expected = Counter(tuple(row) for row in np.argsort(distances, axis=1, kind='stable').tolist())
+        
+        # Small chunks exercise the merge across blocks
+        profile = model.generate(list(range(6)), 3000, seed=5, chunk_size=3000)
+        self.assertEqual({tuple(r): c for r, c in profile.iter_rankings()}, dict(expected))
+        chunked = model.generate(list(range(6)), 3000, seed=5, chunk_size=128)
+        self.assertEqual(chunked.total_votes, 3000)
+        self.assertEqual(len(chunked), len(chunked.aggregate()))
+    
+    def test_generator_options(self):
+        from calculators.ballot_gen import Candidate
+        
+        candidates = [Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000")
+                      for i in range(1, 11)]
+        profile = BallotGenerator.generate_spatial_profile(
+            candidates, 20000, dimensions=4, noise=0.05, depth=3, seed=2
+        )
+        self.assertEqual(profile.total_votes, 20000)
+        self.assertEqual(profile.preferences.shape[1], 3)
+        self.assertEqual(profile.candidate_ids, list(range(1, 11)))
+        
+        # With no weight on the second axis only the first one matters: four
+        # points on a line allow one ranking per gap between the six midpoints
+        one_axis = BallotGenerator.generate_spatial_profile(
+            candidates[:4], 2000, positions=[[0, 0.9], [0.3, 0.1], [0.6, 0.5], [1, 0]],
+            salience=[1, 0], distribution='uniform', seed=4
+        )
+        self.assertLessEqual(len(one_axis), 7)
+        with self.assertRaises(ValueError):
+            BallotGenerator.generate_spatial_profile(candidates[:2], 10, positions=[[0, 0], [1, 1]],
+                                                     salience=[1, 1, 1])
+
+
+class TestCultures(unittest.TestCase):
+    """Test the statistical-culture ballot samplers"""
+    
+    def test_mallows_and_plackett_luce_laws(self):
+        from calculators.cultures import generate_culture
+        
+        ids, voters = [1, 2, 3, 4], 200000
+        
+        # Mallows: P(ranking) proportional to phi ** (inversions against the reference)
+        reference, phi = [3, 1, 4, 2], 0.5
+        profile = generate_culture(ids, voters, 'mallows', seed=1, dispersion=phi, reference=reference)
+        observed = {tuple(r): c / voters for r, c in profile.iter_rankings()}
+        
+        def inversions(ranking):
+            at = [reference.index(c) for c in ranking]
+            return sum(at[i] > at[j] for i in range(4) for j in range(i + 1, 4))
+        
+        norm = sum(phi ** inversions(r) for r in itertools.permutations(ids))
+        for ranking in itertools.permutations(ids):
+            self.assertAlmostEqual(observed.get(ranking, 0), phi ** inversions(ranking) / norm, delta=0.005)
+        
+        # Plackett-Luce: first place in proportion to weight
+        profile = generate_culture(ids, voters, 'pl', seed=2, weights={1: 4, 2: 2, 3: 1, 4: 1})
+        first = np.bincount(profile.preferences[:, 0], weights=profile.counts, minlength=4) / voters
+        np.testing.assert_allclose(first, [0.5, 0.25, 0.125, 0.125], atol=0.005)
+    
+    def test_urn_and_anonymous_culture(self):
+        from calculators.cultures import generate_culture
+        
+        # IAC over two candidates: every split of the voters is equally likely
+        splits = [dict((tuple(r), c) for r, c in generate_culture([1, 2], 6, 'iac', seed=s).iter_rankings())
+                  .get((1, 2), 0) for s in range(7000)]
+        np.testing.assert_allclose(np.bincount(splits, minlength=7) / 7000, np.full(7, 1 / 7), atol=0.02)
+        
+        # A large alpha herds voters onto few rankings; alpha 0 is impartial culture
+        herded = generate_culture(list(range(8)), 20000, 'polya_urn', seed=3, alpha=1000)
+        impartial = generate_culture(list(range(8)), 20000, 'polya_urn', seed=3, alpha=0)
+        self.assertEqual(herded.total_votes, 20000)
+        self.assertLess(len(herded), len(impartial) // 4)
+        
+        # Cultures are reachable through the generator's distribution names
+        from calculators.ballot_gen import Candidate
+        candidates = [Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000")
+                      for i in range(1, 4)]
+        self.assertEqual(BallotGenerator.generate_profile(candidates, 500, 'ic', seed=4).total_votes, 500)
+        with self.assertRaises(ValueError):
+            BallotGenerator.generate_profile(candidates, 10, 'mallows', dispersion=2.0)
+
+
+class TestCardinal(unittest.TestCase):
+    """Test approval, score and STAR on score ballots"""
+    
+    def setUp(self):
+        from calculators.cardinal import ScoreProfile
+        
+        self.candidates = [
+            {'id': i, 'name': f"C{i}", 'party_id': i, 'party_name': f"P{i}", 'color': "#000"}
+            for i in (1, 2, 3)
+        ]
+        self.scores = ScoreProfile.from_dicts([
+            {'scores': {'1': 5, '2': 4}, 'count': 3},
+            {'scores': {'2': 5, '3': 1}, 'count': 4},
+            {'scores': {'1': 5, '2': 4}, 'count': 2},
+        ], [1, 2, 3])
+    
+    def test_score_winner_can_lose_star_runoff(self):
+        from calculators.cardinal import approval_result, score_result, star_result
+        
+        self.assertEqual(len(self.scores), 2)
+        self.assertEqual(self.scores.total_votes, 9)
+        
+        # Totals: C1 = 25, C2 = 40, C3 = 4; approval means a score of 3 or more
+        score = score_result(self.scores, self.candidates)
+        self.assertEqual(score['winner'], 2)
+        self.assertEqual([r['total_score'] for r in score['results']], [40, 25, 4])
+        self.assertEqual(approval_result(self.scores, self.candidates)['winner'], 2)
+        self.assertEqual(approval_result(self.scores, self.candidates, threshold=5)['winner'], 1)
+        
+        # ...but five of the nine voters score C1 above C2 in the runoff
+        star = star_result(self.scores, self.candidates)
+        self.assertEqual(star['finalists'], [2, 1])
+        self.assertEqual(star['winner'], 1)
+        self.assertEqual(star['runoff'], {'votes': {2: 4, 1: 5}, 'no_preference': 0})
+        
+        with self.assertRaises(ValueError):
+            type(self.scores).from_dicts([{'approved': [9]}], [1, 2, 3])
+    
+    def test_electorate_feeds_batch_simulation(self):
+        from calculators.ballot_gen import Candidate
+        from calculators.batch import run_systems
+        
+        candidates = [Candidate(**c) for c in self.candidates]
+        profile, scores = BallotGenerator.generate_electorate(candidates, 50000, seed=5, max_score=10)
+        self.assertEqual(profile.total_votes, 50000)
+        self.assertEqual(scores.total_votes, 50000)
+        self.assertLessEqual(int(scores.scores.max()), 10)
+        
+        # Every voter gives their first choice the top score
+        first = np.bincount(profile.preferences[:, 0], weights=profile.counts, minlength=3)
+        top_scores = scores.counts @ (scores.scores == 10)
+        self.assertTrue((top_scores >= first).all())
+        
+        batch = run_systems(profile, self.candidates, ['approval', 'star', 'fptp'], scores=scores)
+        self.assertEqual(batch['results']['approval']['method'], 'Approval Voting')
+        self.assertEqual(batch['results']['star']['runoff']['no_preference']
+                         + sum(batch['results']['star']['runoff']['votes'].values()), 50000)
+        
+        # Without score ballots approval falls back to rankings and STAR cannot run
+        self.assertIn('top', run_systems(profile, self.candidates, ['approval'])['results']['approval']['method'])
+        with self.assertRaises(ValueError):
+            run_systems(profile, self.candidates, ['star'])
+    
+    def test_electorate_rankings_match_ranked_generator(self):
+        from unittest import mock
+        from calculators.ballot_gen import Candidate
+        
+        # Small blocks force the multi-chunk path that large electorates take
+        candidates = [Candidate(**c) for c in self.candidates]
+        with mock.patch('calculators.cardinal.CHUNK_CELLS', 3000):
+            profile, scores = BallotGenerator.generate_electorate(candidates, 20000, 'polarized', seed=7)
+        expected = BallotGenerator.generate_ideological_profile(candidates, 20000, 'polarized', seed=7)
+        self.assertEqual(sorted(profile.iter_rankings()), sorted(expected.iter_rankings()))
+        self.assertEqual(scores.total_votes, 20000)
+
+
+class TestBallotProfile(unittest.TestCase):
+    """Test the shared array-backed ballot profile"""
+    
+    def setUp(self):
+        self.ballots = [
+            STVBallot(preferences=[3, 1], count=4),
+            STVBallot(preferences=[1, 2, 3], count=6),
+            STVBallot(preferences=[3, 1], count=2),
+        ]
+    
+    def test_round_trip(self):
+        """Profiles keep rankings and counts, padding short ballots"""
+        profile = BallotProfile.from_ballots(self.ballots, [1, 2, 3])
+        
+        self.assertEqual(profile.preferences.shape, (3, 3))
+        self.assertEqual(profile.total_votes, 12)
+        self.assertEqual(list(profile.iter_rankings())[0], ([3, 1], 4))
+        self.assertEqual(profile.rank_matrix()[0].tolist(), [1, 3, 0])
+    
+    def test_aggregate_and_reindex(self):
+        """Duplicate rows merge and profiles can switch candidate order"""
+        profile = BallotProfile.from_ballots(self.ballots, [1, 2, 3]).aggregate()
+        self.assertEqual(sorted(profile.iter_rankings()), [([1, 2, 3], 6), ([3, 1], 6)])
+        
+        reordered = profile.reindex([3, 2, 1])
+        self.assertEqual(sorted(reordered.iter_rankings()), sorted(profile.iter_rankings()))
+    
+    def test_unknown_candidate_rejected(self):
+        """Ballots naming candidates outside the election are rejected"""
+        with self.assertRaises(ValueError):
+            BallotProfile.from_ballots([STVBallot(preferences=[9], count=1)], [1, 2, 3])
+    
+    def test_calculators_accept_profile(self):
+        """STV gives the same result for a profile and a ballot list"""
+        candidates = [
+            STVCandidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in (1, 2, 3)
+        ]
+        profile = BallotProfile.from_ballots(self.ballots, [1, 2, 3])
+        
+        from_list = STVCalculator(candidates, seats=1).run_election(self.ballots)
+        from_profile = STVCalculator(candidates, seats=1).run_election(profile)
+        
+        self.assertEqual(from_list, from_profile)
+
+
+class TestPositionalScoring(unittest.TestCase):
+    """Test the vectorized Borda / positional scoring engine"""
+    
+    def setUp(self):
+        from calculators.ranked_systems import Candidate
+        self.candidates = [
+            Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in (1, 2, 3, 4)
+        ]
+        self.ballots = [
+            STVBallot(preferences=[1, 2], count=10),
+            STVBallot(preferences=[3, 4, 1, 2], count=5),
+            STVBallot(preferences=[], count=3),
+        ]
+    
+    def points(self, scoring):
+        from calculators.ranked_systems import BordaCountCalculator
+        result = BordaCountCalculator(self.candidates).calculate(self.ballots, scoring)
+        return {r['id']: r['points'] for r in result['results']}
+    
+    def test_standard_borda(self):
+        """Truncated ballots score n-1, n-2, ... for ranked candidates only"""
+        self.assertEqual(self.points('borda'), {1: 35.0, 2: 20.0, 3: 15.0, 4: 10.0})
+    
+    def test_truncated_variants(self):
+        self.assertEqual(self.points('modified_borda'), {1: 30.0, 2: 15.0, 3: 20.0, 4: 15.0})
+        self.assertEqual(self.points('averaged_borda'), {1: 39.5, 2: 24.5, 3: 24.5, 4: 19.5})
+    
+    def test_dowdall_and_custom(self):
+        self.assertAlmostEqual(self.points('dowdall')[1], 10 + 5 / 3)
+        self.assertEqual(self.points([5, 3, 1]), {1: 55.0, 2: 30.0, 3: 25.0, 4: 15.0})
+    
+    def test_many_rules_one_call(self):
+        from calculators.ranked_systems import BordaCountCalculator
+        
+        results = BordaCountCalculator(self.candidates).calculate_many(
+            self.ballots, ['borda', 'plurality']
+        )
+        
+        self.assertEqual(results[0]['winner'], 1)
+        self.assertEqual(results[1]['method'], 'Plurality (1, 0, ..., 0)')
+        with self.assertRaises(ValueError):
+            self.points('nauru')
+
+
+class TestCondorcet(unittest.TestCase):
+    """Test the pairwise-matrix Condorcet calculator"""
+    
+    def setUp(self):
+        from calculators.ranked_systems import Candidate
+        self.candidates = [
+            Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in (1, 2, 3)
+        ]
+    
+    def test_pairwise_matrix(self):
+        """Pairwise counts only compare candidates ranked on the same ballot"""
+        profile = BallotProfile.from_ballots([
+            STVBallot(preferences=[1, 2, 3], count=5),
+            STVBallot(preferences=[3, 1], count=2),
+        ], [1, 2, 3])
+        
+        self.assertEqual(profile.pairwise_matrix().tolist(), [
+            [0, 5, 5],
+            [0, 0, 5],
+            [2, 0, 0],
+        ])
+    
+    def test_condorcet_winner(self):
+        from calculators.ranked_systems import CondorcetCalculator
+        
+        result = CondorcetCalculator(self.candidates).calculate([
+            STVBallot(preferences=[2, 1, 3], count=40),
+            STVBallot(preferences=[1, 2, 3], count=35),
+            STVBallot(preferences=[3, 2, 1], count=25),
+        ])
+        
+        self.assertEqual(result['condorcet_winner'], 2)
+        self.assertFalse(result['has_paradox'])
+        self.assertEqual([r['pairwise_wins'] for r in result['results']], [2, 1, 0])
+    
+    def test_paradox(self):
+        from calculators.ranked_systems import CondorcetCalculator
+        
+        result = CondorcetCalculator(self.candidates).calculate([
+            STVBallot(preferences=[1, 2, 3], count=100),
+            STVBallot(preferences=[2, 3, 1], count=90),
+            STVBallot(preferences=[3, 1, 2], count=85),
+        ])
+        
+        self.assertTrue(result['has_paradox'])
+        self.assertIsNone(result['winner_name'])
+        self.assertEqual(result['pairwise_matrix'][0]['matchups'], {2: 185, 3: 100})
+    
+    def test_completion_methods(self):
+        """Schulze and Ranked Pairs on the standard 45-voter Schulze example"""
+        from calculators.ranked_systems import CondorcetCalculator, Candidate
+        
+        candidates = [
+            Candidate(id=i, name=name, party_id=i, party_name=name, color="#000000")
+            for i, name in enumerate('ABCDE', start=1)
+        ]
+        ids = {c.name: c.id for c in candidates}
+        profile = BallotProfile.from_ballots([
+            STVBallot(preferences=[ids[x] for x in ranking], count=count)
+            for count, ranking in [(5, 'ACBED'), (5, 'ADECB'), (8, 'BEDAC'), (3, 'CABED'),
+                                   (7, 'CAEBD'), (2, 'CBADE'), (7, 'DCEBA'), (8, 'EBADC')]
+        ], [c.id for c in candidates])
+        
+        result = CondorcetCalculator(candidates).calculate(profile, completion='all')
+        completion = result['completion']
+        
+        self.assertTrue(result['has_paradox'])
+        self.assertEqual(completion['schulze']['ranking'], [5, 1, 3, 2, 4])
+        self.assertEqual(completion['ranked_pairs']['winner'], 1)
+        self.assertEqual(completion['minimax']['winner'], 5)
+        self.assertEqual(set(completion), {'schulze', 'ranked_pairs', 'copeland', 'minimax'})
+    
+    def test_completion_agrees_with_condorcet_winner(self):
+        from calculators.ranked_systems import CondorcetCalculator
+        
+        result = CondorcetCalculator(self.candidates).calculate([
+            STVBallot(preferences=[2, 1, 3], count=40),
+            STVBallot(preferences=[1, 2, 3], count=35),
+            STVBallot(preferences=[3, 2, 1], count=25),
+        ], completion='all')
+        
+        for method, outcome in result['completion'].items():
+            self.assertEqual(outcome['winner'], 2, method)
+        
+        with self.assertRaises(ValueError):
+            CondorcetCalculator(self.candidates).calculate([], completion='borda')
+
+
+class TestApportionment(unittest.TestCase):
+    """Test divisor and largest-remainder seat allocation"""
+    
+    def test_dhondt_and_sainte_lague(self):
+        from calculators.apportionment import allocate_seats
+        
+        votes = {1: 100000, 2: 80000, 3: 30000, 4: 20000}
+        self.assertEqual(allocate_seats(votes, 8, 'dhondt'), {1: 4, 2: 3, 3: 1, 4: 0})
+        self.assertEqual(allocate_seats(votes, 8, 'sainte_lague'), {1: 3, 2: 3, 3: 1, 4: 1})
+        self.assertEqual(allocate_seats(votes, 8, 'sainte-lague'), allocate_seats(votes, 8, 'webster'))
+    
+    def test_matches_seat_by_seat_allocation(self):
+        """Divisor search gives the same seats as awarding one seat at a time"""
+        from calculators.apportionment import allocate_seats, DIVISOR_METHODS
+        
+        def one_at_a_time(votes, seats, divisor):
+            allocation = {p: 0 for p in votes}
+            for _ in range(seats):
+                best, winner = -1.0, None
+                for party, v in votes.items():
+                    d = float(divisor(np.array([allocation[party]]))[0])
+                    q = 0.0 if v == 0 else (float('inf') if d == 0 else v / d)
+                    if q > best:
+                        best, winner = q, party
+                allocation[winner] += 1
+            return allocation
+        
+        rng = np.random.default_rng(8)
+        for _ in range(200):
+            votes = {p: int(v) for p, v in enumerate(rng.integers(0, 6, int(rng.integers(1, 7))) * 50)}
+            seats = int(rng.integers(0, 40))
+            for method, divisor in DIVISOR_METHODS.items():
+                with self.subTest(method=method, votes=votes, seats=seats):
+                    self.assertEqual(allocate_seats(votes, seats, method),
+                                     one_at_a_time(votes, seats, divisor))
+    
+    def test_ties_go_to_first_listed(self):
+        from calculators.apportionment import allocate_seats
+        
+        self.assertEqual(allocate_seats({7: 100, 3: 100}, 1), {7: 1, 3: 0})
+        self.assertEqual(allocate_seats({3: 100, 7: 100}, 1), {3: 1, 7: 0})
+    
+    def test_initial_seats_and_largest_remainder(self):
+        from calculators.apportionment import allocate_seats
+        
+        # Party 1 already holds 3 seats, so its next divisor is 4
+        self.assertEqual(allocate_seats({1: 300, 2: 160}, 2, 'dhondt', initial={1: 3}), {1: 0, 2: 2})
+        self.assertEqual(allocate_seats({1: 100, 2: 80, 3: 30}, 10, 'hare'), {1: 5, 2: 4, 3: 1})
+        self.assertEqual(allocate_seats({1: 47000, 2: 16000, 3: 15800, 4: 12000, 5: 6100, 6: 3100}, 10, 'droop'),
+                         {1: 5, 2: 2, 3: 2, 4: 1, 5: 0, 6: 0})
+        with self.assertRaises(ValueError):
+            allocate_seats({1: 100}, 1, 'lottery')
+
+
+class TestMultiDistrict(unittest.TestCase):
+    """Test columnar multi-district FPTP"""
+    
+    def setUp(self):
+        from calculators.multi_district import MultiDistrictCalculator, Candidate as MDCandidate
+        
+        self.candidates = [
+            MDCandidate(id=i, name=f"C{i}", party_id=(i - 1) % 3 + 1,
+                        party_name=f"P{(i - 1) % 3 + 1}", color="#000")
+            for i in range(1, 7)
+        ]
+        self.calc = MultiDistrictCalculator(self.candidates, {})
+    
+    def test_district_list_and_matrix_agree(self):
+        from calculators.multi_district import District, DistrictMatrix
+        
+        districts = [
+            District(id=1, name="D1", candidates=[1, 2, 3], votes={1: 500, 2: 300, 3: 200}),
+            District(id=2, name="D2", candidates=[4, 5, 6], votes={"4": 400, "5": 450, "6": 100}),
+            District(id=3, name="D3", candidates=[4, 5], votes={4: 0, 5: 0}),
+        ]
+        results = self.calc.calculate_fptp_winners(districts)
+        
+        # An all-zero district still goes to a candidate standing there
+        self.assertEqual([d['winner_id'] for d in results['district_winners']], [1, 5, 4])
+        self.assertEqual([d['margin'] for d in results['district_winners']], [200, 50, 0])
+        self.assertEqual(results['party_district_seats'], {1: 2, 2: 1})
+        self.assertEqual(results['total_votes'], 1950)
+        
+        matrix = DistrictMatrix(
+            [[500, 300, 200, 0, 0, 0], [0, 0, 0, 400, 450, 100], [0, 0, 0, 0, 0, 0]],
+            candidate_ids=[c.id for c in self.candidates],
+            party_ids=[c.party_id for c in self.candidates]
+        )
+        summary = self.calc.calculate_fptp_winners(matrix, include_districts=False)
+        self.assertNotIn('district_winners', summary)
+        self.assertEqual(summary['total_votes'], 1950)
+    
+    def test_paging_and_scenarios(self):
+        from calculators.multi_district import DistrictMatrix
+        
+        rng = np.random.default_rng(9)
+        votes = rng.integers(0, 1000, (250, 6))
+        matrix = DistrictMatrix(votes, [c.id for c in self.candidates],
+                                [c.party_id for c in self.candidates])
+        
+        full = self.calc.calculate_fptp_winners(matrix)['district_winners']
+        paged = []
+        for page in range(1, 4):
+            result = self.calc.calculate_fptp_winners(matrix, page=page, page_size=100)
+            paged.extend(result['district_winners'])
+        self.assertEqual(result['total_pages'], 3)
+        self.assertEqual(paged, full)
+        
+        self.assertEqual([d['winner_id'] for d in full], (votes.argmax(axis=1) + 1).tolist())
+        sorted_votes = np.sort(votes, axis=1)
+        self.assertEqual([d['margin'] for d in full], (sorted_votes[:, -1] - sorted_votes[:, -2]).tolist())
+        
+        stacked = self.calc.calculate_fptp_scenarios(np.stack([votes, votes[::-1]]))
+        expected = self.calc.calculate_fptp_winners(matrix, include_districts=False)
+        self.assertEqual(stacked[0]['party_district_seats'], expected['party_district_seats'])
+        self.assertEqual(stacked[1]['party_district_seats'], expected['party_district_seats'])
+    
+    def test_leveling_matches_growing_house(self):
+        """Leveling house size equals re-running the allocation one seat larger at a time"""
+        from calculators.apportionment import allocate_seats
+        from calculators.multi_district import DistrictMatrix
+        
+        rng = np.random.default_rng(10)
+        for _ in range(50):
+            votes = rng.integers(0, 1000, (int(rng.integers(1, 30)), 6))
+            matrix = DistrictMatrix(votes, [c.id for c in self.candidates],
+                                    [c.party_id for c in self.candidates])
+            party_votes = {p: int(v) for p, v in zip([1, 2, 3], rng.integers(1, 100, 3) * 100)}
+            list_seats = int(rng.integers(0, 10))
+            
+            for method in ['dhondt', 'sainte_lague']:
+                result = self.calc.calculate_multi_district_mmp(
+                    matrix, party_votes, list_seats, method, include_districts=False, mode='leveling'
+                )
+                won = result['district_results']['party_district_seats']
+                size = len(matrix) + list_seats
+                while any(allocate_seats(party_votes, size, method)[p] < n for p, n in won.items()):
+                    size += 1
+                
+                self.assertEqual(result['final_parliament_size'], size)
+                self.assertEqual(result['total_overhang'], 0)
+                self.assertEqual(sum(p['actual_seats'] for p in result['party_results']), size)
+    
+    def test_capped_and_regional_modes(self):
+        from calculators.multi_district import DistrictMatrix
+        
+        votes = [[500, 300, 200, 0, 0, 0], [0, 0, 0, 400, 450, 100],
+                 [350, 300, 340, 0, 0, 0], [600, 100, 100, 0, 0, 0]]
+        matrix = DistrictMatrix(votes, [c.id for c in self.candidates],
+                                [c.party_id for c in self.candidates], region_ids=[1, 1, 2, 2])
+        party_votes = {1: 1000, 2: 1100, 3: 900}
+        
+        # Party 1 wins 3 districts but is entitled to 2 of 6 seats: its weakest win is dropped
+        capped = self.calc.calculate_multi_district_mmp(matrix, party_votes, 2, mode='capped')
+        self.assertEqual(capped['final_parliament_size'], 6)
+        self.assertEqual([d['district_id'] for d in capped['uncovered_districts']], [3])
+        seats = {p['party_id']: p['actual_seats'] for p in capped['party_results']}
+        self.assertEqual(seats, {1: 2, 2: 2, 3: 2})
+        
+        regions = {
+            1: {'party_votes': {1: 500, 2: 600, 3: 400}, 'list_seats': 2},
+            2: {'party_votes': {1: 500, 2: 500, 3: 500}, 'list_seats': 3},
+        }
+        regional = self.calc.calculate_multi_district_mmp(matrix, {}, 0, mode='regional', regions=regions)
+        self.assertEqual(regional['final_parliament_size'], 9)
+        self.assertEqual([r['party_list_seats'] for r in regional['region_results']],
+                         [{2: 1, 3: 1}, {2: 2, 3: 1}])
+        
+        with self.assertRaises(ValueError):
+            self.calc.calculate_multi_district_mmp(matrix, party_votes, 2, mode='bundestag')
+    
+    def test_parameter_sweep_matches_single_calls(self):
+        from calculators.multi_district import DistrictMatrix
+        
+        rng = np.random.default_rng(20)
+        matrix = DistrictMatrix(rng.integers(0, 1000, (25, 6)), [c.id for c in self.candidates],
+                                [c.party_id for c in self.candidates])
+        party_votes = {1: 41000, 2: 35000, 3: 3000, 4: 21000}
+        thresholds, list_seats, methods = [0, 5], [0, 10, 30], ['dhondt', 'sainte_lague', 'hare']
+        
+        for system in ('mmp', 'parallel'):
+            sweep = self.calc.calculate_parameter_sweep(matrix, party_votes, system,
+                                                        thresholds, list_seats, methods)
+            party_ids = [p['party_id'] for p in sweep['parties']]
+            for (m, method), (t, threshold), (l, seats) in itertools.product(
+                    enumerate(methods), enumerate(thresholds), enumerate(list_seats)):
+                if system == 'mmp':
+                    single = self.calc.calculate_multi_district_mmp(matrix, party_votes, seats, method,
+                                                                    threshold, include_districts=False)
+                    key = 'actual_seats'
+                else:
+                    single = self.calc.calculate_multi_district_parallel(matrix, party_votes, seats, method,
+                                                                         threshold, include_districts=False)
+                    key = 'total_seats'
+                expected = {r['party_id']: r[key] for r in single['party_results']}
+                with self.subTest(system=system, method=method, threshold=threshold, list_seats=seats):
+                    self.assertEqual(sweep['seats'][m][t][l], [expected.get(p, 0) for p in party_ids])
+                    self.assertEqual(sweep['parliament_size'][m][t][l], single['final_parliament_size'])
+        
+        with self.assertRaises(ValueError):
+            self.calc.calculate_parameter_sweep(matrix, party_votes, 'mmp', mode='capped')
+
+
+class TestBatchSimulation(unittest.TestCase):
+    """Test multi-system batch runs"""
+    
+    def setUp(self):
+        from calculators.ballot_gen import Candidate
+        
+        self.candidates = [
+            Candidate(id=i, name=f"C{i}", party_id=(i - 1) % 3 + 1,
+                      party_name=f"P{(i - 1) % 3 + 1}", color="#000")
+            for i in range(1, 6)
+        ]
+        self.profile = BallotGenerator.generate_ideological_profile(
+            self.candidates, 20000, 'polarized', seed=11
+        )
+    
+    def test_every_system_runs(self):
+        from calculators.batch import run_systems, SYSTEM_RUNNERS
+        
+        batch = run_systems(self.profile, [c.__dict__ for c in self.candidates],
+                            list(SYSTEM_RUNNERS), {'seats': 2})
+        self.assertFalse(batch['parallel'])
+        self.assertEqual(set(batch['results']), set(SYSTEM_RUNNERS))
+        self.assertEqual(set(batch['timings_ms']), set(SYSTEM_RUNNERS))
+        
+        fptp = batch['results']['fptp']
+        self.assertEqual(fptp['total_votes'], 20000)
+        self.assertEqual(sum(p['seats'] for p in batch['results']['party_list']['results']), 2)
+        self.assertEqual(len(batch['results']['stv']['elected']), 2)
+        
+        with self.assertRaises(ValueError):
+            run_systems(self.profile, [c.__dict__ for c in self.candidates], ['fptp', 'sortition'])
+    
+    def test_parallel_matches_serial(self):
+        """Workers reading the shared-memory profile give the same results"""
+        from calculators.batch import run_systems
+        
+        systems = ['fptp', 'irv', 'borda', 'condorcet']
+        candidates = [c.__dict__ for c in self.candidates]
+        serial = run_systems(self.profile, candidates, systems)
+        parallel = run_systems(self.profile, candidates, systems, max_workers=2)
+        
+        self.assertTrue(parallel['parallel'])
+        self.assertEqual(parallel['results'], serial['results'])
+    
+    def test_first_preferences_and_approvals(self):
+        from calculators.batch import first_preferences, approvals
+        
+        profile = BallotProfile.from_rankings([([1, 2, 3], 5), ([3], 2), ([2, 1], 4)], [1, 2, 3])
+        self.assertEqual(first_preferences(profile).tolist(), [5, 4, 2])
+        self.assertEqual(approvals(profile, 2).tolist(), [9, 9, 2])
+
+
+class TestEnsemble(unittest.TestCase):
+    """Test Monte Carlo ensembles and proportionality metrics"""
+    
+    def setUp(self):
+        self.candidates = [
+            {'id': i, 'name': f"C{i}", 'party_id': (i - 1) % 3 + 1,
+             'party_name': f"P{(i - 1) % 3 + 1}", 'color': "#000"}
+            for i in range(1, 6)
+        ]
+    
+    def test_metrics(self):
+        from calculators.metrics import gallagher_index, loosemore_hanby_index
+        
+        votes = [40.0, 35.0, 25.0]
+        seats = [50.0, 40.0, 10.0]
+        self.assertAlmostEqual(float(gallagher_index(votes, seats)), np.sqrt(0.5 * (100 + 25 + 225)))
+        self.assertAlmostEqual(float(loosemore_hanby_index(votes, seats)), 15.0)
+        self.assertEqual(gallagher_index([votes, votes], [seats, votes]).shape, (2,))
+    
+    def test_running_moments(self):
+        from calculators.ensemble import RunningMoments
+        
+        data = np.random.default_rng(12).normal(size=(100, 3))
+        moments = RunningMoments(3)
+        for row in data:
+            moments.update(row)
+        np.testing.assert_allclose(moments.mean, data.mean(axis=0))
+        np.testing.assert_allclose(moments.variance, data.var(axis=0, ddof=1))
+    
+    def test_seeded_ensemble(self):
+        from calculators.ensemble import run_ensemble
+        
+        systems = ['fptp', 'condorcet', 'party_list']
+        
+        def final(**kwargs):
+            accumulator = None
+            for accumulator in run_ensemble(self.candidates, 40, 2000, 'polarized', systems, seed=5, **kwargs):
+                pass
+            return accumulator.snapshot()
+        
+        summary = final()
+        self.assertEqual(summary['trials'], 40)
+        self.assertAlmostEqual(sum(summary['systems']['fptp']['winner_frequency'].values()), 1.0)
+        # The Condorcet method elects the Condorcet winner whenever there is one
+        self.assertEqual(summary['systems']['condorcet']['condorcet_efficiency'], 1.0)
+        
+        # Trials draw from their own seed, however they are chunked or spread over workers
+        other = final(chunk_size=7, max_workers=2)
+        for system in systems:
+            self.assertEqual(other['systems'][system]['winner_frequency'],
+                             summary['systems'][system]['winner_frequency'])
+        
+        with self.assertRaises(ValueError):
+            run_ensemble(self.candidates, 10, 100, systems=['lottery'])
+    
+    def test_culture_params_reach_trials(self):
+        from calculators.ensemble import run_ensemble
+        
+        # A near-zero Mallows dispersion around a reversed reference always elects candidate 5
+        params = {'dispersion': 0.01, 'reference': [5, 4, 3, 2, 1]}
+        accumulator = None
+        for accumulator in run_ensemble(self.candidates, 10, 500, 'mallows', ['fptp'], seed=3,
+                                        culture_params=params):
+            pass
+        self.assertEqual(accumulator.snapshot()['systems']['fptp']['winner_frequency'][5], 1.0)
+
+
+class TestBallotIngest(unittest.TestCase):
+    """Test streaming NDJSON/CSV ballot ingestion"""
+    
+    def setUp(self):
+        self.candidates = [{'id': i, 'name': f"Candidate {i}"} for i in range(1, 5)]
+    
+    def test_ndjson_folds_duplicates(self):
+        import json
+        from calculators.ingest import read_ndjson
+        
+        def lines():
+            yield json.dumps({'candidates': self.candidates, 'seats': 2}).encode() + b'\n'
+            for i in range(10000):
+                yield (b'[1, 2, 3]\n' if i % 2 else b'{"preferences": [2, 1], "count": 3}\n')
+        
+        meta, tally = read_ndjson(lines())
+        self.assertEqual(meta['seats'], 2)
+        self.assertEqual(len(tally), 2)
+        self.assertEqual(tally.ballots, 5000 + 15000)
+        
+        profile = tally.to_profile([1, 2, 3, 4])
+        self.assertEqual(sorted(profile.iter_rankings()), [([1, 2, 3], 5000), ([2, 1], 15000)])
+    
+    def test_csv_rows(self):
+        from calculators.ingest import read_csv
+        
+        rows = [
+            'Rank 1,Rank 2,Rank 3,Count',
+            'Candidate 1,candidate 2,,4',
+            '1,2,skipped,1',
+            '3,overvote,1,2',      # overvote ends the ranking
+            '4,4,2,1',             # repeats keep the first position
+        ]
+        tally = read_csv(rows, self.candidates)
+        self.assertEqual(tally.counts, {(1, 2): 5, (3,): 2, (4, 2): 1})
+        
+        with self.assertRaisesRegex(ValueError, 'Row 2'):
+            read_csv(['r1,r2', 'Candidate 9,1'], self.candidates)
+
+
+class TestProfileFiles(unittest.TestCase):
+    """Test binary .npz / Arrow profile files"""
+    
+    def setUp(self):
+        import tempfile
+        
+        rng = np.random.default_rng(14)
+        preferences = np.argsort(rng.random((500, 6)), axis=1)
+        preferences[::3, 4:] = BallotProfile.PAD
+        self.profile = BallotProfile(preferences, rng.integers(1, 50, 500), [10, 20, 30, 40, 50, 60])
+        self.tmpdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def assertSameProfile(self, loaded):
+        np.testing.assert_array_equal(loaded.preferences, self.profile.preferences)
+        np.testing.assert_array_equal(loaded.counts, self.profile.counts)
+        self.assertEqual(loaded.candidate_ids, self.profile.candidate_ids)
+    
+    def test_npz_is_memory_mapped(self):
+        import io
+        import os
+        from calculators.profile_io import save_profile, load_profile, read_upload, profile_bytes
+        
+        path = os.path.join(self.tmpdir.name, 'profile.npz')
+        save_profile(self.profile, path)
+        loaded = load_profile(path)
+        self.assertSameProfile(loaded)
+        self.assertIsInstance(loaded.preferences.base, np.memmap)
+        
+        # Uploads are spooled to a temporary file and mapped the same way
+        self.assertSameProfile(read_upload(io.BytesIO(profile_bytes(self.profile))))
+    
+    def test_npz_fallbacks(self):
+        import io
+        import os
+        from calculators.profile_io import load_profile
+        
+        # Compressed archives cannot be mapped and are read normally
+        path = os.path.join(self.tmpdir.name, 'compressed.npz')
+        np.savez_compressed(path, preferences=self.profile.preferences, counts=self.profile.counts,
+                            candidate_ids=np.array(self.profile.candidate_ids))
+        self.assertSameProfile(load_profile(path))
+        
+        buffer = io.BytesIO()
+        np.savez(buffer, preferences=self.profile.preferences, counts=self.profile.counts)
+        with self.assertRaises(ValueError):
+            load_profile(buffer)
+    
+    def test_rejects_invalid_arrays(self):
+        import io
+        import importlib.util
+        from calculators.profile_io import read_upload, profile_bytes
+        
+        preferences, counts = self.profile.preferences, self.profile.counts
+        bad = [
+            (np.where(preferences == 0, -3, preferences), counts),   # would wrap to candidate 60
+            (np.where(preferences == 0, 6, preferences), counts),
+            (preferences.astype(np.float64), counts),
+            (preferences, -counts),
+            (preferences, counts[1:]),
+        ]
+        for prefs, cnts in bad:
+            buffer = io.BytesIO()
+            np.savez(buffer, preferences=prefs, counts=cnts,
+                     candidate_ids=np.array(self.profile.candidate_ids))
+            buffer.seek(0)
+            with self.assertRaises(ValueError):
+                read_upload(buffer)
+        
+        if importlib.util.find_spec('pyarrow') is None:
+            return
+        wrapped = BallotProfile(np.where(preferences == 0, -3, preferences), counts, self.profile.candidate_ids)
+        with self.assertRaisesRegex(ValueError, 'candidate indices'):
+            read_upload(io.BytesIO(profile_bytes(wrapped, 'arrow')), 'arrow')
+    
+    def test_arrow_round_trip(self):
+        import importlib.util
+        import os
+        from calculators.profile_io import save_profile, load_profile
+        
+        path = os.path.join(self.tmpdir.name, 'profile.arrow')
+        if importlib.util.find_spec('pyarrow') is None:
+            with self.assertRaises(ValueError):
+                save_profile(self.profile, path, 'arrow')
+            self.skipTest('pyarrow not installed')
+        
+        save_profile(self.profile, path, 'arrow')
+        self.assertSameProfile(load_profile(path, 'arrow'))
+    
+    def test_arrow_upload_is_memory_mapped(self):
+        import importlib.util
+        import io
+        from calculators.profile_io import read_upload, profile_bytes
+        
+        if importlib.util.find_spec('pyarrow') is None:
+            self.skipTest('pyarrow not installed')
+        
+        loaded = read_upload(io.BytesIO(profile_bytes(self.profile, 'arrow')), 'arrow')
+        self.assertSameProfile(loaded)
+        # Views of the mapped Arrow buffers rather than copies
+        self.assertFalse(loaded.preferences.flags.owndata)
+        self.assertFalse(loaded.preferences.flags.writeable)
+        self.assertFalse(loaded.counts.flags.writeable)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test the content-addressed calculator result cache"""
+    
+    def setUp(self):
+        self.candidates = [
+            {'id': i, 'name': f"C{i}", 'party_id': i, 'party_name': f"P{i}", 'color': "#000000"}
+            for i in range(1, 4)
+        ]
+        self.profile = BallotProfile.from_rankings([([1, 2], 5), ([2, 3, 1], 3), ([1, 2], 2)], [1, 2, 3])
+    
+    def test_key_normalizes_profile(self):
+        from calculators.cache import cache_key
+        
+        key = cache_key('stv', self.candidates, self.profile, {'seats': 2})
+        
+        # Same electorate: merged rows, other row order, extra padding, zero-count rows
+        same = BallotProfile(
+            [[1, 2, 0, -1], [0, 1, -1, -1], [2, 0, -1, -1]], [3, 7, 0], [1, 2, 3]
+        )
+        self.assertEqual(cache_key('stv', self.candidates, same, {'seats': 2, 'quota': None}), key)
+        
+        self.assertNotEqual(cache_key('stv', self.candidates, self.profile, {'seats': 3}), key)
+        self.assertNotEqual(cache_key('borda', self.candidates, self.profile, {'seats': 2}), key)
+        other = BallotProfile.from_rankings([([1, 2], 6), ([2, 3, 1], 3)], [1, 2, 3])
+        self.assertNotEqual(cache_key('stv', self.candidates, other, {'seats': 2}), key)
+    
+    def test_lru_and_ttl_eviction(self):
+        from calculators.cache import ResultCache
+        
+        now = [0.0]
+        cache = ResultCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.put('a', 'stv', {'winner': 1})
+        cache.put('b', 'stv', {'winner': 2})
+        self.assertEqual(cache.get('a'), {'winner': 1})
+        cache.put('c', 'stv', {'winner': 3})
+        
+        # "b" was least recently used
+        self.assertIsNone(cache.get('b'))
+        now[0] = 11
+        self.assertIsNone(cache.get('a'))
+        
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual((stats['evictions'], stats['expirations']), (1, 1))
+    
+    def test_persists_to_sqlite(self):
+        import os
+        import tempfile
+        from calculators.cache import ResultCache
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'cache.db')
+            ResultCache(max_entries=2, db_path=path).put('a', 'stv', {'elected': [1, 2]})
+            
+            # A fresh cache (e.g. after a restart) finds the stored result
+            cache = ResultCache(max_entries=2, db_path=path)
+            self.assertEqual(cache.get('a'), {'elected': [1, 2]})
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+            
+            cache.put('b', 'stv', {})
+            cache.put('c', 'stv', {})
+            self.assertEqual(cache.stats()['persisted_entries'], 2)
+
+
+class TestIncrementalRecount(unittest.TestCase):
+    """Test recount sessions updated by ballot deltas"""
+    
+    def setUp(self):
+        self.candidates = [
+            {'id': 10 + i, 'name': f"C{i}", 'party_id': i, 'party_name': f"P{i}", 'color': "#000000"}
+            for i in range(6)
+        ]
+        self.ids = [c['id'] for c in self.candidates]
+        self.rng = np.random.default_rng(16)
+    
+    def random_ranking(self):
+        return [int(c) for c in self.rng.permutation(self.ids)[:self.rng.integers(0, 7)]]
+    
+    def test_deltas_match_full_recount(self):
+        from calculators.incremental import RecountSession
+        from calculators.batch import first_preferences
+        from calculators.positional import positional_scores
+        from calculators.irv import IRVCalculator, Candidate as IRVCandidate
+        
+        table = {}
+        for _ in range(100):
+            ranking = tuple(self.random_ranking())
+            table[ranking] = table.get(ranking, 0) + int(self.rng.integers(1, 20))
+        session = RecountSession(
+            self.candidates, BallotProfile.from_rankings(table.items(), self.ids), seats=2
+        )
+        stv_candidates = [STVCandidate(**c) for c in self.candidates]
+        irv_calculator = IRVCalculator([IRVCandidate(**c) for c in self.candidates])
+        
+        for _ in range(60):
+            ranking = tuple(self.random_ranking())
+            count = max(int(self.rng.integers(-5, 25)), -table.get(ranking, 0))
+            table[ranking] = table.get(ranking, 0) + count
+            session.apply([(ranking, count)])
+            
+            profile = BallotProfile.from_rankings(table.items(), self.ids)
+            np.testing.assert_array_equal(session.first_preferences, first_preferences(profile))
+            np.testing.assert_array_equal(session.borda, positional_scores(profile, ['borda'])[0])
+            np.testing.assert_array_equal(session.pairwise, profile.pairwise_matrix())
+            
+            irv = irv_calculator.calculate(profile)
+            state = session.state()
+            self.assertEqual(state['irv']['winner'], irv['winner'])
+            self.assertEqual(state['irv']['eliminated'], irv['eliminated'])
+            self.assertEqual(state['irv']['rounds'], irv['rounds'])
+            stv = STVCalculator(stv_candidates, 2, engine='numpy').run_election(profile)
+            self.assertEqual(state['stv']['elected'], stv['elected'])
+    
+    def test_resumes_from_changed_round(self):
+        from calculators.incremental import RecountSession
+        
+        ballots = [([10, 11, 12], 40), ([11, 10], 30), ([12, 11], 25), ([13, 12], 10)]
+        session = RecountSession(self.candidates[:4], BallotProfile.from_rankings(ballots, self.ids[:4]))
+        self.assertEqual(session.state()['irv']['eliminated'], [13, 11])
+        
+        # A small delta leaves every decision in place
+        self.assertIsNone(session.apply([([13, 12], 5)]))
+        
+        # Enough extra ballots for 13 save it from the first elimination
+        self.assertEqual(session.apply([([13, 12], 15)]), 1)
+        self.assertEqual(session.state()['irv']['eliminated'][0], 12)
+        
+        with self.assertRaises(ValueError):
+            session.apply([([13, 10], -1)])
+        with self.assertRaises(ValueError):
+            session.apply([([99], 1)])
+    
+    def test_rounds_match_irv_with_exhausted_ballots(self):
+        from calculators.incremental import RecountSession
+        from calculators.irv import IRVCalculator, Candidate as IRVCandidate
+        
+        # 12's ballots exhaust, so round 3 is decided on 80 continuing votes, not 100
+        ballots = [([10], 40), ([11, 10], 30), ([12], 20), ([13, 11], 10)]
+        profile = BallotProfile.from_rankings(ballots, self.ids[:4])
+        session = RecountSession(self.candidates[:4], profile)
+        irv = IRVCalculator([IRVCandidate(**c) for c in self.candidates[:4]]).calculate(profile)
+        
+        self.assertEqual(len(irv['rounds']), 3)
+        self.assertEqual(session.irv_result()['rounds'], irv['rounds'])
+        self.assertEqual(session.irv_result()['winner'], irv['winner'])
+        
+        # Still identical after a delta resumes the count
+        session.apply([([12], 15)])
+        irv = IRVCalculator([IRVCandidate(**c) for c in self.candidates[:4]]).calculate(session.profile)
+        self.assertEqual(session.irv_result()['rounds'], irv['rounds'])
+
+
+class TestCounterfactual(unittest.TestCase):
+    """Test memoized withdrawal counterfactuals"""
+    
+    def setUp(self):
+        self.candidates = [
+            {'id': i, 'name': f"C{i}", 'party_id': i, 'party_name': f"P{i}", 'color': "#000000"}
+            for i in range(1, 6)
+        ]
+        rng = np.random.default_rng(17)
+        rankings = [
+            ([int(c) for c in rng.permutation(5)[:rng.integers(1, 6)] + 1], int(rng.integers(1, 30)))
+            for _ in range(80)
+        ]
+        self.profile = BallotProfile.from_rankings(rankings, [1, 2, 3, 4, 5])
+    
+    def test_matches_recount_without_withdrawn(self):
+        import itertools
+        from calculators.counterfactual import CounterfactualEngine, restrict_profile
+        
+        for seats in (1, 2):
+            engine = CounterfactualEngine(self.candidates, self.profile, seats)
+            for size in range(4):
+                for withdrawn in itertools.combinations(range(5), size):
+                    keep = np.ones(5, dtype=bool)
+                    keep[list(withdrawn)] = False
+                    remaining = [STVCandidate(**c) for c, k in zip(self.candidates, keep) if k]
+                    expected = STVCalculator(remaining, seats, engine='numpy').run_election(
+                        restrict_profile(self.profile, keep))['elected']
+                    self.assertEqual(engine.elected_without([i + 1 for i in withdrawn]), expected)
+    
+    def test_spoilers_share_elimination_paths(self):
+        from calculators.counterfactual import CounterfactualEngine
+        
+        ballots = [([1, 2, 3], 40), ([2, 1], 30), ([3, 2], 25), ([4, 3], 10)]
+        engine = CounterfactualEngine(self.candidates[:4], BallotProfile.from_rankings(ballots, [1, 2, 3, 4]))
+        self.assertEqual(engine.elected_without([]), [1])
+        
+        # 4 is eliminated first anyway, so its withdrawal is already known
+        engine.elected_without([4])
+        self.assertEqual(engine.stats()['memo_hits'], 1)
+        
+        spoilers = engine.spoilers()
+        self.assertEqual([s['withdrawn'] for s in spoilers], [[3]])
+        self.assertEqual(spoilers[0]['beneficiaries'], [2])
+
+
+class TestIRV(unittest.TestCase):
+    """Test the array-backed IRV calculator"""
+    
+    def setUp(self):
+        from calculators.irv import Candidate
+        self.candidates = [
+            Candidate(id=i, name=f"C{i}", party_id=i, party_name=f"P{i}", color="#000000")
+            for i in range(1, 5)
+        ]
+    
+    def test_round_by_round_schema(self):
+        from calculators.irv import IRVCalculator
+        
+        ballots = [([1, 2, 3], 40), ([2, 1], 30), ([3, 2], 25), ([4, 3], 10), ([4], 5)]
+        results = IRVCalculator(self.candidates).calculate(BallotProfile.from_rankings(ballots, [1, 2, 3, 4]))
+        
+        self.assertEqual(results['eliminated'], [4, 2])
+        self.assertEqual(results['winner'], 1)
+        self.assertEqual([r['round'] for r in results['rounds']], [1, 2, 3])
+        
+        # Eliminated candidates stay in voteCounts at zero; exhausted
+        # ballots leave the majority threshold
+        second = results['rounds'][1]
+        self.assertEqual(second['voteCounts'], {1: 40, 2: 30, 3: 35, 4: 0})
+        self.assertEqual((second['totalVotes'], second['exhaustedVotes']), (105, 5))
+        self.assertEqual(second['eliminated'], 2)
+        self.assertEqual(results['rounds'][2]['winner'], 1)
+        self.assertEqual(results['rounds'][2]['voteCounts'][1], 70)
+    
+    def test_majority_and_ties(self):
+        from calculators.irv import IRVCalculator
+        
+        calculator = IRVCalculator(self.candidates[:3])
+        first_round = calculator.calculate(BallotProfile.from_rankings([([3], 6), ([1], 2), ([2], 2)], [1, 2, 3]))
+        self.assertEqual(first_round['winner'], 3)
+        self.assertEqual(len(first_round['rounds']), 1)
+        
+        # Lowest-vote ties eliminate the first-listed candidate; an even
+        # final pair ends with the last candidate standing
+        tied = calculator.calculate(BallotProfile.from_rankings([([1], 2), ([2], 2), ([3], 2)], [1, 2, 3]))
+        self.assertEqual(tied['eliminated'], [1, 2])
+        self.assertEqual(tied['winner'], 3)
+
+
+class TestProportional(unittest.TestCase):
+    """Test vectorized party-list allocation over many scenarios"""
+    
+    def test_matches_allocate_seats(self):
+        from calculators.apportionment import allocate_seats, DIVISOR_METHODS
+        from calculators.proportional import allocate_matrix
+        
+        rng = np.random.default_rng(19)
+        votes = rng.integers(0, 6, (60, 5)) * 50
+        seats = rng.integers(0, 25, 60)
+        for method in list(DIVISOR_METHODS) + ['hare', 'droop']:
+            for threshold in (0.0, 15.0):
+                allocation = allocate_matrix(votes, seats, method, threshold)
+                for row, house, got in zip(votes, seats, allocation):
+                    total = row.sum()
+                    qualifying = {p: int(v) for p, v in enumerate(row)
+                                  if (v / total * 100 if total else 0) >= threshold}
+                    expected = allocate_seats(qualifying, int(house), method) if qualifying else {}
+                    with self.subTest(method=method, votes=row.tolist(), seats=int(house), threshold=threshold):
+                        self.assertEqual(got.tolist(), [expected.get(p, 0) for p in range(len(row))])
+    
+    def test_indices(self):
+        from calculators.proportional import proportional_results
+        
+        results = proportional_results([[100000, 80000, 30000, 20000], [50, 50, 0, 0]], [8, 2],
+                                       ['dhondt', 'sainte_lague'])
+        self.assertEqual(results['methods']['dhondt']['seats'], [[4, 3, 1, 0], [1, 1, 0, 0]])
+        self.assertEqual(results['methods']['sainte_lague']['seats'][0], [3, 3, 1, 1])
+        
+        # Shares 43.48/34.78/13.04/8.70 against 50/37.5/12.5/0
+        self.assertAlmostEqual(results['methods']['dhondt']['loosemore_hanby'][0], 9.2391, places=3)
+        self.assertAlmostEqual(results['methods']['dhondt']['gallagher'][0], 7.9318, places=3)
+        self.assertEqual(results['methods']['dhondt']['gallagher'][1], 0.0)
+
+
+class TestCommittee(unittest.TestCase):
+    """Test the proportional approval committee methods"""
+    
+    def test_hand_profile(self):
+        from calculators.cardinal import ScoreProfile
+        from calculators.committee import committee_results
+        
+        # 60 voters approve C1-C3, 40 approve C4 and C5
+        candidates = [{'id': i, 'name': f"C{i}", 'party_id': i, 'party_name': f"P{i}", 'color': "#000"}
+                      for i in range(1, 6)]
+        scores = ScoreProfile.from_dicts([{'approved': [1, 2, 3], 'count': 60},
+                                          {'approved': [4, 5], 'count': 40}], [1, 2, 3, 4, 5])
+        results = committee_results(scores, candidates, 4)['methods']
+        
+        # seq-PAV ties C3 and C5 at 20 for the last seat; C3 is listed first
+        self.assertEqual(results['seq_pav']['winners'], [1, 4, 2, 3])
+        # Sainte-Lague weights give the 40 their second seat instead
+        self.assertEqual(results['rav']['winners'], [1, 4, 2, 5])
+        self.assertEqual([r['gain'] for r in results['rav']['rounds'][:3]], [60.0, 40.0, 20.0])
+        # Phragmen: C3 and C5 would both lift their voters' load to 1/20
+        self.assertEqual(results['seq_phragmen']['winners'], [1, 4, 2, 3])
+        
+        # Equal shares: the 60 hold 2.4 seats of budget and buy C1 and C2 at
+        # 1/60 each, the 40 hold 1.6 and buy C4; Phragmen fills the last seat
+        mes = results['mes']
+        self.assertEqual(mes['winners'], [1, 2, 4, 3])
+        self.assertEqual(mes['completed_by_phragmen'], 1)
+        self.assertAlmostEqual(mes['unspent_budget'], 1.0)
+        
+        # {1, 2, 3, 4} and {1, 2, 4, 5} both score 150; the first is kept and
+        # listed by marginal contribution
+        self.assertTrue(results['pav']['exact'])
+        self.assertEqual(results['pav']['winners'], [1, 4, 2, 3])
+        self.assertEqual([r['gain'] for r in results['pav']['rounds']], [60.0, 40.0, 30.0, 20.0])
+        self.assertAlmostEqual(results['pav']['pav_score'], 150.0)
+        
+        with self.assertRaises(ValueError):
+            committee_results(scores, candidates, 6)
+    
+    def test_incremental_state_matches_rescoring(self):
+        from calculators.committee import sequential_thiele, seq_phragmen, pav, pav_score
+        
+        rng = np.random.default_rng(24)
+        for trial in range(40):
+            approved = rng.random((rng.integers(5, 40), 8)) < 0.35
+            counts = rng.integers(1, 10, len(approved))
+            seats = int(rng.integers(1, 7))
+            
+            # seq-PAV: each round recomputes every marginal gain from scratch
+            expected = []
+            for _ in range(seats):
+                gains = [pav_score(approved, counts, expected + [c]) if c not in expected else -1
+                         for c in range(8)]
+                expected.append(int(np.argmax(np.round(gains, 9))))
+            with self.subTest(trial=trial):
+                self.assertEqual(sequential_thiele(approved, counts, seats)['winners'], expected)
+                self.assertEqual(len(set(seq_phragmen(approved, counts, seats)['winners'])), seats)
+                
+                # Local search reaches at least seq-PAV and at most the optimum
+                best = max(pav_score(approved, counts, c) for c in itertools.combinations(range(8), seats))
+                local = pav_score(approved, counts, pav(approved, counts, seats, exact_cells=0)['winners'])
+                self.assertGreaterEqual(local, pav_score(approved, counts, expected) - 1e-9)
+                self.assertLessEqual(local, best + 1e-9)
+                self.assertAlmostEqual(pav_score(approved, counts, pav(approved, counts, seats)['winners']), best)
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for complete workflows"""
@@ -187,8 +1550,28 @@ def run_tests():
     
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestSTVCalculator))
+    suite.addTests(loader.loadTestsFromTestCase(TestSTVEngineEquivalence))
+    suite.addTests(loader.loadTestsFromTestCase(TestSTVArithmetic))
     suite.addTests(loader.loadTestsFromTestCase(TestStrategicVoting))
     suite.addTests(loader.loadTestsFromTestCase(TestBallotGenerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestSpatialModel))
+    suite.addTests(loader.loadTestsFromTestCase(TestCultures))
+    suite.addTests(loader.loadTestsFromTestCase(TestCardinal))
+    suite.addTests(loader.loadTestsFromTestCase(TestBallotProfile))
+    suite.addTests(loader.loadTestsFromTestCase(TestPositionalScoring))
+    suite.addTests(loader.loadTestsFromTestCase(TestCondorcet))
+    suite.addTests(loader.loadTestsFromTestCase(TestApportionment))
+    suite.addTests(loader.loadTestsFromTestCase(TestMultiDistrict))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchSimulation))
+    suite.addTests(loader.loadTestsFromTestCase(TestEnsemble))
+    suite.addTests(loader.loadTestsFromTestCase(TestBallotIngest))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfileFiles))
+    suite.addTests(loader.loadTestsFromTestCase(TestResultCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalRecount))
+    suite.addTests(loader.loadTestsFromTestCase(TestCounterfactual))
+    suite.addTests(loader.loadTestsFromTestCase(TestIRV))
+    suite.addTests(loader.loadTestsFromTestCase(TestProportional))
+    suite.addTests(loader.loadTestsFromTestCase(TestCommittee))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     
     # Run tests